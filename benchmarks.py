@@ -0,0 +1,161 @@
+"""
+Playback benchmarks for crab rigs. These must be run within maya or
+mayapy, for instance:
+
+    mayapy benchmarks.py
+
+Importing pymel (through crab) initialises maya when running in mayapy.
+
+A rig with a long chain of joints is generated for each binding mode, the
+controls are keyed and the time taken to play back every frame is reported
+as frames per second.
+"""
+import time
+
+from maya import cmds
+
+import crab
+
+
+# -- The number of joints in the generated rig
+JOINT_COUNT = 500
+
+# -- The number of frames to evaluate
+FRAME_COUNT = 100
+
+
+# ------------------------------------------------------------------------------
+def generate(joint_count, mode):
+    """
+    Generates a rig with a chain of singular components, bound with
+    the given binding mode, and keys every control.
+
+    :param joint_count: Number of joints to generate
+    :type joint_count: int
+
+    :param mode: The binding mode to build the rig with
+    :type mode: str
+
+    :return: crab.Rig
+    """
+    cmds.file(new=True, force=True)
+
+    rig = crab.Rig.create(name='Benchmark')
+    rig.set_binding_mode(mode)
+
+    parent = None
+
+    for idx in range(joint_count):
+        component = rig.add_component(
+            'Singular',
+            parent=parent,
+            description='Chain',
+            side=crab.config.MIDDLE,
+        )
+
+        parent = component.skeletal_root()
+        cmds.xform(parent.longName(), translation=[0, 1, 0], rotation=[0, 0, 3])
+
+    rig.build()
+
+    # -- Key every control at the start and end of the range
+    controls = [
+        node
+        for node in cmds.ls(
+            rig.control_org().longName(),
+            dag=True,
+            type='transform',
+            long=True,
+        ) or list()
+        if crab.config.get_category(node.rsplit('|', 1)[-1]) == crab.config.CONTROL
+    ]
+
+    for frame, value in [(1, 0), (FRAME_COUNT, 45)]:
+        for control in controls:
+            for attribute in ['rotateX', 'rotateZ']:
+                if cmds.getAttr('%s.%s' % (control, attribute), settable=True):
+                    cmds.setKeyframe(control, attribute=attribute, time=frame, value=value)
+
+    return rig
+
+
+# ------------------------------------------------------------------------------
+def playback_fps(rig, frame_count):
+    """
+    Plays back the frame range as fast as possible and returns the number
+    of frames evaluated per second.
+
+    Within an interactive session the real playback is timed. In batch
+    mode nothing is drawn during playback, so each frame is stepped to
+    instead and only the leaf joint of the chain is pulled, which is
+    enough to force the whole chain to evaluate.
+
+    :param rig: The rig to evaluate
+    :type rig: crab.Rig
+
+    :param frame_count: Number of frames to evaluate
+    :type frame_count: int
+
+    :return: float
+    """
+    joints = cmds.ls(
+        rig.skeleton_org().longName(),
+        dag=True,
+        type='joint',
+        long=True,
+    ) or list()
+
+    leaf = max(joints, key=lambda joint: joint.count('|')) if joints else None
+
+    cmds.playbackOptions(
+        minTime=1,
+        maxTime=frame_count,
+        maxPlaybackSpeed=0,
+        loop='once',
+    )
+    cmds.currentTime(1)
+
+    start = time.time()
+
+    if not cmds.about(batch=True):
+        cmds.play(wait=True)
+
+    else:
+        for frame in range(1, frame_count + 1):
+            cmds.currentTime(frame, update=False)
+
+            if leaf:
+                cmds.getAttr('%s.worldMatrix[0]' % leaf)
+
+    return frame_count / max(time.time() - start, 0.0001)
+
+
+# ------------------------------------------------------------------------------
+def run(joint_count=JOINT_COUNT, frame_count=FRAME_COUNT):
+    """
+    Runs the playback benchmark for each binding mode and prints
+    the results.
+
+    :return: dict(str: float) of frames per second for each mode
+    """
+    results = dict()
+
+    for mode in [crab.config.CONSTRAINT_BINDING, crab.config.MATRIX_BINDING]:
+        rig = generate(joint_count, mode)
+
+        results[mode] = playback_fps(rig, frame_count)
+
+        print(
+            '%s binding : %s joints, %.2f fps' % (
+                mode,
+                joint_count,
+                results[mode],
+            ),
+        )
+
+    return results
+
+
+# ------------------------------------------------------------------------------
+if __name__ == '__main__':
+    run()
@@ -699,9 +699,12 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 from .core import Behaviour
+from .core import BuildContext
 from .core import Component
+from .core import ComponentIndex
 from .core import Process
 from .core import Rig
+from .core import RigRegistry
 
 from . import config
 from . import create
@@ -1,7 +1,7 @@
 from string import Formatter
 import re
 
-import pymel.core as pm
+from maya import cmds
 
 
 # ------------------------------------------------------------------------------
@@ -15,13 +15,26 @@ COMPONENT_MARKER = 'crabComponent'
 META_IDENTIFIER = 'Identifier'
 META_VERSION = 'Version'
 META_OPTIONS = 'Options'
+META_FINGERPRINT = 'Fingerprint'
 
 
 # ------------------------------------------------------------------------------
 # -- This is a list of attribute names used by the internals of
 # -- crab to resolve relationships between objects
 BOUND = 'crabBinding'
+BINDING_NODES = 'crabBindingNodes'
+BINDING_MODE = 'crabBindingMode'
 BEHAVIOUR_DATA = 'crabBehaviours'
+BEHAVIOUR_FINGERPRINT = 'crabBehaviourFingerprint'
+
+
+# ------------------------------------------------------------------------------
+# -- These are the ways in which a skeletal joint may be bound to its
+# -- control. Constraint binding uses parent and scale constraints, whilst
+# -- matrix binding uses multMatrix and decomposeMatrix nodes.
+CONSTRAINT_BINDING = 'constraint'
+MATRIX_BINDING = 'matrix'
+DEFAULT_BINDING = CONSTRAINT_BINDING
 
 
 # ------------------------------------------------------------------------------
@@ -255,6 +268,223 @@ def replace_group(given_name, replace, group):
     )
 
 
+# ------------------------------------------------------------------------------
+class NameAllocator(object):
+    """
+    Hands out unique names which follow the naming convention without
+    having to query the scene for every counter which might be in use.
+
+    For each prefix, description and side combination we hold the set of
+    counters in use along with the lowest counter which may be free. The
+    counters are seeded from a single scan of the scene and are then kept
+    up to date by listening to node creation, deletion and renames -
+    including those made outside of crab.
+
+    As a final guard each name handed out is checked against the scene
+    once before it is returned.
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self):
+
+        # -- These are only populated when we first need them
+        self._used = None
+        self._lowest = None
+
+    # --------------------------------------------------------------------------
+    def reset(self):
+        """
+        Forgets all the counters, forcing the scene to be scanned again
+        the next time a name is requested.
+
+        :return: None
+        """
+        self._used = None
+        self._lowest = None
+
+    # --------------------------------------------------------------------------
+    def allocate(self, prefix, description, side, counter=1):
+        """
+        Returns a unique name with the given naming parts, reserving it
+        such that it will not be handed out again.
+
+        :param prefix: The prefix (category) of the name
+        :type prefix: str
+
+        :param description: The descriptive element of the name
+        :type description: str
+
+        :param side: The location of the element, such as LF, RT or MD
+        :type side: str
+
+        :param counter: The lowest counter which may be used
+        :type counter: int
+
+        :return: str
+        """
+        self._seed()
+
+        key = (str(prefix), str(description), str(side))
+        used = self._used.setdefault(key, set())
+
+        # -- Every counter below the lowest free counter is in use, so
+        # -- there is no need to consider them
+        counter = max(counter or 1, self._lowest.get(key, 1))
+
+        while True:
+            candidate = NAME_PATTERN.format(
+                category=prefix,
+                description=description,
+                counter=counter,
+                side=side,
+            )
+
+            if counter not in used:
+
+                # -- If the name is unique, return it
+                if not cmds.objExists(candidate):
+                    break
+
+                # -- We were not told about this node, so we take note
+                # -- of it now
+                self._reserve(key, counter)
+
+            # -- The name already exists, so increment our
+            # -- counter
+            counter += 1
+
+        self._reserve(key, counter)
+
+        return candidate
+
+    # --------------------------------------------------------------------------
+    def _seed(self):
+        """
+        Scans the scene for any names which follow the naming convention
+        if we have not already done so, and ensures we're listening to
+        any changes made to the scene.
+
+        :return: None
+        """
+        # -- This is imported here as the utils package depends
+        # -- on this module
+        from .utils import tracking
+
+        if self._used is not None and tracking.is_name_listener(self._on_name_changed):
+            return
+
+        self._used = dict()
+        self._lowest = dict()
+
+        for node_name in cmds.ls('*_*_*_*') or list():
+            self._on_name_changed(None, node_name)
+
+        tracking.add_name_listener(self._on_name_changed)
+
+    # --------------------------------------------------------------------------
+    def _on_name_changed(self, old_name, new_name):
+        """
+        Keeps the counters up to date as names enter and leave the scene.
+
+        :param old_name: The name leaving the scene, or None
+        :type old_name: str
+
+        :param new_name: The name entering the scene, or None
+        :type new_name: str
+
+        :return: None
+        """
+        # -- If the whole scene has changed then we need to start again
+        if old_name is None and new_name is None:
+            self.reset()
+            return
+
+        if self._used is None:
+            return
+
+        parts = self._parts(old_name)
+
+        if parts:
+            self._release(*parts)
+
+        parts = self._parts(new_name)
+
+        if parts:
+            self._reserve(*parts)
+
+    # --------------------------------------------------------------------------
+    @classmethod
+    def _parts(cls, node_name):
+        """
+        Splits the given name into its naming key and counter. Only names
+        within the root namespace are considered, as only they can clash
+        with the names we hand out.
+
+        :param node_name: Name to split
+        :type node_name: str
+
+        :return: tuple(key, counter) or None
+        """
+        if not node_name:
+            return None
+
+        # -- Dag paths are given where short names are not unique
+        node_name = node_name.split('|')[-1]
+
+        if ':' in node_name:
+            return None
+
+        match = COMPILED_NAME_PATTERN.match(node_name)
+
+        if not match or match.end() != len(node_name):
+            return None
+
+        return (
+            (match.group('category'), match.group('description'), match.group('side')),
+            int(match.group('counter')),
+        )
+
+    # --------------------------------------------------------------------------
+    def _reserve(self, key, counter):
+        used = self._used.setdefault(key, set())
+        used.add(counter)
+
+        # -- Move the lowest free counter past any which are now in use
+        lowest = self._lowest.get(key, 1)
+
+        while lowest in used:
+            lowest += 1
+
+        self._lowest[key] = lowest
+
+    # --------------------------------------------------------------------------
+    def _release(self, key, counter):
+        used = self._used.get(key)
+
+        if not used or counter not in used:
+            return
+
+        used.discard(counter)
+
+        # -- Released counters become available for re-use
+        if counter < self._lowest.get(key, 1):
+            self._lowest[key] = counter
+
+
+# -- This is the allocator used by all name requests
+_ALLOCATOR = NameAllocator()
+
+
+# ------------------------------------------------------------------------------
+def allocator():
+    """
+    Returns the name allocator used by ```config.name```
+
+    :return: NameAllocator
+    """
+    return _ALLOCATOR
+
+
 # ------------------------------------------------------------------------------
 # noinspection PyUnresolvedReferences
 def name(prefix, description, side, counter=1):
@@ -279,24 +509,12 @@ def name(prefix, description, side, counter=1):
 
     :return:
     """
-    prefix = prefix.upper()
-    side = side.upper()
-
-    while True:
-        candidate = NAME_PATTERN.format(
-            category=prefix,
-            description=description,
-            counter=counter,
-            side=side,
-        )
-
-        # -- If the name is unique, return it
-        if not pm.objExists(candidate):
-            return candidate
-
-        # -- The name already exists, so increment our
-        # -- counter
-        counter += 1
+    return _ALLOCATOR.allocate(
+        prefix=prefix.upper(),
+        description=description,
+        side=side.upper(),
+        counter=counter,
+    )
 
 
 # ------------------------------------------------------------------------------
@@ -16,3 +16,22 @@ PLUGIN_LOCATIONS = [
 
 # ------------------------------------------------------------------------------
 PLUGIN_ENVIRONMENT_VARIABLE = 'CRAB_PLUGIN_PATHS'
+
+
+# ------------------------------------------------------------------------------
+# -- If this is set to a directory, a chrome trace of every rig build
+# -- will be written into it.
+PROFILE_ENVIRONMENT_VARIABLE = 'CRAB_PROFILE_PATH'
+
+
+# ------------------------------------------------------------------------------
+# -- The plugin discovery cache remembers which plugin files contain which
+# -- plugin types, so files can be skipped without being imported. The
+# -- location can be overridden with the environment variable, and setting
+# -- it to an empty string disables the cache.
+PLUGIN_CACHE_ENVIRONMENT_VARIABLE = 'CRAB_PLUGIN_CACHE'
+PLUGIN_CACHE_LOCATION = os.path.join(
+    os.path.expanduser('~'),
+    '.crab',
+    'plugin_cache.json',
+)
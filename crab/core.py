@@ -20,12 +20,20 @@ This holds all the major classes utilised in crab. These are:
 
     * Process
     This is the base class for any process plugins
+
+    * BuildContext
+    This is shared between all the process plugins during an edit or
+    build, and caches the rig hierarchy for them.
 """
 import re
 import json
+import math
 import uuid
+import hashlib
 
 import pymel.core as pm
+import maya.api.OpenMaya as om
+from maya import cmds
 
 from . import (
     utils,
@@ -38,6 +46,20 @@ from .vendor import factories
 
 
 _FACTORY_MANAGER = None
+_RIG_REGISTRY = None
+
+# -- This holds the component instances keyed by the uuid of their
+# -- meta node, along with the options they were read with
+_COMPONENT_CACHE = dict()
+
+# -- This maps the names of the meta nodes held within the component
+# -- cache to their uuids, so entries can be forgotten when deleted
+_COMPONENT_NAMES = dict()
+
+# -- This holds a revision of the components within each namespace, which
+# -- is incremented whenever a component meta node or one of its root links
+# -- changes. The revision held against None changes with the whole scene.
+_COMPONENT_REVISIONS = dict()
 
 
 # ------------------------------------------------------------------------------
@@ -85,6 +107,14 @@ class Rig(object):
         self._meta = None
         self._reference = node
 
+        # -- This holds the profile of the last build performed
+        # -- by this rig instance
+        self.last_profile = None
+
+        # -- This is the cached index of the components within the rig,
+        # -- which is rebuilt whenever the scene changes
+        self._component_index = None
+
     # --------------------------------------------------------------------------
     @classmethod
     def create(cls, name=None):
@@ -312,6 +342,38 @@ class Rig(object):
 
         return None
 
+    # --------------------------------------------------------------------------
+    def binding_mode(self):
+        """
+        Returns the mode which the skeleton of this rig is bound to the
+        control rig with, unless a component defines its own mode.
+
+        :return: str
+        """
+        node = self.node()
+
+        if node and node.hasAttr(config.BINDING_MODE):
+            mode = node.attr(config.BINDING_MODE).get()
+
+            if mode:
+                return mode
+
+        return config.DEFAULT_BINDING
+
+    # --------------------------------------------------------------------------
+    def set_binding_mode(self, mode):
+        """
+        Sets the mode which the skeleton of this rig is bound to the
+        control rig with. This takes effect the next time the rig is built.
+
+        :param mode: The binding mode, such as config.MATRIX_BINDING, or
+            None to use the default binding mode
+        :type mode: str
+
+        :return: None
+        """
+        _set_binding_mode(self.node(), mode)
+
     # --------------------------------------------------------------------------
     def add_component(self,
                       component_type,
@@ -414,6 +476,97 @@ class Rig(object):
         """
         Component(skeleton_node).remove()
 
+    # --------------------------------------------------------------------------
+    def remove_components(self, skeleton_nodes):
+        """
+        Removes all the given components from the rig in one go. Any child
+        components which are not being removed are re-parented under the
+        next available parent, in the same way as ```remove_component```.
+
+        :param skeleton_nodes: Skeletal component roots (or any nodes
+            within the components) to remove
+        :type skeleton_nodes: list(pm.nt.DagNode, ...)
+
+        :return: The number of components removed
+        """
+        index = self.component_index()
+
+        to_remove = set()
+
+        for skeleton_node in skeleton_nodes:
+            meta_node = Component(skeleton_node).meta()
+
+            if meta_node:
+                to_remove.add(_uuid(meta_node))
+
+        # -- Only remove components which are part of this rig
+        to_remove = set(
+            meta_uuid
+            for meta_uuid in to_remove
+            if index.meta(meta_uuid)
+        )
+
+        if not to_remove:
+            return 0
+
+        # -- Any child components which are not being removed are moved
+        # -- to the parent of the highest removed component above them
+        reparent = dict()
+        top_level = list()
+
+        for meta_uuid in index.uuids():
+            parent_uuid = index.parent(meta_uuid)
+            skeletal_root = index.roots(meta_uuid)['skeleton']
+
+            if meta_uuid in to_remove:
+                if parent_uuid not in to_remove:
+                    top_level.append(skeletal_root)
+
+                continue
+
+            if parent_uuid not in to_remove:
+                continue
+
+            while index.parent(parent_uuid) in to_remove:
+                parent_uuid = index.parent(parent_uuid)
+
+            reparent.setdefault(
+                index.roots(parent_uuid)['skeleton'].getParent(),
+                list(),
+            ).append(skeletal_root)
+
+        for parent, children in reparent.items():
+            pm.parent(children, parent)
+
+        # -- Now we can delete the nodes relating to the components
+        guide_roots = list()
+
+        for meta_uuid in to_remove:
+            guide_roots.extend(
+                index.meta(meta_uuid).attr(config.GUIDE_ROOT_LINK_ATTR).inputs(),
+            )
+
+        # -- A single missing node would stop a whole delete, so we only
+        # -- delete those which still exist. The meta nodes can be found
+        # -- directly from their uuids.
+        for names in [
+            [node.longName() for node in guide_roots if node.exists()],
+            [node.longName() for node in top_level if node.exists()],
+            list(to_remove),
+        ]:
+            paths = cmds.ls(names, long=True) if names else list()
+
+            if not paths:
+                continue
+
+            try:
+                cmds.delete(_top_level_paths(paths))
+
+            except Exception:
+                log.exception('')
+
+        return len(to_remove)
+
     # --------------------------------------------------------------------------
     def edit(self):
         """
@@ -423,6 +576,19 @@ class Rig(object):
         During this process all the stored process plugins will have their
         snapshot and pre functions called.
 
+        :return: True if the rig enters edit mode successfully.
+        """
+        with utils.profile.section('Rig.edit', 'rig'):
+            return self._edit(BuildContext(self))
+
+    # --------------------------------------------------------------------------
+    def _edit(self, context):
+        """
+        Performs the work of Rig.edit
+
+        :param context: The context shared between the process plugins
+        :type context: BuildContext
+
         :return: True if the rig enters edit mode successfully.
         """
         # -- If we're already in an editable state we do not need
@@ -434,14 +600,30 @@ class Rig(object):
         # -- Before removing the control rig we need to give all our
         # -- processes to the opportunity to snapshop the rig and
         # -- perform any pre-processes
-        for proc in self.factories.processes.plugins():
-            proc(self).snapshot()
+        context.invalidate()
+
+        for proc in context.processes():
+            with utils.profile.section('%s.snapshot' % proc.identifier, 'process'):
+                proc.snapshot()
 
-        # -- Now we must remove the control rig
+        # -- Now we must remove the control rig, along with any matrix
+        # -- bindings which are not removed with it
         pm.delete(self.control_roots())
 
-        for proc in self.factories.processes.plugins():
-            proc(self).post_edit()
+        _unbind_matrix(
+            cmds.ls(
+                self.skeleton_org().longName(),
+                dag=True,
+                type='joint',
+                long=True,
+            ) or list(),
+        )
+
+        context.invalidate()
+
+        for proc in context.processes():
+            with utils.profile.section('%s.post_edit' % proc.identifier, 'process'):
+                proc.post_edit()
 
         # -- Show all guides
         for guide_root in self.guide_roots():
@@ -456,15 +638,69 @@ class Rig(object):
         return True
 
     # --------------------------------------------------------------------------
-    def build(self):
+    def build(self, incremental=False):
         """
         This builds the rig. It first places the rig into an editable
         state and removes any guide infrastructure. It will then proceed
         to build the control rig before executing the post functions of
         all the stored processes.
 
+        Every build is profiled, and the profile can be accessed through
+        ```rig.last_profile``` once the build is complete.
+
+        :param incremental: If True, and the rig is already built, only the
+            components which have changed since the last build (along with
+            any components below them) are torn down and rebuilt. See
+            ```Rig.build_incremental``` for details.
+        :type incremental: bool
+
+        :return: True if the build was successful
+        """
+        # -- Re-read the names in use from the scene once per build,
+        # -- rather than trusting what we learned previously
+        config.allocator().reset()
+
+        # -- If we're already being profiled (such as when a build is
+        # -- called by another build) we record into that profile
+        if utils.profile.active():
+            return self._build(incremental)
+
+        # -- Every build records its wall time and node counts, but
+        # -- commands are only counted when profiling is requested
+        with utils.profile.Profiler('Rig.build') as profiler:
+            with profiler.section('Rig.build', 'rig'):
+                result = self._build(incremental)
+
+        self.last_profile = profiler
+
+        # -- Write out the trace if we have been requested to
+        trace_path = profiler.dump()
+
+        if trace_path:
+            log.info('Build profile written to : %s', trace_path)
+
+        return result
+
+    # --------------------------------------------------------------------------
+    def _build(self, incremental=False):
+        """
+        Performs the work of Rig.build
+
+        :param incremental: If True, and the rig is already built, only the
+            changed components are rebuilt.
+        :type incremental: bool
+
         :return: True if the build was successful
         """
+        # -- If we're asked for an incremental build and we have a
+        # -- control rig to build upon then we defer to that mechanism
+        if incremental and self.control_roots():
+            return self._build_incremental()
+
+        # -- All the processes share a single context throughout the
+        # -- build
+        context = BuildContext(self)
+
         # -- Log the action of starting a rig build
         log.info('Commencing rig build.')
 
@@ -479,10 +715,14 @@ class Rig(object):
         self.node().isClean.set(False)
 
         # -- Ensure the rig is in an editable state
-        self.edit()
+        with utils.profile.section('Rig.edit', 'rig'):
+            self._edit(context)
 
-        for proc in self.factories.processes.plugins():
-            proc(self).pre_build()
+        context.invalidate()
+
+        for proc in context.processes():
+            with utils.profile.section('%s.pre_build' % proc.identifier, 'process'):
+                proc.pre_build()
 
         # -- Hide all guides
         for guide_root in self.guide_roots():
@@ -493,301 +733,1392 @@ class Rig(object):
             component = Component.get(guide_root)
             component.unlink_guide()
 
+        # -- Collate the skeletal nodes of each component in a single
+        # -- pass so we can fingerprint the components as we build them
+        skeleton_roots = self.skeleton_roots()
+        membership = self._skeleton_membership(skeleton_roots)
+
         # -- Finally we can start cycling components and requested
         # -- a control build
-        for skeleton_component_root in self.skeleton_roots():
-
-            # -- Attempt to find the specific control parent
-            rig_parent = self.control_org()
-            component_parent = skeleton_component_root.getParent()
-
-            if component_parent.hasAttr(config.BOUND):
-                for potential in component_parent.attr(config.BOUND).inputs():
-                    rig_parent = potential
-                    break
-
-            # -- Get a component class instance which is targeted at the
-            # -- skeletal component root
-            component_plugin = Component.get(skeleton_component_root)
-
-            log.debug('Starting build of : %s', component_plugin.identifier)
-
-            try:
-                # -- Build the rig, generating a control component org
-                result = component_plugin.create_rig(
-                    parent=component_plugin.create_control_root(
-                        rig_parent,
-                        component_plugin.meta(),
-                    )
-                )
-
-                if not result:
-                    log.error('%s returned False during build.', component_plugin.identifier)
-                    return False
+        for skeleton_component_root in skeleton_roots:
 
-            except Exception:
-                log.exception('')
+            if not self._build_component(
+                    skeleton_component_root,
+                    membership[skeleton_component_root],
+            ):
                 return False
 
-            log.debug('\tBuild complete.')
-
         # -- Now we need to apply any behaviours
         for behaviour_block in self.assigned_behaviours():
-            # -- Instance the behaviour
-            behaviour_plugin = self.factories.behaviours.request(
-                behaviour_block['type'])(self)
-
-            # -- Update the options for the behaviour plugin
-            behaviour_plugin.options.update(behaviour_block['options'])
-
-            log.debug('Starting application of : %s' % behaviour_plugin.identifier)
-
-            try:
-                # -- Finally apply the behaviour
-                behaviour_plugin.apply()
-
-            except Exception:
-                log.exception('')
+            if not self._apply_behaviour(behaviour_block):
                 return False
 
-            log.debug('\tApplication complete.')
+        # -- Store the state of the behaviours we have just built
+        # -- so incremental builds can tell if they have changed
+        self._store_behaviour_fingerprint()
 
         # -- Mark the rig build as clean
         self.node().isClean.set(True)
 
         # -- Now the rig has been fully built we can run any post build
         # -- processes
-        for proc in self.factories.processes.plugins():
-            log.debug('Starting Process : %s' % proc.identifier)
-            try:
-                proc(self).post_build()
-
-            except Exception:
-                log.exception('')
-                return False
-
-            log.debug('\tProcess complete.')
+        if not self._post_build(context):
+            return False
 
         log.info('Build completed successfully.')
 
         return True
 
     # --------------------------------------------------------------------------
-    # noinspection PyTypeChecker
-    def add_behaviour(self, behaviour_type, index=None, **options):
+    def build_incremental(self):
         """
-        Adds a behaviour to a rig. A behaviour is different to a component
-        in that a a behaviour does not need a skeletal structure and they
-        are built in sequence after all components are built.
+        This will rebuild only the components of the rig which have changed
+        since the rig was last built. Each component is fingerprinted (using
+        its identifier, version, options, the world matrices of its skeletal
+        joints and the binding of its parent) and only those components
+        whose fingerprint no longer matches - along with any components
+        below them - are torn down and rebuilt.
 
-        Behaviours are typically used to create behaviours which utilise or
-        link multiple components together.
+        Any behaviours which reference a rebuilt component are re-applied,
+        and the components they reference are rebuilt alongside them. If
+        the behaviour list itself has changed a full build is performed.
 
-        Note: This method *does not* invoke the behaviour build it simply
-        adds the behaviour to the list of behaviours to be generated when the
-        rig is built.
+        Because the rest of the control rig remains in place, the post_edit
+        stage of the process plugins is not run. The snapshot and pre_build
+        stages are run before the components are fingerprinted, such that
+        the skeleton is compared in its build pose, and the post_build stage
+        is run once the changed components have been rebuilt.
 
-        :param behaviour_type: Type of behaviour to apply
-        :type behaviour_type: str
+        If the rig is not currently built, this will perform a full build.
 
-        :param index: Where is the behaviour list you want the behaviour
-            to be placed. By default the behaviour is added to the end
-            of the list.
-        :type index: int
+        :return: True if the build was successful
+        """
+        return self.build(incremental=True)
 
-        :param options: Any keyword arguments to be passed down to the
-            behaviour.
-        :return:
+    # --------------------------------------------------------------------------
+    def _build_incremental(self):
         """
-        # -- Check to ensure we have a control rig
-        # if not self.control_roots():
-        #     log.warning('Cannot apply behaviours when not in rig mode')
+        Performs the work of Rig.build_incremental
 
-        # -- Ensure the behaviour is accessible
-        if behaviour_type not in self.factories.behaviours.identifiers():
-            log.error('%s could not be found.', behaviour_type)
-            return False
+        :return: True if the build was successful
+        """
+        # -- If there is no control rig then there is nothing we can
+        # -- build upon
+        if not self.control_roots():
+            return self._build()
 
-        # -- Get the current behaviour data
-        current_data = self.assigned_behaviours()
+        # -- If the behaviours have changed we cannot determine what
+        # -- they were originally applied to, so we need a full build
+        if self._behaviour_fingerprint() != self._stored_behaviour_fingerprint():
+            log.info('Behaviours have changed, performing a full build.')
+            return self._build()
 
-        # -- Create a data block to add it to
-        behaviour_data = dict(
-            type=behaviour_type,
-            options=options,
-            id=str(uuid.uuid4()),
-        )
+        log.info('Commencing incremental rig build.')
 
-        # -- Assign our data into the current data
-        if index is None:
-            current_data.append(behaviour_data)
+        # -- Give our processes the opportunity to snapshot the rig
+        # -- before we remove any of it, and then to put the rig into
+        # -- its build pose, so the skeleton is compared in the same
+        # -- pose it was fingerprinted in when it was built
+        context = BuildContext(self)
 
-        else:
-            current_data.insert(index, behaviour_data)
+        for proc in context.processes():
+            with utils.profile.section('%s.snapshot' % proc.identifier, 'process'):
+                proc.snapshot()
 
-        # -- Write the updated data back into the attribute
-        self.store_behaviour_data(current_data)
+        for proc in context.processes():
+            with utils.profile.section('%s.pre_build' % proc.identifier, 'process'):
+                proc.pre_build()
 
-        return True
+        skeleton_roots = self.skeleton_roots()
+        membership = self._skeleton_membership(skeleton_roots)
 
-    # --------------------------------------------------------------------------
-    def remove_behaviour(self, behaviour_id):
-        """
-        This will remove the behaviour with the given id. The id's of behaviours
-        can be found by calling ```rig.assigned_behaviours()```.
+        # -- Map every skeletal node to the component root which owns it
+        # -- so we can resolve component parents without further queries
+        owners = dict()
+        for skeleton_component_root, nodes in membership.items():
+            for node in nodes:
+                owners[node] = skeleton_component_root
 
-        :param behaviour_id: uuid of the behaviour to remove
-        :type behaviour_id: str
+        # -- Determine which components have changed since they were
+        # -- last built
+        dirty = set()
 
-        :return: True if the behaviour was removed
-        """
-        # -- Get the current behaviour manifest
-        current_data = self.assigned_behaviours()
+        for skeleton_component_root in skeleton_roots:
+            component_plugin = Component.get(skeleton_component_root)
 
-        # -- Look for a behaviour with the given behaviour id
-        for idx, behaviour_data in enumerate(current_data):
-            if behaviour_data['id'] == behaviour_id:
-                current_data.pop(idx)
+            fingerprint = component_plugin.fingerprint(
+                membership[skeleton_component_root],
+            )
 
-                self.store_behaviour_data(current_data)
-                return True
+            if fingerprint != component_plugin.stored_fingerprint():
+                log.debug('Component is dirty : %s', skeleton_component_root)
+                dirty.add(skeleton_component_root)
 
-        return False
+        # -- Expand the dirty components to include their children and
+        # -- any components tied to them through behaviours
+        behaviour_blocks = self.assigned_behaviours()
+        behaviours_to_apply = set()
 
-    # --------------------------------------------------------------------------
-    def shift_behaviour_order(self, behaviour_id, shift_offset):
-        """
-        Behaviours are built in sequence, this method allows you to shift
-        a behaviour forward or backward in the sequence.
+        while True:
+            dirty = self._expand_to_children(skeleton_roots, dirty, owners)
+            expanded = False
 
-        :param behaviour_id: The uuid of the behaviour you want to shift,
-            which can be found by calling ```rig.assigned_behaviours()```
-        :type behaviour_id: str
+            for idx, behaviour_block in enumerate(behaviour_blocks):
 
-        :param shift_offset: The offset you want to shift by, so a value
-            of 1 would shift it down the list by one, whilst a value of -1
-            would shift it up once in the list
-        :type shift_offset: int
+                if idx in behaviours_to_apply:
+                    continue
 
-        :return: True if the operation was successful
-        """
-        # -- Get the current behaviour manifest
-        current_data = self.assigned_behaviours()
+                referenced = self._behaviour_components(behaviour_block)
 
-        # -- Look for a behaviour with the given behaviour id
-        for idx, behaviour_data in enumerate(current_data):
-            if behaviour_data['id'] == behaviour_id:
-                # -- Offset the data be the required amount
-                current_data.insert(
-                    current_data.index(behaviour_data) + shift_offset,
-                    current_data.pop(current_data.index(behaviour_data)),
-                )
+                if not referenced.intersection(dirty):
+                    continue
 
-                self.store_behaviour_data(current_data)
-                return True
+                behaviours_to_apply.add(idx)
 
-        return False
+                if not referenced.issubset(dirty):
+                    dirty.update(referenced)
+                    expanded = True
 
-    # --------------------------------------------------------------------------
-    def store_behaviour_data(self, behaviour_data):
-        """
-        Convenience function for storing the entire behaviour list data
-        back into the rig. This is useful if you want to make direct
-        modifications to the data.
+            if not expanded:
+                break
 
-        :param behaviour_data: data structure to the same standards of that
-            returned by calling ```rig.assigned_behaviours()```
-        :type behaviour_data: list
+        if not dirty:
+            log.info('Rig is up to date.')
+            return True
 
-        :return: None
-        """
-        # -- Now write the data into the attribute
-        self.meta().attr(config.BEHAVIOUR_DATA).set(
-            json.dumps(behaviour_data),
-        )
+        self.node().isClean.set(False)
 
-    # --------------------------------------------------------------------------
-    def guide_roots(self):
-        """
-        Returns all the active guide roots within the rig.
+        # -- Remove the control roots of all the dirty components. Any
+        # -- which are below another dirty component will be removed
+        # -- with it.
+        to_delete = list()
 
-        :return: list of all the guide roots
-        """
-        results = []
+        for skeleton_component_root in skeleton_roots:
+            if skeleton_component_root not in dirty:
+                continue
 
-        children = self.guide_org().getChildren(allDescendents=True)
-        for child in reversed(children):
-            if Component.is_component_root(child):
-                results.append(child)
+            component_plugin = Component.get(skeleton_component_root)
+            control_root = component_plugin.control_root()
 
-        return results
+            if control_root:
+                to_delete.append(control_root)
 
-    # --------------------------------------------------------------------------
-    def control_roots(self):
-        """
-        Returns all the component roots within the control hierarchy
-        of the rig
+        pm.delete(to_delete)
 
-        :return: list (pm.nt.DagNode, ...)
-        """
-        results = []
+        _unbind_matrix(
+            [
+                node.longName()
+                for skeleton_component_root in dirty
+                for node in membership[skeleton_component_root]
+            ],
+        )
 
-        children = self.control_org().getChildren(allDescendents=True)
-        for child in reversed(children):
-            if Component.is_component_root(child):
-                results.append(child)
+        # -- Rebuild the dirty components in hierarchical order
+        for skeleton_component_root in skeleton_roots:
+            if skeleton_component_root not in dirty:
+                continue
 
-        return results
+            if not self._build_component(
+                    skeleton_component_root,
+                    membership[skeleton_component_root],
+            ):
+                return False
 
-    # --------------------------------------------------------------------------
+        # -- Re-apply any behaviours which touched the rebuilt components,
+        # -- retaining their original order
+        for idx, behaviour_block in enumerate(behaviour_blocks):
+            if idx in behaviours_to_apply:
+                if not self._apply_behaviour(behaviour_block):
+                    return False
+
+        self.node().isClean.set(True)
+
+        if not self._post_build(context):
+            return False
+
+        log.info(
+            'Incremental build completed successfully (%s of %s components).',
+            len(dirty),
+            len(skeleton_roots),
+        )
+
+        return True
+
+    # --------------------------------------------------------------------------
+    def _build_component(self, skeleton_component_root, skeletal_nodes):
+        """
+        Builds the control rig for the component represented by the given
+        skeletal root, storing the fingerprint of the component on success.
+
+        :param skeleton_component_root: Skeletal root of the component
+        :type skeleton_component_root: pm.nt.Joint
+
+        :param skeletal_nodes: The joints which belong to the component
+        :type skeletal_nodes: list(pm.nt.Joint, ...)
+
+        :return: True if the build was successful
+        """
+        # -- Attempt to find the specific control parent
+        rig_parent = self.control_org()
+        component_parent = skeleton_component_root.getParent()
+
+        if component_parent.hasAttr(config.BOUND):
+            for potential in component_parent.attr(config.BOUND).inputs():
+                rig_parent = potential
+                break
+
+        # -- Get a component class instance which is targeted at the
+        # -- skeletal component root
+        component_plugin = Component.get(skeleton_component_root)
+
+        # -- Fingerprint the component before it is built, whilst the
+        # -- skeleton is free of any control rig influence
+        fingerprint = component_plugin.fingerprint(skeletal_nodes)
+
+        log.debug('Starting build of : %s', component_plugin.identifier)
+
+        try:
+            # -- Build the rig, generating a control component org
+            with utils.profile.section(component_plugin.identifier, 'component'):
+                result = component_plugin.create_rig(
+                    parent=component_plugin.create_control_root(
+                        rig_parent,
+                        component_plugin.meta(),
+                    )
+                )
+
+            if not result:
+                log.error('%s returned False during build.', component_plugin.identifier)
+                return False
+
+        except Exception:
+            log.exception('')
+            return False
+
+        component_plugin.store_fingerprint(fingerprint)
+
+        log.debug('\tBuild complete.')
+
+        return True
+
+    # --------------------------------------------------------------------------
+    def _apply_behaviour(self, behaviour_block):
+        """
+        Instances and applies the behaviour described by the given
+        behaviour block.
+
+        :param behaviour_block: Behaviour dictionary, as returned by
+            ```rig.assigned_behaviours()```
+        :type behaviour_block: dict
+
+        :return: True if the behaviour was applied successfully
+        """
+        # -- Instance the behaviour
+        behaviour_plugin = self.factories.behaviours.request(
+            behaviour_block['type'])(self)
+
+        # -- Update the options for the behaviour plugin
+        behaviour_plugin.options.update(behaviour_block['options'])
+
+        log.debug('Starting application of : %s' % behaviour_plugin.identifier)
+
+        try:
+            # -- Finally apply the behaviour
+            with utils.profile.section(behaviour_plugin.identifier, 'behaviour'):
+                behaviour_plugin.apply()
+
+        except Exception:
+            log.exception('')
+            return False
+
+        log.debug('\tApplication complete.')
+
+        return True
+
+    # --------------------------------------------------------------------------
+    def _post_build(self, context):
+        """
+        Runs the post build stage of all the process plugins.
+
+        :param context: The context shared between the process plugins
+        :type context: BuildContext
+
+        :return: True if all the processes ran successfully
+        """
+        # -- The control rig has changed since the processes last
+        # -- looked at it
+        context.invalidate()
+
+        for proc in context.processes():
+            log.debug('Starting Process : %s' % proc.identifier)
+            try:
+                with utils.profile.section('%s.post_build' % proc.identifier, 'process'):
+                    proc.post_build()
+
+            except Exception:
+                log.exception('')
+                return False
+
+            log.debug('\tProcess complete.')
+
+        return True
+
+    # --------------------------------------------------------------------------
+    # noinspection PyMethodMayBeStatic
+    def _skeleton_membership(self, skeleton_roots):
+        """
+        Resolves which joints belong to which component in a single pass
+        over the skeleton.
+
+        :param skeleton_roots: List of skeletal component roots
+        :type skeleton_roots: list(pm.nt.DagNode, ...)
+
+        :return: dict(skeletal_root: list(pm.nt.Joint, ...))
+        """
+        roots_by_path = dict(
+            (root.longName(), root)
+            for root in skeleton_roots
+        )
+
+        membership = dict(
+            (root, [root])
+            for root in skeleton_roots
+        )
+
+        for root in skeleton_roots:
+            for joint in root.getChildren(allDescendents=True, type='joint'):
+
+                # -- Skip any joints which are component roots themselves
+                path = joint.longName()
+
+                if path in roots_by_path:
+                    continue
+
+                # -- Walk up the path until we find the nearest component
+                # -- root, as that is the component which owns this joint
+                parts = path.split('|')
+                owner = None
+
+                while parts:
+                    parts.pop()
+
+                    owner = roots_by_path.get('|'.join(parts))
+
+                    if owner:
+                        break
+
+                if owner == root:
+                    membership[root].append(joint)
+
+        return membership
+
+    # --------------------------------------------------------------------------
+    # noinspection PyMethodMayBeStatic
+    def _expand_to_children(self, skeleton_roots, dirty, owners):
+        """
+        Expands the given set of dirty component roots to include all the
+        components which sit below them.
+
+        :param skeleton_roots: List of skeletal component roots in
+            hierarchical order
+        :type skeleton_roots: list(pm.nt.DagNode, ...)
+
+        :param dirty: Set of dirty skeletal component roots
+        :type dirty: set
+
+        :param owners: Dictionary of skeletal nodes to the skeletal component
+            root which owns them
+        :type owners: dict
+
+        :return: set
+        """
+        dirty = set(dirty)
+
+        for skeleton_component_root in skeleton_roots:
+            parent_root = owners.get(skeleton_component_root.getParent())
+
+            if parent_root in dirty:
+                dirty.add(skeleton_component_root)
+
+        return dirty
+
+    # --------------------------------------------------------------------------
+    # noinspection PyMethodMayBeStatic
+    def _behaviour_components(self, behaviour_block):
+        """
+        Returns the skeletal roots of all the components which have nodes
+        referenced within the options of the given behaviour.
+
+        :param behaviour_block: Behaviour dictionary, as returned by
+            ```rig.assigned_behaviours()```
+        :type behaviour_block: dict
+
+        :return: set(pm.nt.DagNode, ...)
+        """
+        components = set()
+
+        for value in behaviour_block['options'].values():
+
+            # -- Only string options can reference nodes
+            try:
+                tokens = re.split('[;=,]', value)
+
+            except TypeError:
+                continue
+
+            for token in tokens:
+                token = token.strip()
+
+                if not token or not pm.objExists(token):
+                    continue
+
+                # -- Walk upward until we find the component which
+                # -- owns this node
+                node = pm.PyNode(token)
+
+                while node:
+                    meta_node = Component.is_component_root(node)
+
+                    if meta_node:
+                        components.update(
+                            meta_node.attr(config.SKELETON_ROOT_LINK_ATTR).inputs(),
+                        )
+                        break
+
+                    node = node.getParent()
+
+        return components
+
+    # --------------------------------------------------------------------------
+    def _behaviour_fingerprint(self):
+        """
+        Returns a hash representing the current behaviour data.
+
+        :return: str
+        """
+        return hashlib.md5(
+            self.meta().attr(config.BEHAVIOUR_DATA).get().encode('utf-8'),
+        ).hexdigest()
+
+    # --------------------------------------------------------------------------
+    def _stored_behaviour_fingerprint(self):
+        """
+        Returns the behaviour hash which was stored during the last build.
+
+        :return: str or None
+        """
+        if not self.meta().hasAttr(config.BEHAVIOUR_FINGERPRINT):
+            return None
+
+        return self.meta().attr(config.BEHAVIOUR_FINGERPRINT).get()
+
+    # --------------------------------------------------------------------------
+    def _store_behaviour_fingerprint(self):
+        """
+        Stores the hash of the current behaviour data onto the rig meta.
+
+        :return: None
+        """
+        if not self.meta().hasAttr(config.BEHAVIOUR_FINGERPRINT):
+            self.meta().addAttr(
+                config.BEHAVIOUR_FINGERPRINT,
+                dt='string',
+            )
+
+        self.meta().attr(config.BEHAVIOUR_FINGERPRINT).set(
+            self._behaviour_fingerprint(),
+        )
+
+    # --------------------------------------------------------------------------
+    # noinspection PyTypeChecker
+    def add_behaviour(self, behaviour_type, index=None, **options):
+        """
+        Adds a behaviour to a rig. A behaviour is different to a component
+        in that a a behaviour does not need a skeletal structure and they
+        are built in sequence after all components are built.
+
+        Behaviours are typically used to create behaviours which utilise or
+        link multiple components together.
+
+        Note: This method *does not* invoke the behaviour build it simply
+        adds the behaviour to the list of behaviours to be generated when the
+        rig is built.
+
+        :param behaviour_type: Type of behaviour to apply
+        :type behaviour_type: str
+
+        :param index: Where is the behaviour list you want the behaviour
+            to be placed. By default the behaviour is added to the end
+            of the list.
+        :type index: int
+
+        :param options: Any keyword arguments to be passed down to the
+            behaviour.
+        :return:
+        """
+        # -- Check to ensure we have a control rig
+        # if not self.control_roots():
+        #     log.warning('Cannot apply behaviours when not in rig mode')
+
+        # -- Ensure the behaviour is accessible
+        if behaviour_type not in self.factories.behaviours.identifiers():
+            log.error('%s could not be found.', behaviour_type)
+            return False
+
+        # -- Get the current behaviour data
+        current_data = self.assigned_behaviours()
+
+        # -- Create a data block to add it to
+        behaviour_data = dict(
+            type=behaviour_type,
+            options=options,
+            id=str(uuid.uuid4()),
+        )
+
+        # -- Assign our data into the current data
+        if index is None:
+            current_data.append(behaviour_data)
+
+        else:
+            current_data.insert(index, behaviour_data)
+
+        # -- Write the updated data back into the attribute
+        self.store_behaviour_data(current_data)
+
+        return True
+
+    # --------------------------------------------------------------------------
+    def remove_behaviour(self, behaviour_id):
+        """
+        This will remove the behaviour with the given id. The id's of behaviours
+        can be found by calling ```rig.assigned_behaviours()```.
+
+        :param behaviour_id: uuid of the behaviour to remove
+        :type behaviour_id: str
+
+        :return: True if the behaviour was removed
+        """
+        # -- Get the current behaviour manifest
+        current_data = self.assigned_behaviours()
+
+        # -- Look for a behaviour with the given behaviour id
+        for idx, behaviour_data in enumerate(current_data):
+            if behaviour_data['id'] == behaviour_id:
+                current_data.pop(idx)
+
+                self.store_behaviour_data(current_data)
+                return True
+
+        return False
+
+    # --------------------------------------------------------------------------
+    def shift_behaviour_order(self, behaviour_id, shift_offset):
+        """
+        Behaviours are built in sequence, this method allows you to shift
+        a behaviour forward or backward in the sequence.
+
+        :param behaviour_id: The uuid of the behaviour you want to shift,
+            which can be found by calling ```rig.assigned_behaviours()```
+        :type behaviour_id: str
+
+        :param shift_offset: The offset you want to shift by, so a value
+            of 1 would shift it down the list by one, whilst a value of -1
+            would shift it up once in the list
+        :type shift_offset: int
+
+        :return: True if the operation was successful
+        """
+        # -- Get the current behaviour manifest
+        current_data = self.assigned_behaviours()
+
+        # -- Look for a behaviour with the given behaviour id
+        for idx, behaviour_data in enumerate(current_data):
+            if behaviour_data['id'] == behaviour_id:
+                # -- Offset the data be the required amount
+                current_data.insert(
+                    current_data.index(behaviour_data) + shift_offset,
+                    current_data.pop(current_data.index(behaviour_data)),
+                )
+
+                self.store_behaviour_data(current_data)
+                return True
+
+        return False
+
+    # --------------------------------------------------------------------------
+    def store_behaviour_data(self, behaviour_data):
+        """
+        Convenience function for storing the entire behaviour list data
+        back into the rig. This is useful if you want to make direct
+        modifications to the data.
+
+        :param behaviour_data: data structure to the same standards of that
+            returned by calling ```rig.assigned_behaviours()```
+        :type behaviour_data: list
+
+        :return: None
+        """
+        # -- Now write the data into the attribute
+        self.meta().attr(config.BEHAVIOUR_DATA).set(
+            json.dumps(behaviour_data),
+        )
+
+    # --------------------------------------------------------------------------
+    def component_index(self):
+        """
+        Returns the index of all the components within this rig. The index
+        is cached and is only rebuilt if the components of the rig have
+        changed since it was last built.
+
+        :return: crab.ComponentIndex
+        """
+        if not self._component_index or not self._component_index.is_valid():
+            self._component_index = ComponentIndex(self)
+
+        return self._component_index
+
+    # --------------------------------------------------------------------------
+    def guide_roots(self):
+        """
+        Returns all the active guide roots within the rig.
+
+        :return: list of all the guide roots
+        """
+        return self.component_index().guide_roots()
+
+    # --------------------------------------------------------------------------
+    def control_roots(self):
+        """
+        Returns all the component roots within the control hierarchy
+        of the rig
+
+        :return: list (pm.nt.DagNode, ...)
+        """
+        return self.component_index().control_roots()
+
+    # --------------------------------------------------------------------------
+    def skeleton_roots(self):
+        """
+        Returns all the component roots within the skeletal hierarchy
+        of the rig
+
+        :return: list(pm.nt.DagNode, ...)
+        """
+        return self.component_index().skeleton_roots()
+
+    # --------------------------------------------------------------------------
+    def assigned_behaviours(self):
+        """
+        Returns the list of behaviours assigned to the rig. Each behaviour
+        is represented by a dictionary.
+
+        :return: list(behaviour_dictionary, ...)
+        """
+        return json.loads(self.meta().attr(config.BEHAVIOUR_DATA).get())
+
+    # --------------------------------------------------------------------------
+    def components(self):
+        components = []
+
+        for skeleton_component_root in self.skeleton_roots():
+            log.debug(skeleton_component_root, Component.get(skeleton_component_root))
+            components.append(Component.get(skeleton_component_root))
+
+        return components
+
+    # --------------------------------------------------------------------------
+    @classmethod
+    def all(cls, namespace=None):
+        """
+        Returns all the crab rigs within the scene. The rigs are served
+        from the rig registry, so the scene is only searched when rigs
+        may have been added or removed.
+
+        :param namespace: If given, only rigs within this namespace are
+            returned, with an empty string representing the root namespace
+        :type namespace: str
+
+        :return: list(crab.Rig, crab.Rig, ...)
+        """
+        return rig_registry().rigs(namespace=namespace)
+
+
+# ------------------------------------------------------------------------------
+class RigRegistry(object):
+    """
+    The rig registry holds all the rigs within the scene, keyed by the
+    namespace they reside in. The whole scene is searched the first time
+    the registry is queried, and from then on only the namespaces in which
+    a meta node has been added, removed or renamed are searched again.
+    Opening a scene or loading a reference causes the whole scene to be
+    searched again.
+
+    The same rig instances are returned each time, with their meta nodes
+    already resolved. You should typically access the registry through
+    ```crab.Rig.all()```
+
+    .. code-block:: python
+
+        >>> import crab
+        >>>
+        >>> for rig in crab.Rig.all(namespace='character_a'):
+        ...     print(rig.node())
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self):
+
+        # -- This holds the list of rigs in each namespace, and is None
+        # -- when the whole scene needs to be searched
+        self._rigs = None
+
+        # -- These are the namespaces which need to be searched again
+        self._dirty = set()
+
+    # --------------------------------------------------------------------------
+    def __repr__(self):
+        return '[RIG REGISTRY - Namespaces: %s]' % (
+            'Unknown' if self._rigs is None else len(self._rigs)
+        )
+
+    # --------------------------------------------------------------------------
+    def invalidate(self, namespace=None):
+        """
+        Marks the rigs in the given namespace as needing to be found
+        again. If no namespace is given then all the rigs are forgotten.
+
+        :param namespace: The namespace to invalidate
+        :type namespace: str
+
+        :return: None
+        """
+        if namespace is None:
+            self._rigs = None
+            self._dirty = set()
+            return
+
+        self._dirty.add(namespace.strip(':'))
+
+    # --------------------------------------------------------------------------
+    def namespaces(self):
+        """
+        Returns all the namespaces which contain rigs.
+
+        :return: list(str, ...)
+        """
+        self._update()
+
+        return sorted(
+            namespace
+            for namespace, rigs in self._rigs.items()
+            if rigs
+        )
+
+    # --------------------------------------------------------------------------
+    def rigs(self, namespace=None):
+        """
+        Returns the rigs within the scene.
+
+        :param namespace: If given, only rigs within this namespace are
+            returned, with an empty string representing the root namespace
+        :type namespace: str
+
+        :return: list(crab.Rig, ...)
+        """
+        self._update()
+
+        if namespace is not None:
+            return list(self._rigs.get(namespace.strip(':'), list()))
+
+        return [
+            rig
+            for namespace in sorted(self._rigs)
+            for rig in self._rigs[namespace]
+        ]
+
+    # --------------------------------------------------------------------------
+    def _update(self):
+        """
+        Searches the scene for any rigs which are not known.
+
+        :return: None
+        """
+        if self._rigs is None:
+            self._rigs = self._find('*.%s' % config.RIG_ROOT_LINK_ATTR, recursive=True)
+            self._dirty = set()
+            return
+
+        while self._dirty:
+            namespace = self._dirty.pop()
+
+            pattern = '*.%s' % config.RIG_ROOT_LINK_ATTR
+
+            if namespace:
+                pattern = '%s:%s' % (namespace, pattern)
+
+            self._rigs[namespace] = self._find(pattern).get(namespace, list())
+
+    # --------------------------------------------------------------------------
+    def _find(self, pattern, recursive=False):
+        """
+        Finds all the rigs whose meta node host attributes match the
+        given pattern, resolving all of their rig roots in one go.
+
+        :param pattern: Pattern of the host attributes to search for
+        :type pattern: str
+
+        :param recursive: If True, all namespaces are searched
+        :type recursive: bool
+
+        :return: dict(str: list(crab.Rig, ...))
+        """
+        plugs = cmds.ls(pattern, recursive=recursive) or list()
+
+        if not plugs:
+            return dict()
+
+        connections = cmds.listConnections(
+            plugs,
+            source=True,
+            destination=False,
+            connections=True,
+        ) or list()
+
+        rigs = dict()
+
+        # -- Connections are given as pairs of the host attribute
+        # -- followed by the rig root
+        for plug, rig_root in zip(connections[::2], connections[1::2]):
+            meta_name = plug.split('.', 1)[0]
+
+            rig = Rig(pm.PyNode(rig_root))
+            rig._meta = pm.PyNode(meta_name)
+
+            namespace = meta_name.rsplit(':', 1)[0] if ':' in meta_name else ''
+            rigs.setdefault(namespace, list()).append(rig)
+
+        return rigs
+
+
+# ------------------------------------------------------------------------------
+def rig_registry():
+    """
+    Returns the rig registry, creating it if it does not yet exist.
+
+    :return: RigRegistry
+    """
+    global _RIG_REGISTRY
+
+    if _RIG_REGISTRY is None:
+        _RIG_REGISTRY = RigRegistry()
+
+    # -- Ensure we're told whenever a meta node enters or leaves the
+    # -- scene. If we were not listening then we cannot know what
+    # -- has changed.
+    if not utils.tracking.is_name_listener(_on_rig_name_changed):
+        utils.tracking.add_name_listener(_on_rig_name_changed)
+        _RIG_REGISTRY.invalidate()
+
+    return _RIG_REGISTRY
+
+
+# ------------------------------------------------------------------------------
+def _on_rig_name_changed(old_name, new_name):
+    """
+    Invalidates the namespace of any meta node which has been added,
+    removed or renamed.
+
+    :param old_name: The name leaving the scene, if any
+    :type old_name: str
+
+    :param new_name: The name entering the scene, if any
+    :type new_name: str
+
+    :return: None
+    """
+    if _RIG_REGISTRY is None:
+        return
+
+    # -- This tells us everything may have changed
+    if old_name is None and new_name is None:
+        _RIG_REGISTRY.invalidate()
+        return
+
+    for name in (old_name, new_name):
+
+        if not name:
+            continue
+
+        if config.get_category(name.rsplit(':', 1)[-1]) != config.META:
+            continue
+
+        _RIG_REGISTRY.invalidate(
+            name.rsplit(':', 1)[0] if ':' in name else '',
+        )
+
+
+# ------------------------------------------------------------------------------
+class ComponentIndex(object):
+    """
+    This is an index of all the components within a rig, holding the
+    skeleton, guide and control roots of each component along with their
+    parent and child components. Components are keyed by the uuid of their
+    meta node.
+
+    The index is built in a single pass over the component meta nodes
+    and is only valid until a component meta node or one of its root links
+    within the rig namespace changes, or one of the roots is moved. Therefore
+    you should typically access it through ```rig.component_index()``` which
+    will rebuild it when required.
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self, rig):
+        self.rig = rig
+
+        rig_node = rig.node()
+        self._namespace = rig_node.namespace().rstrip(':') if rig_node else ''
+
+        # -- Store the component revision we were built at so we know
+        # -- when we are no longer valid
+        self._revision = _component_revision(self._namespace)
+
+        # -- The long names and uuids of all the roots, allowing us to
+        # -- tell whether any of them have been moved
+        self._root_paths = set()
+        self._root_uuids = list()
+
+        # -- Each entry holds the meta node and roots of the component
+        self._entries = dict()
+
+        self._parents = dict()
+        self._children = dict()
+
+        # -- These are the uuids of the components in hierarchical order
+        # -- within each of the rig orgs
+        self._skeleton_order = list()
+        self._guide_order = list()
+        self._control_order = list()
+
+        self._build()
+
+    # --------------------------------------------------------------------------
+    def is_valid(self):
+        """
+        Returns True if the components of the rig have not changed since
+        this index was built.
+
+        :return: bool
+        """
+        if self._revision != _component_revision(self._namespace):
+            return False
+
+        if not self._root_uuids:
+            return True
+
+        # -- Re-parenting or renaming a root alters the hierarchy of the
+        # -- components without touching their meta nodes, so we check
+        # -- the roots are all still where they were
+        return set(cmds.ls(self._root_uuids, long=True)) == self._root_paths
+
+    # --------------------------------------------------------------------------
+    def _build(self):
+        """
+        Populates the index from the meta nodes within the rig namespace.
+
+        :return: None
+        """
+        rig_node = self.rig.node()
+
+        if not rig_node:
+            return
+
+        # -- Find all the component meta nodes which share the namespace
+        # -- of the rig
+        meta_names = cmds.ls(
+            '%s*.%s' % (rig_node.namespace(), config.COMPONENT_MARKER),
+            objectsOnly=True,
+        ) or list()
+
+        if not meta_names:
+            return
+
+        meta_uuids = dict(
+            zip(
+                meta_names,
+                cmds.ls(meta_names, uuid=True),
+            )
+        )
+
+        link_attrs = {
+            config.SKELETON_ROOT_LINK_ATTR: 'skeleton',
+            config.GUIDE_ROOT_LINK_ATTR: 'guide',
+            config.CONTROL_ROOT_LINK_ATTR: 'control',
+        }
+
+        # -- Read all the root connections of all the meta nodes in
+        # -- a single call. This is given as a flat list of destination
+        # -- and source pairs.
+        connections = cmds.listConnections(
+            meta_names,
+            source=True,
+            destination=False,
+            connections=True,
+            plugs=True,
+        ) or list()
+
+        links = list()
+
+        for idx in range(0, len(connections), 2):
+            meta_name, attr_name = connections[idx].split('.', 1)
+
+            if attr_name in link_attrs:
+                links.append(
+                    (
+                        meta_name,
+                        link_attrs[attr_name],
+                        connections[idx + 1].split('.')[0],
+                    ),
+                )
+
+        # -- Resolve the long names of all the roots in one call
+        root_names = list(set(link[2] for link in links))
+        long_names = dict(
+            zip(
+                root_names,
+                cmds.ls(root_names, long=True) if root_names else list(),
+            )
+        )
+
+        paths = dict()
+
+        for meta_name, key, root_name in links:
+            paths.setdefault(
+                meta_uuids[meta_name],
+                dict(meta=meta_name),
+            )[key] = long_names[root_name]
+
+        # -- Only take the components whose skeleton resides within
+        # -- this rig
+        skeleton_org = self.rig.skeleton_org().longName()
+
+        paths = dict(
+            (meta_uuid, data)
+            for meta_uuid, data in paths.items()
+            if data.get('skeleton', '').startswith(skeleton_org + '|')
+        )
+
+        # -- Resolve the parent and child relationships of the components
+        # -- by walking up the skeletal paths
+        uuids_by_skeleton = dict(
+            (data['skeleton'], meta_uuid)
+            for meta_uuid, data in paths.items()
+        )
+
+        for meta_uuid, data in paths.items():
+            self._children[meta_uuid] = list()
+
+            parts = data['skeleton'].split('|')[:-1]
+            self._parents[meta_uuid] = None
+
+            while parts:
+                parent_uuid = uuids_by_skeleton.get('|'.join(parts))
+
+                if parent_uuid:
+                    self._parents[meta_uuid] = parent_uuid
+                    break
+
+                parts.pop()
+
+        # -- Sort the roots into the order they appear in the outliner,
+        # -- ensuring parents always come before their children
+        self._skeleton_order = self._ordered(
+            skeleton_org,
+            uuids_by_skeleton,
+        )
+
+        self._guide_order = self._ordered(
+            self.rig.guide_org().longName(),
+            dict(
+                (data['guide'], meta_uuid)
+                for meta_uuid, data in paths.items()
+                if 'guide' in data
+            ),
+        )
+
+        self._control_order = self._ordered(
+            self.rig.control_org().longName(),
+            dict(
+                (data['control'], meta_uuid)
+                for meta_uuid, data in paths.items()
+                if 'control' in data
+            ),
+        )
+
+        for meta_uuid in self._skeleton_order:
+            parent_uuid = self._parents[meta_uuid]
+
+            if parent_uuid:
+                self._children[parent_uuid].append(meta_uuid)
+
+        # -- Finally we convert our paths to nodes
+        for meta_uuid, data in paths.items():
+            self._entries[meta_uuid] = dict(
+                (key, pm.PyNode(value))
+                for key, value in data.items()
+            )
+
+            self._root_paths.update(
+                value
+                for key, value in data.items()
+                if key != 'meta'
+            )
+
+        if self._root_paths:
+            self._root_uuids = cmds.ls(list(self._root_paths), uuid=True)
+
+    # --------------------------------------------------------------------------
+    # noinspection PyMethodMayBeStatic
+    def _ordered(self, org, uuids_by_path):
+        """
+        Returns the uuids of the given paths in the order in which they
+        appear beneath the given org.
+
+        :param org: Long name of the org to search beneath
+        :type org: str
+
+        :param uuids_by_path: Dictionary of long names to uuids
+        :type uuids_by_path: dict
+
+        :return: list(str, ...)
+        """
+        if not uuids_by_path:
+            return list()
+
+        descendants = cmds.listRelatives(
+            org,
+            allDescendents=True,
+            fullPath=True,
+        ) or list()
+
+        return [
+            uuids_by_path[path]
+            for path in reversed(descendants)
+            if path in uuids_by_path
+        ]
+
+    # --------------------------------------------------------------------------
+    def _nodes(self, meta_uuids, key):
+        return [
+            self._entries[meta_uuid][key]
+            for meta_uuid in meta_uuids
+        ]
+
+    # --------------------------------------------------------------------------
+    def uuids(self):
+        """
+        Returns the uuids of all the components in hierarchical order.
+
+        :return: list(str, ...)
+        """
+        return list(self._skeleton_order)
+
+    # --------------------------------------------------------------------------
     def skeleton_roots(self):
         """
-        Returns all the component roots within the skeletal hierarchy
-        of the rig
+        Returns all the skeletal component roots in hierarchical order
 
         :return: list(pm.nt.DagNode, ...)
         """
-        results = []
+        return self._nodes(self._skeleton_order, 'skeleton')
 
-        children = self.skeleton_org().getChildren(allDescendents=True)
-        for child in reversed(children):
-            if Component.is_component_root(child):
-                results.append(child)
+    # --------------------------------------------------------------------------
+    def guide_roots(self):
+        """
+        Returns all the guide component roots in hierarchical order
 
-        return results
+        :return: list(pm.nt.DagNode, ...)
+        """
+        return self._nodes(self._guide_order, 'guide')
 
     # --------------------------------------------------------------------------
-    def assigned_behaviours(self):
+    def control_roots(self):
         """
-        Returns the list of behaviours assigned to the rig. Each behaviour
-        is represented by a dictionary.
+        Returns all the control component roots in hierarchical order
 
-        :return: list(behaviour_dictionary, ...)
+        :return: list(pm.nt.DagNode, ...)
         """
-        return json.loads(self.meta().attr(config.BEHAVIOUR_DATA).get())
+        return self._nodes(self._control_order, 'control')
 
     # --------------------------------------------------------------------------
-    def components(self):
-        components = []
+    def meta(self, meta_uuid):
+        """
+        Returns the meta node of the component with the given uuid
 
-        for skeleton_component_root in self.skeleton_roots():
-            log.debug(skeleton_component_root, Component.get(skeleton_component_root))
-            components.append(Component.get(skeleton_component_root))
+        :param meta_uuid: uuid of the component meta node
+        :type meta_uuid: str
 
-        return components
+        :return: pm.nt.Network or None
+        """
+        return self._entries.get(meta_uuid, dict()).get('meta')
 
     # --------------------------------------------------------------------------
-    @classmethod
-    def all(cls):
+    def roots(self, meta_uuid):
         """
-        Returns all the crab rigs within the scene
+        Returns a dictionary of the roots for the component with the given
+        uuid. The dictionary may contain 'skeleton', 'guide' and 'control'
+        keys depending on the state of the rig.
 
-        :return: list(crab.Rig, crab.Rig, ...)
+        :param meta_uuid: uuid of the component meta node
+        :type meta_uuid: str
+
+        :return: dict
         """
-        return [
-            Rig(attr.node().attr(config.RIG_ROOT_LINK_ATTR).inputs()[0])
-            for attr in pm.ls('*.%s' % config.RIG_ROOT_LINK_ATTR, recursive=True)
-        ]
+        return dict(
+            (key, value)
+            for key, value in self._entries.get(meta_uuid, dict()).items()
+            if key != 'meta'
+        )
+
+    # --------------------------------------------------------------------------
+    def parent(self, meta_uuid):
+        """
+        Returns the uuid of the parent component of the component with
+        the given uuid.
+
+        :param meta_uuid: uuid of the component meta node
+        :type meta_uuid: str
+
+        :return: str or None
+        """
+        return self._parents.get(meta_uuid)
+
+    # --------------------------------------------------------------------------
+    def children(self, meta_uuid, recursive=False):
+        """
+        Returns the uuids of the child components of the component with
+        the given uuid, in hierarchical order.
+
+        :param meta_uuid: uuid of the component meta node
+        :type meta_uuid: str
+
+        :param recursive: If true, all childrens children will also be
+            returned
+        :type recursive: bool
+
+        :return: list(str, ...)
+        """
+        children = list(self._children.get(meta_uuid, list()))
+
+        if not recursive:
+            return children
+
+        idx = 0
+        while idx < len(children):
+            children.extend(self._children[children[idx]])
+            idx += 1
+
+        return children
+
+
+# ------------------------------------------------------------------------------
+def _component_revision(namespace):
+    """
+    Returns the revision of the components within the given namespace,
+    which changes whenever a component meta node or one of its root links
+    within that namespace changes.
+
+    :param namespace: The namespace to get the revision for
+    :type namespace: str
+
+    :return: tuple(int, int)
+    """
+    # -- If we were not listening then we cannot know what has changed
+    if not utils.tracking.is_name_listener(_on_component_index_name_changed):
+        utils.tracking.add_name_listener(_on_component_index_name_changed)
+        utils.tracking.add_connection_listener(_on_component_index_connection_changed)
+        _invalidate_components(None)
+
+    return (
+        _COMPONENT_REVISIONS.get(None, 0),
+        _COMPONENT_REVISIONS.get(namespace, 0),
+    )
+
+
+# ------------------------------------------------------------------------------
+def _invalidate_components(namespace):
+    """
+    Increments the revision of the components within the given namespace,
+    or of the whole scene if the namespace is None.
+
+    :param namespace: The namespace which has changed
+    :type namespace: str or None
+
+    :return: None
+    """
+    _COMPONENT_REVISIONS[namespace] = _COMPONENT_REVISIONS.get(namespace, 0) + 1
+
+
+# ------------------------------------------------------------------------------
+def _on_component_index_name_changed(old_name, new_name):
+    """
+    Invalidates the components of the namespace of any meta node which
+    has been added, removed or renamed.
+
+    :param old_name: The name leaving the scene, if any
+    :type old_name: str
+
+    :param new_name: The name entering the scene, if any
+    :type new_name: str
+
+    :return: None
+    """
+    # -- This tells us everything may have changed
+    if old_name is None and new_name is None:
+        _invalidate_components(None)
+        return
+
+    for name in (old_name, new_name):
+
+        if not name:
+            continue
+
+        if config.get_category(name.rsplit(':', 1)[-1]) != config.META:
+            continue
+
+        _invalidate_components(
+            name.rsplit(':', 1)[0] if ':' in name else '',
+        )
+
+
+# ------------------------------------------------------------------------------
+def _on_component_index_connection_changed(source, destination):
+    """
+    Invalidates the components of the namespace of any component meta
+    node which has had one of its roots linked or unlinked.
+
+    :param source: The source plug of the connection
+    :type source: str
+
+    :param destination: The destination plug of the connection
+    :type destination: str
+
+    :return: None
+    """
+    node_name, _, attribute_name = destination.partition('.')
+
+    link_attrs = [
+        config.SKELETON_ROOT_LINK_ATTR,
+        config.CONTROL_ROOT_LINK_ATTR,
+        config.GUIDE_ROOT_LINK_ATTR,
+    ]
+
+    if attribute_name not in link_attrs:
+        return
+
+    _invalidate_components(
+        node_name.rsplit(':', 1)[0] if ':' in node_name else '',
+    )
 
 
 # ------------------------------------------------------------------------------
@@ -1033,7 +2364,7 @@ class Component(object):
             return None
 
         try:
-            meta_node.attr(config.CONTROL_ROOT_LINK_ATTR).inputs()[0]
+            return meta_node.attr(config.CONTROL_ROOT_LINK_ATTR).inputs()[0]
 
         except IndexError:
             return None
@@ -1053,7 +2384,7 @@ class Component(object):
             return None
 
         try:
-            meta_node.attr(config.GUIDE_ROOT_LINK_ATTR).inputs()[0]
+            return meta_node.attr(config.GUIDE_ROOT_LINK_ATTR).inputs()[0]
 
         except IndexError:
             return None
@@ -1102,6 +2433,111 @@ class Component(object):
             # -- to the next parent
             node = node.getParent()
 
+    # --------------------------------------------------------------------------
+    def fingerprint(self, skeletal_nodes=None):
+        """
+        Returns a hash which represents the current state of this component.
+        This takes into account the identifier, version and options of the
+        component along with the world matrices of its skeletal joints, the
+        binding of the node it is parented under and the binding mode.
+
+        :param skeletal_nodes: Optional list of the joints which belong to
+            this component. If not given all the joints below the skeletal
+            root (stopping at any other component roots) are used.
+        :type skeletal_nodes: list(pm.nt.Joint, ...)
+
+        :return: str
+        """
+        meta_node = self.meta()
+        skeletal_root = self.skeletal_root()
+
+        if skeletal_nodes is None:
+            skeletal_nodes = [skeletal_root]
+            to_process = list(skeletal_root.getChildren(type='joint'))
+
+            while to_process:
+                joint = to_process.pop(0)
+
+                if self.is_component_root(joint):
+                    continue
+
+                skeletal_nodes.append(joint)
+                to_process.extend(joint.getChildren(type='joint'))
+
+        # -- Take into account what we're parented under, and what that
+        # -- is bound to, as that defines where our control rig resides.
+        # -- These are identified by uuid so renaming them is not a change.
+        parent = skeletal_root.getParent()
+        binding = ''
+
+        if parent.hasAttr(config.BOUND):
+            binding = ';'.join(
+                _uuid(node)
+                for node in parent.attr(config.BOUND).inputs()
+            )
+
+        hasher = hashlib.md5()
+
+        for value in [
+                meta_node.attr(config.META_IDENTIFIER).get(),
+                meta_node.attr(config.META_VERSION).get(),
+                meta_node.attr(config.META_OPTIONS).get(),
+                _uuid(parent),
+                binding,
+                self.binding_mode(),
+        ]:
+            hasher.update(str(value).encode('utf-8'))
+
+        for joint in skeletal_nodes:
+            hasher.update(joint.name().encode('utf-8'))
+
+            # -- Round the matrix values to avoid floating point noise
+            # -- from causing false positives
+            for row in joint.getMatrix(worldSpace=True):
+                for value in row:
+                    hasher.update(
+                        ('%.4f' % (round(value, 4) + 0.0)).encode('utf-8'),
+                    )
+
+        return hasher.hexdigest()
+
+    # --------------------------------------------------------------------------
+    def stored_fingerprint(self):
+        """
+        Returns the fingerprint which was stored when this component
+        was last built.
+
+        :return: str or None
+        """
+        meta_node = self.meta()
+
+        if not meta_node.hasAttr(config.META_FINGERPRINT):
+            return None
+
+        return meta_node.attr(config.META_FINGERPRINT).get()
+
+    # --------------------------------------------------------------------------
+    def store_fingerprint(self, fingerprint):
+        """
+        Stores the given fingerprint on the meta node of this component. This
+        is called as part of the Rig.build functionality for you.
+
+        :param fingerprint: Fingerprint to store, as given by
+            ```component.fingerprint()```
+        :type fingerprint: str
+
+        :return: None
+        """
+        meta_node = self.meta()
+
+        if not meta_node.hasAttr(config.META_FINGERPRINT):
+            meta_node.addAttr(
+                config.META_FINGERPRINT,
+                dt='string',
+            )
+
+        meta_node.attr(config.META_FINGERPRINT).set(fingerprint)
+
     # --------------------------------------------------------------------------
     def tag(self, target, label):
         """
@@ -1175,27 +2611,74 @@ class Component(object):
 
     # --------------------------------------------------------------------------
     # noinspection PyUnresolvedReferences,PyMethodMayBeStatic
-    def bind(self, skeletal_joint, control, constrain=True, scale=True, **kwargs):
+    def bind(self, skeletal_joint, control, constrain=True, scale=True, mode=None, **kwargs):
         """
-        Creates a constraint binding between the skeletal joint and the control
+        Creates a binding between the skeletal joint and the control
         such that the skeletal joint will be driven by the control and this
         control will act as the parent for any child components below this
         skeletal joint.
+
+        By default the binding is made with constraints. Alternatively a
+        matrix binding can be used, which drives the joint through a
+        multMatrix and decomposeMatrix network. This is lighter to evaluate
+        and adds fewer nodes. The binding mode may be set for the whole rig
+        (see ```Rig.set_binding_mode```) or for a single component (see
+        ```Component.set_binding_mode```).
+
+        :param skeletal_joint: The joint to drive
+        :type skeletal_joint: pm.nt.Joint
+
+        :param control: The control to drive the joint with
+        :type control: pm.nt.Transform
+
+        :param constrain: If True the translation and rotation of the
+            joint are bound
+        :type constrain: bool
+
+        :param scale: If True the scale of the joint is bound
+        :type scale: bool
+
+        :param mode: Optionally force a specific binding mode, such as
+            config.MATRIX_BINDING. If not given, the binding mode of this
+            component is used.
+        :type mode: str
+
+        :return: None
         """
-        if constrain:
-            pm.parentConstraint(
-                control,
-                skeletal_joint,
-                **kwargs
-            )
+        mode = mode or self.binding_mode()
 
-        if scale:
-            pm.scaleConstraint(
-                control,
-                skeletal_joint,
-                **kwargs
+        # -- Matrix binding only supports maintaining the offset, so any
+        # -- other constraint arguments require constraints
+        if mode == config.MATRIX_BINDING and set(kwargs) - {'mo', 'maintainOffset'}:
+            log.debug(
+                'Falling back to a constraint binding for : %s' % skeletal_joint,
+            )
+            mode = config.CONSTRAINT_BINDING
+
+        if mode == config.MATRIX_BINDING:
+            _bind_matrix(
+                skeletal_joint.longName(),
+                control.longName(),
+                translate_rotate=constrain,
+                scale=scale,
+                maintain_offset=kwargs.get('mo', kwargs.get('maintainOffset', False)),
             )
 
+        else:
+            if constrain:
+                pm.parentConstraint(
+                    control,
+                    skeletal_joint,
+                    **kwargs
+                )
+
+            if scale:
+                pm.scaleConstraint(
+                    control,
+                    skeletal_joint,
+                    **kwargs
+                )
+
         # -- Add a binding link between the skeletal joint and
         # -- the control
         if not skeletal_joint.hasAttr(config.BOUND):
@@ -1206,6 +2689,44 @@ class Component(object):
 
         control.message.connect(skeletal_joint.attr(config.BOUND))
 
+    # --------------------------------------------------------------------------
+    def binding_mode(self):
+        """
+        Returns the mode which this component binds its skeleton with. If
+        the component does not define its own binding mode then the binding
+        mode of the rig is used.
+
+        :return: str
+        """
+        meta_node = self.meta()
+
+        if meta_node and meta_node.hasAttr(config.BINDING_MODE):
+            mode = meta_node.attr(config.BINDING_MODE).get()
+
+            if mode:
+                return mode
+
+        skeletal_root = self.skeletal_root()
+
+        if skeletal_root:
+            return Rig(skeletal_root).binding_mode()
+
+        return config.DEFAULT_BINDING
+
+    # --------------------------------------------------------------------------
+    def set_binding_mode(self, mode):
+        """
+        Sets the mode which this component binds its skeleton with. This
+        takes effect the next time the rig is built.
+
+        :param mode: The binding mode, such as config.MATRIX_BINDING, or
+            None to use the binding mode of the rig
+        :type mode: str
+
+        :return: None
+        """
+        _set_binding_mode(self.meta(), mode)
+
     # --------------------------------------------------------------------------
     # noinspection PyUnresolvedReferences
     def create_control_root(self, parent, meta_node):
@@ -1362,6 +2883,12 @@ class Component(object):
         Convenience function for intantiating a Component class which is
         representative of the given node.
 
+        Component instances are cached against the uuid of their meta node,
+        so asking for the same component again returns the same instance.
+        A new instance is given whenever the options stored on the meta node
+        have changed, or the options of the cached instance have been altered
+        without being pushed back to the meta node with ```apply_options```.
+
         :param node: Node to generate a component instance for
         :type node: pm.nt.Transform
 
@@ -1374,16 +2901,48 @@ class Component(object):
                 node = node.getParent()
                 continue
 
+            # -- Ensure we're told when meta nodes are removed or the
+            # -- scene is reset, as the cached instances are no longer valid
+            if not utils.tracking.is_name_listener(_on_component_name_changed):
+                utils.tracking.add_name_listener(_on_component_name_changed)
+                _COMPONENT_CACHE.clear()
+                _COMPONENT_NAMES.clear()
+
+            uuid_ = _uuid(meta)
+            options = meta.attr(config.META_OPTIONS).get()
+
+            cached_options, loaded_options, plugin = _COMPONENT_CACHE.get(
+                uuid_,
+                (None, None, None),
+            )
+
+            # -- Uuids are stored in the scene file, so a node brought
+            # -- back in (such as by re-importing) may share the uuid of
+            # -- a node we hold. Therefore check it is the same node, and
+            # -- that neither the stored nor in-memory options have changed.
+            if plugin and plugin.meta() == meta and options == cached_options:
+                if json.dumps(plugin.options, sort_keys=True) == loaded_options:
+                    return plugin
+
             component_type = meta.attr(config.META_IDENTIFIER).get()
 
             if component_type not in factory_manager().components.identifiers():
                 return None
 
             plugin = factory_manager().components.request(component_type)(node)
+            plugin._meta = meta
 
             plugin.options.update(
-                json.loads(meta.attr(config.META_OPTIONS).get()),
+                json.loads(options),
+            )
+
+            _COMPONENT_CACHE[uuid_] = (
+                options,
+                json.dumps(plugin.options, sort_keys=True),
+                plugin,
             )
+            _COMPONENT_NAMES[meta.name()] = uuid_
+
             return plugin
 
     # --------------------------------------------------------------------------
@@ -1432,43 +2991,85 @@ class Component(object):
 
         :return: list
         """
+        meta_node = self.meta()
+        rig = self.rig()
+
+        if not meta_node or not rig:
+            return list()
+
+        index = rig.component_index()
+
         child_components = list()
-        processed_roots = list()
 
-        skeletal_root = self.skeletal_root()
+        for child_uuid in index.children(_uuid(meta_node), recursive=recursive):
+            skeletal_root = index.roots(child_uuid)['skeleton']
 
-        for child in skeletal_root.getChildren(ad=True):
-            childs_component = Component(child)
+            child_components.append(
+                Component.get(skeletal_root) or Component(skeletal_root),
+            )
 
-            if childs_component.skeletal_root() in processed_roots:
-                continue
+        return child_components
 
-            # -- Are we part of the same component?
-            if childs_component.skeletal_root() == skeletal_root:
-                continue
+    # --------------------------------------------------------------------------
+    def rig(self):
+        """
+        Returns the rig which this component belongs to.
 
-            # -- If we're not recursive, we only want to look for children
-            # -- which are direct descendents of this one
-            if not recursive and childs_component.parent_component().skeletal_root() != skeletal_root:
-                continue
+        :return: crab.Rig or None
+        """
+        skeletal_root = self.skeletal_root()
+
+        if not skeletal_root:
+            return None
 
-            child_components.append(childs_component)
-            processed_roots.append(childs_component.skeletal_root())
+        path = skeletal_root.longName()
 
-        return child_components
+        # -- Prefer the rigs held by the registry, as they will already
+        # -- hold an up to date component index
+        for rig in Rig.all(namespace=self.meta().namespace()):
+            skeleton_org = rig.skeleton_org()
+
+            if skeleton_org and path.startswith(skeleton_org.longName() + '|'):
+                return rig
+
+        return Rig(skeletal_root)
 
     # --------------------------------------------------------------------------
     def remove(self):
         """
-        This will remove this crab component
-        :return:
+        This will remove this crab component, re-parenting any child
+        components under the next available parent.
+
+        :return: None
         """
-        # -- Start by re-parenting any child components to the parent of this
-        # -- component
-        parent = self.skeletal_root().getParent()
+        rig = self.rig()
+
+        if rig and rig.remove_components([self.skeletal_root()]):
+            return
 
-        for child_component in self.child_components(recursive=False):
-            child_component.skeletal_root().setParent(parent)
+        # -- If the component is not part of a rig we can resolve then we
+        # -- remove it directly
+        log.warning(
+            'Could not find %s within a rig, removing it directly' % self.meta(),
+        )
+
+        skeletal_root = self.skeletal_root()
+
+        if skeletal_root:
+            parent = skeletal_root.getParent()
+
+            # -- Find the roots of the direct child components, which are
+            # -- the first component roots below each branch
+            to_process = list(skeletal_root.getChildren(type='joint'))
+
+            while to_process:
+                joint = to_process.pop(0)
+
+                if self.is_component_root(joint):
+                    joint.setParent(parent)
+                    continue
+
+                to_process.extend(joint.getChildren(type='joint'))
 
         # -- Now we can delete the nodes relating to this component
         try:
@@ -1478,7 +3079,7 @@ class Component(object):
             pass
 
         try:
-            pm.delete(self.skeletal_root())
+            pm.delete(skeletal_root)
 
         except Exception:
             pass
@@ -1534,8 +3135,11 @@ class Process(object):
         * snapshot
             This is done before the control rig is destroyed and its your
             oppotunity to read any information from the rig.
-            Note: You must store the data you have read, as the same process
-                instance will not be used during the build.
+            Note: The same process instance is used throughout a build, and
+                you may also store anything you want to retain in
+                ```self.context.state(self.identifier)```. However an edit on
+                its own is not followed by a build, so anything which must
+                survive until the next build should be stored in the scene.
 
         * pre
             This is called after the control is destroyed, leaving the skeleton
@@ -1553,14 +3157,41 @@ class Process(object):
     def __init__(self, rig):
         self.rig = rig
 
+        # -- The context is shared between all the processes, and gives
+        # -- access to the cached rig hierarchy. It is assigned by the
+        # -- build context which instances the process.
+        self._context = None
+
+    # --------------------------------------------------------------------------
+    @property
+    def context(self):
+        """
+        Returns the build context this process is running within. If the
+        process was not instanced by a build context then a new one is
+        created for it.
+
+        :return: crab.BuildContext
+        """
+        # -- Processes which override __init__ without calling it
+        # -- will not have the attribute
+        if getattr(self, '_context', None) is None:
+            self._context = BuildContext(self.rig)
+
+        return self._context
+
+    # --------------------------------------------------------------------------
+    @context.setter
+    def context(self, context):
+        self._context = context
+
     # --------------------------------------------------------------------------
     def snapshot(self):
         """
         This is done before the control rig is destroyed and its your
         oppotunity to read any information from the rig.
 
-        Note: You must store the data you have read, as the same process
-            instance will not be used during the build.
+        Note: Anything which must survive an edit until the next build
+            should be stored in the scene.
 
         :return: None
         """
@@ -1598,6 +3229,234 @@ class Process(object):
         pass
 
 
+# ------------------------------------------------------------------------------
+class BuildContext(object):
+    """
+    A build context is shared between all the process plugins during an
+    edit or a build of a rig. It holds a single instance of each process
+    plugin, so any information a process reads during its snapshot is still
+    available to it during its post_build.
+
+    It also caches the hierarchies beneath the organisational nodes of the
+    rig, such that each hierarchy is only traversed once no matter how many
+    processes are interested in it. The nodes are grouped by their node type
+    and by the category of their name.
+
+    .. code-block:: python
+
+        >>> import crab
+        >>>
+        >>> class HideJointsProcess(crab.Process):
+        ...
+        ...     identifier = 'HideJoints'
+        ...
+        ...     def post_build(self):
+        ...         org = self.rig.control_org()
+        ...
+        ...         for joint in self.context.nodes(org, node_type='joint'):
+        ...             joint.drawStyle.set(2)
+
+    Note: The cached hierarchies are cleared between each stage of the
+        build. If a process alters the hierarchy it should call
+        ```context.invalidate()``` so the processes which follow it do not
+        see stale nodes.
+    """
+
+    # -- This holds the node types which derive from any given node
+    # -- type. This never changes during a session so we share it
+    # -- between all contexts
+    _DERIVED_TYPES = dict()
+
+    # --------------------------------------------------------------------------
+    def __init__(self, rig):
+        self.rig = rig
+
+        self._processes = None
+        self._states = dict()
+        self._hierarchies = dict()
+
+    # --------------------------------------------------------------------------
+    def processes(self):
+        """
+        Returns an instance of every process plugin, instancing them the
+        first time they are requested.
+
+        :return: list(crab.Process, ...)
+        """
+        if self._processes is None:
+            self._processes = list()
+
+            for proc in self.rig.factories.processes.plugins():
+                process = proc(self.rig)
+                process.context = self
+
+                self._processes.append(process)
+
+        return self._processes
+
+    # --------------------------------------------------------------------------
+    def state(self, identifier):
+        """
+        Returns a dictionary which a process may use to store any information
+        it wants to retain between the stages of the build.
+
+        :param identifier: Identifier of the process
+        :type identifier: str
+
+        :return: dict
+        """
+        return self._states.setdefault(identifier, dict())
+
+    # --------------------------------------------------------------------------
+    def invalidate(self):
+        """
+        Clears all the cached hierarchies, forcing them to be traversed
+        again when they are next requested.
+
+        :return: None
+        """
+        self._hierarchies = dict()
+
+    # --------------------------------------------------------------------------
+    def names(self, org, node_type=None, category=None):
+        """
+        Returns the long names of all the nodes beneath the given node. The
+        given node itself is not included, and neither are any intermediate
+        shapes.
+
+        :param org: The node to search beneath
+        :type org: pm.nt.Transform
+
+        :param node_type: If given, only nodes of this type (or types which
+            derive from it) are returned
+        :type node_type: str
+
+        :param category: If given, only nodes whose name has this category
+            are returned
+        :type category: str
+
+        :return: list(str, ...)
+        """
+        if not org:
+            return list()
+
+        hierarchy = self._hierarchy(org.longName())
+        key = (node_type, category)
+
+        if key in hierarchy['queries']:
+            return hierarchy['queries'][key]
+
+        names = hierarchy['names']
+
+        if node_type:
+            types = set(self._derived_types(node_type))
+
+            names = [
+                name
+                for name in names
+                if hierarchy['types'][name] in types
+            ]
+
+        if category:
+            names = [
+                name
+                for name in names
+                if hierarchy['categories'][name] == category
+            ]
+
+        hierarchy['queries'][key] = names
+
+        return names
+
+    # --------------------------------------------------------------------------
+    def nodes(self, org, node_type=None, category=None):
+        """
+        Returns all the nodes beneath the given node. This takes the same
+        arguments as ```BuildContext.names```.
+
+        :param org: The node to search beneath
+        :type org: pm.nt.Transform
+
+        :param node_type: If given, only nodes of this type (or types which
+            derive from it) are returned
+        :type node_type: str
+
+        :param category: If given, only nodes whose name has this category
+            are returned
+        :type category: str
+
+        :return: list(pm.nt.DependNode, ...)
+        """
+        return [
+            pm.PyNode(name)
+            for name in self.names(org, node_type=node_type, category=category)
+        ]
+
+    # --------------------------------------------------------------------------
+    def _hierarchy(self, org_name):
+        """
+        Traverses the hierarchy beneath the given node in a single query
+        and caches the result.
+
+        :param org_name: Long name of the node to traverse
+        :type org_name: str
+
+        :return: dict
+        """
+        if org_name in self._hierarchies:
+            return self._hierarchies[org_name]
+
+        # -- This gives us a flat list of name and type pairs
+        listing = cmds.ls(
+            org_name,
+            dag=True,
+            long=True,
+            showType=True,
+            noIntermediate=True,
+        ) or list()
+
+        hierarchy = dict(
+            names=list(),
+            types=dict(),
+            categories=dict(),
+            queries=dict(),
+        )
+
+        for name, node_type in zip(listing[::2], listing[1::2]):
+
+            if name == org_name:
+                continue
+
+            hierarchy['names'].append(name)
+            hierarchy['types'][name] = node_type
+            hierarchy['categories'][name] = config.get_category(
+                name.rsplit('|', 1)[-1],
+            )
+
+        self._hierarchies[org_name] = hierarchy
+
+        return hierarchy
+
+    # --------------------------------------------------------------------------
+    @classmethod
+    def _derived_types(cls, node_type):
+        """
+        Returns the given node type along with all the node types which
+        derive from it.
+
+        :param node_type: Node type to query
+        :type node_type: str
+
+        :return: list(str, ...)
+        """
+        if node_type not in cls._DERIVED_TYPES:
+            cls._DERIVED_TYPES[node_type] = [node_type] + (
+                cmds.nodeType(node_type, isTypeName=True, derived=True) or list()
+            )
+
+        return cls._DERIVED_TYPES[node_type]
+
+
 # ------------------------------------------------------------------------------
 class Factories(object):
     """
@@ -1615,6 +3474,8 @@ class Factories(object):
             versioning_identifier='version',
             paths=constants.PLUGIN_LOCATIONS,
             envvar=constants.PLUGIN_ENVIRONMENT_VARIABLE,
+            scanner=utils.plugins.scanner(),
+            lazy=True,
         )
 
         # -- This stores all the process plugins. These are plugins
@@ -1626,6 +3487,8 @@ class Factories(object):
             versioning_identifier='version',
             paths=constants.PLUGIN_LOCATIONS,
             envvar=constants.PLUGIN_ENVIRONMENT_VARIABLE,
+            scanner=utils.plugins.scanner(),
+            lazy=True,
         )
 
         # -- This is a library of all the behaviours which are available
@@ -1636,8 +3499,294 @@ class Factories(object):
             versioning_identifier='version',
             paths=constants.PLUGIN_LOCATIONS,
             envvar=constants.PLUGIN_ENVIRONMENT_VARIABLE,
+            scanner=utils.plugins.scanner(),
+            lazy=True,
+        )
+
+
+# ------------------------------------------------------------------------------
+def _uuid(node):
+    """
+    Returns the uuid of the given node.
+
+    :param node: The node to get the uuid of
+    :type node: pm.nt.DependNode
+
+    :return: str
+    """
+    return om.MFnDependencyNode(node.__apimobject__()).uuid().asString()
+
+
+# ------------------------------------------------------------------------------
+def _top_level_paths(paths):
+    """
+    Returns only the given paths which do not reside beneath any of the
+    other given paths.
+
+    :param paths: Long names of dag nodes
+    :type paths: list(str, ...)
+
+    :return: list(str, ...)
+    """
+    paths = set(paths)
+
+    return [
+        path
+        for path in paths
+        if not any(
+            '|'.join(path.split('|')[:idx]) in paths
+            for idx in range(2, path.count('|') + 1)
+        )
+    ]
+
+
+# ------------------------------------------------------------------------------
+def _on_component_name_changed(old_name, new_name):
+    """
+    Forgets the cached component instance of any meta node which is
+    removed, and all the cached instances whenever the whole scene
+    changes, such as when a new scene is opened.
+
+    :param old_name: The name leaving the scene, if any
+    :type old_name: str
+
+    :param new_name: The name entering the scene, if any
+    :type new_name: str
+
+    :return: None
+    """
+    if old_name is None and new_name is None:
+        _COMPONENT_CACHE.clear()
+        _COMPONENT_NAMES.clear()
+        return
+
+    if old_name not in _COMPONENT_NAMES:
+        return
+
+    uuid_ = _COMPONENT_NAMES.pop(old_name)
+
+    # -- A renamed meta node is still the same component
+    if new_name:
+        _COMPONENT_NAMES[new_name] = uuid_
+        return
+
+    _COMPONENT_CACHE.pop(uuid_, None)
+
+
+# ------------------------------------------------------------------------------
+def _set_binding_mode(node, mode):
+    """
+    Stores the given binding mode on the given node.
+
+    :param node: The rig node or component meta node
+    :type node: pm.nt.DependNode
+
+    :param mode: The binding mode, or None to clear it
+    :type mode: str
+
+    :return: None
+    """
+    if mode and mode not in (config.CONSTRAINT_BINDING, config.MATRIX_BINDING):
+        raise ValueError('%s is not a valid binding mode' % mode)
+
+    if not node.hasAttr(config.BINDING_MODE):
+        node.addAttr(
+            config.BINDING_MODE,
+            dt='string',
+        )
+
+    node.attr(config.BINDING_MODE).set(mode or '')
+
+
+# ------------------------------------------------------------------------------
+def _bind_matrix(joint, control, translate_rotate=True, scale=True, maintain_offset=False):
+    """
+    Drives the given joint by the given control through a multMatrix and
+    decomposeMatrix network. Any joint orient on the joint is compensated
+    for, so the skeleton itself is not altered.
+
+    All the nodes which are created are linked to the joint, so they can
+    be removed along with the control rig.
+
+    :param joint: Long name of the joint to drive
+    :type joint: str
+
+    :param control: Long name of the control to drive the joint with
+    :type control: str
+
+    :param translate_rotate: If True the translation and rotation are bound
+    :type translate_rotate: bool
+
+    :param scale: If True the scale is bound
+    :type scale: bool
+
+    :param maintain_offset: If True the current offset between the joint
+        and the control is retained
+    :type maintain_offset: bool
+
+    :return: list(str, ...) of the created nodes
+    """
+    if not translate_rotate and not scale:
+        return list()
+
+    # -- Prior to maya 2020 the matrix nodes are a plugin
+    if not cmds.pluginInfo('matrixNodes', query=True, loaded=True):
+        try:
+            cmds.loadPlugin('matrixNodes', quiet=True)
+
+        except RuntimeError:
+            pass
+
+    short_name = joint.rsplit('|', 1)[-1].rsplit(':', 1)[-1]
+    description = config.get_description(short_name) or 'Binding'
+    side = config.get_side(short_name) or config.MIDDLE
+
+    created = list()
+
+    # -- Determine the offset between the joint and the control
+    offset = om.MMatrix()
+
+    if maintain_offset:
+        offset = om.MMatrix(
+            cmds.xform(joint, query=True, matrix=True, worldSpace=True),
+        ) * om.MMatrix(
+            cmds.xform(control, query=True, matrix=True, worldSpace=True),
+        ).inverse()
+
+    # -- Bring the world matrix of the control into the local space
+    # -- of the joint
+    local_matrix = cmds.createNode(
+        'multMatrix',
+        name=config.name(config.MATH, description, side),
+        skipSelect=True,
+    )
+    created.append(local_matrix)
+
+    cmds.setAttr(
+        '%s.matrixIn[0]' % local_matrix,
+        *[offset[idx] for idx in range(16)],
+        type='matrix'
+    )
+    cmds.connectAttr('%s.worldMatrix[0]' % control, '%s.matrixIn[1]' % local_matrix)
+    cmds.connectAttr('%s.parentInverseMatrix[0]' % joint, '%s.matrixIn[2]' % local_matrix)
+
+    decomposed = _decompose(local_matrix, joint, description, side)
+    created.append(decomposed)
+
+    if translate_rotate:
+        cmds.connectAttr('%s.outputTranslate' % decomposed, '%s.translate' % joint, force=True)
+
+        joint_orient = [0.0, 0.0, 0.0]
+
+        if cmds.attributeQuery('jointOrient', node=joint, exists=True):
+            joint_orient = cmds.getAttr('%s.jointOrient' % joint)[0]
+
+        # -- The rotation of a joint is applied before its joint orient,
+        # -- so we need to remove the joint orient from the rotation
+        if any(abs(value) > 0.0001 for value in joint_orient):
+            orient_inverse = om.MEulerRotation(
+                [math.radians(value) for value in joint_orient],
+            ).asMatrix().inverse()
+
+            rotation_matrix = cmds.createNode(
+                'multMatrix',
+                name=config.name(config.MATH, description, side),
+                skipSelect=True,
+            )
+            created.append(rotation_matrix)
+
+            cmds.connectAttr('%s.matrixSum' % local_matrix, '%s.matrixIn[0]' % rotation_matrix)
+            cmds.setAttr(
+                '%s.matrixIn[1]' % rotation_matrix,
+                *[orient_inverse[idx] for idx in range(16)],
+                type='matrix'
+            )
+
+            rotation = _decompose(rotation_matrix, joint, description, side)
+            created.append(rotation)
+
+        else:
+            rotation = decomposed
+
+        cmds.connectAttr('%s.outputRotate' % rotation, '%s.rotate' % joint, force=True)
+
+    if scale:
+        cmds.connectAttr('%s.outputScale' % decomposed, '%s.scale' % joint, force=True)
+
+    # -- Link the nodes to the joint so we can find them again
+    if not cmds.attributeQuery(config.BINDING_NODES, node=joint, exists=True):
+        cmds.addAttr(joint, longName=config.BINDING_NODES, attributeType='message', multi=True)
+
+    for node in created:
+        cmds.connectAttr(
+            '%s.message' % node,
+            '%s.%s' % (joint, config.BINDING_NODES),
+            nextAvailable=True,
         )
 
+    return created
+
+
+# ------------------------------------------------------------------------------
+def _decompose(matrix_node, joint, description, side):
+    """
+    Creates a decomposeMatrix node which decomposes the output of the
+    given multMatrix node using the rotate order of the given joint.
+
+    :param matrix_node: Name of the multMatrix node to decompose
+    :type matrix_node: str
+
+    :param joint: Long name of the joint being driven
+    :type joint: str
+
+    :param description: Description to name the node with
+    :type description: str
+
+    :param side: Side to name the node with
+    :type side: str
+
+    :return: str
+    """
+    decomposed = cmds.createNode(
+        'decomposeMatrix',
+        name=config.name(config.MATH, description, side),
+        skipSelect=True,
+    )
+
+    cmds.connectAttr('%s.matrixSum' % matrix_node, '%s.inputMatrix' % decomposed)
+    cmds.connectAttr('%s.rotateOrder' % joint, '%s.inputRotateOrder' % decomposed)
+
+    return decomposed
+
+
+# ------------------------------------------------------------------------------
+def _unbind_matrix(joints):
+    """
+    Removes the matrix bindings from the given joints.
+
+    :param joints: Long names of the joints
+    :type joints: list(str, ...)
+
+    :return: None
+    """
+    plugs = [
+        '%s.%s' % (joint, config.BINDING_NODES)
+        for joint in joints
+        if cmds.attributeQuery(config.BINDING_NODES, node=joint, exists=True)
+    ]
+
+    if not plugs:
+        return
+
+    nodes = cmds.listConnections(
+        plugs,
+        source=True,
+        destination=False,
+    )
+
+    if nodes:
+        cmds.delete(list(set(nodes)))
+
 
 # ------------------------------------------------------------------------------
 def factory_manager():
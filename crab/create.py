@@ -1,4 +1,5 @@
 import pymel.core as pm
+from maya import cmds
 
 from . import config
 from crab.utils import shapes
@@ -6,6 +7,18 @@ from crab.utils import shapes
 
 DEFORMER_SET_NAME = 'deformers'
 
+# -- This is used to set nodes back to the origin
+_IDENTITY = [
+    1.0, 0.0, 0.0, 0.0,
+    0.0, 1.0, 0.0, 0.0,
+    0.0, 0.0, 1.0, 0.0,
+    0.0, 0.0, 0.0, 1.0,
+]
+
+# -- Cache of whether a node type creates a transform, as this does
+# -- not change for the lifetime of the session
+_TRANSFORM_TYPES = dict()
+
 
 # ------------------------------------------------------------------------------
 def joint(description,
@@ -143,6 +156,49 @@ def control(description,
 
     :return: pm.nt.DependNode
     """
+    return controls(
+        [
+            dict(
+                description=description,
+                side=side,
+                parent=parent,
+                xform=xform,
+                match_to=match_to,
+                shape=shape,
+                lock_list=lock_list,
+                hide_list=hide_list,
+                rotation_order=rotation_order,
+                counter=counter,
+            ),
+        ],
+    )[0]
+
+
+# ------------------------------------------------------------------------------
+def controls(specs):
+    """
+    Creates many control structures in a single pass. Each spec is a
+    dictionary of the arguments which would be given to ```create.control```
+    and the control node of each structure is returned in the same order.
+
+    A spec may give the index of an earlier spec as its parent, in which
+    case it is parented under the control of that structure.
+
+    .. code-block:: python
+
+        >>> finger_controls = crab.create.controls(
+        ...     [
+        ...         dict(description='IndexA', side='LF', parent=hand, match_to=joints[0]),
+        ...         dict(description='IndexB', side='LF', parent=0, match_to=joints[1]),
+        ...         dict(description='IndexC', side='LF', parent=1, match_to=joints[2]),
+        ...     ],
+        ... )
+
+    :param specs: List of control specs
+    :type specs: list(dict, ...)
+
+    :return: list(pm.nt.DependNode, ...)
+    """
     prefixes = [
         config.ORG,
         config.ZERO,
@@ -150,49 +206,70 @@ def control(description,
         config.CONTROL,
     ]
 
-    for prefix in prefixes:
+    node_specs = list()
 
-        # -- Declare any specific options for this iteration
-        options = dict()
+    for spec in specs:
+        parent = spec.get('parent')
 
-        # -- Controls are the only items which have shapes
-        if prefix == config.CONTROL:
-            options['shape'] = shape
+        # -- Parents given by index refer to the control of an
+        # -- earlier structure in this batch
+        if isinstance(parent, int):
+            parent = (parent * len(prefixes)) + len(prefixes) - 1
 
-        parent = generic(
-            'transform',
-            prefix,
-            description,
-            side,
-            parent=parent,
-            xform=xform,
-            match_to=match_to,
-            counter=counter,
-            **options
-        )
+        for prefix in prefixes:
+            node_specs.append(
+                dict(
+                    node_type='transform',
+                    prefix=prefix,
+                    description=spec['description'],
+                    side=spec['side'],
+                    parent=parent,
+                    xform=spec.get('xform'),
+                    match_to=spec.get('match_to'),
+                    counter=spec.get('counter', 1),
 
-    if hide_list:
-        if not isinstance(hide_list, (list, tuple, set)):
-            hide_list = hide_list.split(';')
+                    # -- Controls are the only items which have shapes
+                    shape=spec.get('shape') if prefix == config.CONTROL else None,
+                ),
+            )
 
-        for attr_to_hide in filter(None, hide_list):
-            parent.attr(attr_to_hide).set(k=False)
+            # -- Each item is parented under the previous
+            parent = len(node_specs) - 1
 
-    if lock_list:
-        if not isinstance(lock_list, (list, tuple, set)):
-            lock_list = lock_list.split(';')
+    nodes = batch(node_specs)
 
-        for attr_to_lock in filter(None, lock_list):
-            parent.attr(attr_to_lock).lock()
+    results = list()
 
-    # -- Now expose the rotation order
-    parent.rotateOrder.set(k=True)
+    for idx, spec in enumerate(specs):
+        node = nodes[(idx * len(prefixes)) + len(prefixes) - 1]
+        results.append(node)
 
-    parent.rotateOrder.set(
-        rotation_order or config.DEFAULT_CONTROL_ROTATION_ORDER
-    )
+        hide_list = spec.get('hide_list')
+        lock_list = spec.get('lock_list')
+
+        if hide_list:
+            if not isinstance(hide_list, (list, tuple, set)):
+                hide_list = hide_list.split(';')
+
+            for attr_to_hide in filter(None, hide_list):
+                cmds.setAttr('%s.%s' % (node, attr_to_hide), keyable=False)
+
+        if lock_list:
+            if not isinstance(lock_list, (list, tuple, set)):
+                lock_list = lock_list.split(';')
+
+            for attr_to_lock in filter(None, lock_list):
+                cmds.setAttr('%s.%s' % (node, attr_to_lock), lock=True)
 
-    return parent
+        # -- Now expose the rotation order
+        cmds.setAttr('%s.rotateOrder' % node, keyable=True)
+
+        cmds.setAttr(
+            '%s.rotateOrder' % node,
+            spec.get('rotation_order') or config.DEFAULT_CONTROL_ROTATION_ORDER,
+        )
+
+    return results
 
 
 # ------------------------------------------------------------------------------
@@ -389,42 +466,175 @@ def generic(node_type,
 
     :return: pm.nt.DependNode
     """
-    # -- Create the node
-    node = pm.createNode(node_type)
-
-    if find_transform and not isinstance(node, pm.nt.Transform):
-        node = node.getParent()
-
-    # -- Name it based on our naming convention
-    node.rename(
-        config.name(
-            prefix=prefix,
-            description=description,
-            side=side,
-            counter=counter,
-        ),
-    )
+    return batch(
+        [
+            dict(
+                node_type=node_type,
+                prefix=prefix,
+                description=description,
+                side=side,
+                parent=parent,
+                xform=xform,
+                match_to=match_to,
+                shape=shape,
+                find_transform=find_transform,
+                counter=counter,
+            ),
+        ],
+    )[0]
 
-    # -- If we're given a matrix utilise that
-    if xform:
-        node.setMatrix(
-            xform,
-            worldSpace=True,
+
+# ------------------------------------------------------------------------------
+def batch(specs):
+    """
+    Creates many nodes in a single pass. Each spec is a dictionary of the
+    arguments which would be given to ```create.generic``` and the created
+    nodes are returned in the same order.
+
+    Rather than creating, renaming, matching and parenting each node
+    through separate pymel calls, each node is created already named and
+    parented and is then placed with a single world space matrix set.
+
+    A spec may give the index of an earlier spec as its parent, allowing
+    whole hierarchies to be described in one batch.
+
+    .. code-block:: python
+
+        >>> nodes = crab.create.batch(
+        ...     [
+        ...         dict(node_type='transform', prefix='ORG', description='Foo', side='LF'),
+        ...         dict(node_type='transform', prefix='CTL', description='Foo', side='LF', parent=0, shape='cube'),
+        ...     ],
+        ... )
+
+    :param specs: List of node specs
+    :type specs: list(dict, ...)
+
+    :return: list(pm.nt.DependNode, ...)
+    """
+    names = list()
+
+    for spec in specs:
+        node_type = spec['node_type']
+        parent = spec.get('parent')
+
+        # -- Parents given by index refer to an earlier node in this batch
+        if isinstance(parent, int):
+            parent = names[parent]
+
+        elif parent:
+            parent = str(parent)
+
+        # -- Name it based on our naming convention
+        node_name = config.name(
+            prefix=spec['prefix'],
+            description=spec['description'],
+            side=spec['side'],
+            counter=spec.get('counter', 1),
         )
 
-    # -- Match the object to the target object if one
-    # -- is given.
-    if match_to:
-        node.setMatrix(
-            match_to.getMatrix(worldSpace=True),
+        is_transform = _is_transform_type(node_type)
+
+        # -- Transforms can be created already named and parented
+        if is_transform:
+            kwargs = dict(name=node_name, skipSelect=True)
+
+            if parent:
+                kwargs['parent'] = parent
+
+            node = cmds.createNode(node_type, **kwargs)
+
+        else:
+            node = cmds.createNode(node_type, skipSelect=True)
+
+            if spec.get('find_transform'):
+                transforms = cmds.listRelatives(node, parent=True, fullPath=True)
+
+                if transforms:
+                    node = transforms[0]
+                    is_transform = True
+
+            node = cmds.rename(node, node_name)
+
+            if parent and is_transform:
+                node = cmds.parent(node, parent)[0]
+
+        if is_transform:
+            matrix = _world_matrix(spec)
+
+            # -- Nodes with no placement sit at the origin regardless
+            # -- of their parent
+            if matrix is None and parent:
+                matrix = _IDENTITY
+
+            if matrix is not None:
+                cmds.xform(node, matrix=matrix, worldSpace=True)
+
+        names.append(node)
+
+    nodes = [pm.PyNode(node_name) for node_name in names]
+
+    # -- Apply all the shapes in one go, so the shape library and the
+    # -- up axis are only looked up once for the whole batch
+    assignments = [
+        (node, spec['shape'])
+        for spec, node in zip(specs, nodes)
+        if spec.get('shape')
+    ]
+
+    if assignments:
+        shapes.apply_many(assignments)
+
+    return nodes
+
+
+# ------------------------------------------------------------------------------
+def _is_transform_type(node_type):
+    """
+    Returns True if the given node type is (or inherits from) a transform.
+
+    :param node_type: Name of the node type
+    :type node_type: str
+
+    :return: bool
+    """
+    if node_type not in _TRANSFORM_TYPES:
+        _TRANSFORM_TYPES[node_type] = 'transform' in (
+            cmds.nodeType(node_type, isTypeName=True, inherited=True) or list()
+        )
+
+    return _TRANSFORM_TYPES[node_type]
+
+
+# ------------------------------------------------------------------------------
+def _world_matrix(spec):
+    """
+    Returns the world space matrix a node should be placed at as a flat
+    list of sixteen values, or None if no placement is given.
+
+    :param spec: The node spec
+    :type spec: dict
+
+    :return: list(float, ...) or None
+    """
+    # -- Matching to a node takes precedence over a given matrix
+    if spec.get('match_to'):
+        return cmds.xform(
+            str(spec['match_to']),
+            query=True,
+            matrix=True,
             worldSpace=True,
         )
 
-    # -- Parent the node if we're given a parent
-    if parent:
-        node.setParent(parent)
+    xform = spec.get('xform')
+
+    if not xform:
+        return None
+
+    values = list(xform)
 
-    if shape:
-        shapes.apply(node, shape)
+    # -- Matrices may be given as rows or as a flat list
+    if len(values) == 4:
+        values = [value for row in values for value in row]
 
-    return node
+    return [float(value) for value in values]
@@ -29,6 +29,10 @@ def _menu_goto_website(*args, **kwargs):
 
 # ------------------------------------------------------------------------------
 def _menu_reload(*args, **kwargs):
+    # -- Remove any scene callbacks before we drop the modules
+    # -- which they are bound to
+    crab.utils.tracking.uninstall()
+
     blackout.drop('crab')
     pm.evalDeferred('import crab;crab.menu.initialize()')
     
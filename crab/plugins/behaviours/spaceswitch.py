@@ -7,7 +7,13 @@ import crab
 class SpaceSwitch(crab.Behaviour):
     """
     This is meant as an example only to show how a behaviour
-    can operate
+    can operate.
+
+    By default the space switch is made with a parent constraint which
+    is weighted by a condition node per space. Alternatively the mode
+    option can be set to crab.config.MATRIX_BINDING, in which case the
+    zero is driven through a single matrix network regardless of how
+    many spaces there are.
     """
     identifier = 'SpaceSwitch'
     version = 1
@@ -24,6 +30,7 @@ class SpaceSwitch(crab.Behaviour):
         self.options.default_space = ''
         self.options.parent_label = 'Parent'
         self.options.target_offsets = ''
+        self.options.mode = crab.config.CONSTRAINT_BINDING
 
     # --------------------------------------------------------------------------
     # noinspection PyUnresolvedReferences
@@ -48,6 +55,7 @@ class SpaceSwitch(crab.Behaviour):
             translation_only=self.options.translation_only,
             rotation_only=self.options.rotation_only,
             target_offsets=target_offsets,
+            mode=self.options.mode,
         )
 
     # --------------------------------------------------------------------------
@@ -62,7 +70,8 @@ class SpaceSwitch(crab.Behaviour):
                parent_label,
                translation_only=False,
                rotation_only=False,
-               target_offsets=None):
+               target_offsets=None,
+               mode=None):
 
         # -- If there are no labels then we extract the description
         # -- from each space and use that as the labels
@@ -93,8 +102,57 @@ class SpaceSwitch(crab.Behaviour):
         space_attr = target.attr('spaces')
         default_id = 0
 
+        # -- Check which space we need to assign as the default space
+        for idx, label in enumerate(labels):
+            if label == applied_space:
+                default_id = idx
+
         zero = crab.utils.hierarchy.find_above(target, crab.config.ZERO)
 
+        if mode == crab.config.MATRIX_BINDING:
+            cls._matrix_switch(
+                description=description,
+                side=side,
+                zero=zero,
+                spaces=spaces,
+                space_attr=space_attr,
+                translation_only=translation_only,
+                rotation_only=rotation_only,
+                target_offsets=target_offsets,
+            )
+
+        else:
+            cls._constraint_switch(
+                description=description,
+                side=side,
+                zero=zero,
+                spaces=spaces,
+                space_attr=space_attr,
+                translation_only=translation_only,
+                rotation_only=rotation_only,
+                target_offsets=target_offsets,
+            )
+
+        # -- Set the default space
+        target.spaces.set(default_id)
+
+        return True
+
+    # --------------------------------------------------------------------------
+    @classmethod
+    def _constraint_switch(cls,
+                           description,
+                           side,
+                           zero,
+                           spaces,
+                           space_attr,
+                           translation_only,
+                           rotation_only,
+                           target_offsets):
+        """
+        Switches the zero between the spaces using a parent constraint
+        with a condition node driving the weight of each space.
+        """
         for idx, space in enumerate(spaces):
 
             # -- Check if we have a target offset for this space, if we
@@ -141,11 +199,6 @@ class SpaceSwitch(crab.Behaviour):
             # -- Hook the condition into the constraint
             condition.outColorR.connect(cns.getWeightAliasList()[-1])
 
-            # -- Check if this is the space we need to assign
-            # -- as the default space
-            if labels[idx] == applied_space:
-                default_id = idx
-
             # -- If we need to restore this zeros transform, do so now
             if xform_to_restore:
                 zero.setMatrix(
@@ -160,7 +213,106 @@ class SpaceSwitch(crab.Behaviour):
             if rotation_only:
                 zero.attr('translate%s' % axis).disconnect()
 
-        # -- Set the default space
-        target.spaces.set(default_id)
+    # --------------------------------------------------------------------------
+    @classmethod
+    def _matrix_switch(cls,
+                       description,
+                       side,
+                       zero,
+                       spaces,
+                       space_attr,
+                       translation_only,
+                       rotation_only,
+                       target_offsets):
+        """
+        Switches the zero between the spaces using a matrix network. The
+        offset of the zero from each space is calculated up front and
+        stored on the zero, then one choice node picks the world matrix
+        of the active space and another picks its offset. These are
+        multiplied into the local space of the zero and decomposed onto
+        its transform, so the number of nodes does not grow with the
+        number of spaces.
+        """
+        # -- Prior to maya 2020 the matrix nodes are a plugin
+        if not pm.pluginInfo('matrixNodes', query=True, loaded=True):
+            try:
+                pm.loadPlugin('matrixNodes', quiet=True)
 
-        return True
+            except RuntimeError:
+                pass
+
+        node_description = '%sSpaceSwitch' % description.replace(' ', '')
+
+        # -- Store the offset between the zero and each space, taking
+        # -- into account any target offsets
+        zero.addAttr(
+            'spaceOffsets',
+            at='matrix',
+            multi=True,
+        )
+
+        zero_matrix = zero.getMatrix(worldSpace=True)
+
+        for idx, space in enumerate(spaces):
+            offset_matrix = zero_matrix
+
+            if space.name() in target_offsets:
+                offset_matrix = target_offsets[space.name()].getMatrix(
+                    worldSpace=True,
+                )
+
+            zero.attr('spaceOffsets')[idx].set(
+                offset_matrix * space.getMatrix(worldSpace=True).inverse(),
+            )
+
+        # -- Create the choice nodes which pick the space and the
+        # -- offset of that space
+        space_choice = crab.create.generic(
+            node_type='choice',
+            prefix=crab.config.LOGIC,
+            description=node_description,
+            side=side,
+        )
+
+        offset_choice = crab.create.generic(
+            node_type='choice',
+            prefix=crab.config.LOGIC,
+            description=node_description,
+            side=side,
+        )
+
+        space_attr.connect(space_choice.selector)
+        space_attr.connect(offset_choice.selector)
+
+        for idx, space in enumerate(spaces):
+            space.worldMatrix[0].connect(space_choice.input[idx])
+            zero.attr('spaceOffsets')[idx].connect(offset_choice.input[idx])
+
+        # -- Bring the result into the local space of the zero
+        local_matrix = crab.create.generic(
+            node_type='multMatrix',
+            prefix=crab.config.MATH,
+            description=node_description,
+            side=side,
+        )
+
+        offset_choice.output.connect(local_matrix.matrixIn[0])
+        space_choice.output.connect(local_matrix.matrixIn[1])
+        zero.parentInverseMatrix[0].connect(local_matrix.matrixIn[2])
+
+        decomposed = crab.create.generic(
+            node_type='decomposeMatrix',
+            prefix=crab.config.MATH,
+            description=node_description,
+            side=side,
+        )
+
+        local_matrix.matrixSum.connect(decomposed.inputMatrix)
+        zero.rotateOrder.connect(decomposed.inputRotateOrder)
+
+        # -- Only drive the channels we have been asked to
+        if not rotation_only:
+            decomposed.outputTranslate.connect(zero.translate, force=True)
+
+        if not translation_only:
+            decomposed.outputRotate.connect(zero.rotate, force=True)
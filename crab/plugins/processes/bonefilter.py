@@ -21,5 +21,5 @@ class BoneFilterProcess(crab.Process):
 
         :return: 
         """
-        for joint in self.rig.control_org().getChildren(ad=True, type='joint'):
+        for joint in self.context.nodes(self.rig.control_org(), node_type='joint'):
             joint.drawStyle.set(2)  # -- Hide
@@ -1,11 +1,23 @@
 import crab
+import maya.api.OpenMaya as om
+from maya import cmds
+
+
+# -- Colour values are stored as floats, so any difference smaller
+# -- than this is not a real change
+_TOLERANCE = 0.0001
 
 
 # ------------------------------------------------------------------------------
 class ColorControlsProcess(crab.Process):
     """
-    Makes any bones which are part of the control hierarchy invisible
-    by setting their draw style to None.
+    Colours the control rig by side. The curve shapes of every control are
+    given the colour of the side of the control, and each transform has its
+    outliner colour set to match. Transforms without shapes are given the
+    non-animatable colour in the outliner.
+
+    All the wanted values are compared against the scene in a single pass,
+    and only those which differ are written.
     """
 
     # -- Define the identifier for the plugin
@@ -16,48 +28,174 @@ class ColorControlsProcess(crab.Process):
     # noinspection PyUnresolvedReferences
     def post_build(self):
         """
-        This is called after the entire rig has been built, so we will attempt
-        to re-apply the shape information.
+        This is called after the entire rig has been built, so we will
+        colour all the controls within the control rig.
 
         :return:
         """
-        ignore_colour = crab.config.NON_ANIMATABLE_COLOUR
+        control_org = self.rig.control_org()
+
+        transforms = self.context.names(control_org, node_type='transform')
+        shapes = self.context.names(control_org, node_type='shape')
+
+        # -- Determine which transforms have shapes, and which shapes
+        # -- belong to which transform
+        shape_owners = dict(
+            (shape, shape.rsplit('|', 1)[0])
+            for shape in shapes
+        )
+        shaped = set(shape_owners.values())
+
+        # -- Classify all the controls by side in a single pass
+        colours = self.classify(transforms)
+        ignore_colour = _normalise(crab.config.NON_ANIMATABLE_COLOUR)
 
-        for control in self.rig.control_org().getChildren(ad=True, type='transform'):
+        # -- Build up the list of values we want, so we can compare them
+        # -- against the scene in one go
+        wanted = list()
 
-            # -- Get the colour to assign to this shape
-            colour = self.get_colour(control)
-            control.useOutlinerColor.set(True)
+        for transform in transforms:
+            wanted.append((transform, 'useOutlinerColor', True))
+            wanted.append(
+                (
+                    transform,
+                    'outlinerColor',
+                    colours[transform] if transform in shaped else ignore_colour,
+                ),
+            )
 
-            if control.getShapes():
-                # -- Set the outliner colour
-                control.outlinerColorR.set(colour[0] * (1.0 / 255))
-                control.outlinerColorG.set(colour[1] * (1.0 / 255))
-                control.outlinerColorB.set(colour[2] * (1.0 / 255))
+        for shape in shapes:
+            wanted.append((shape, 'overrideEnabled', True))
+            wanted.append((shape, 'overrideRGBColors', True))
+            wanted.append((shape, 'overrideColorRGB', colours[shape_owners[shape]]))
+
+        changes = _changes(wanted)
+
+        for node_name, attribute_name, value in changes:
+            if isinstance(value, tuple):
+                cmds.setAttr(
+                    '%s.%s' % (node_name, attribute_name),
+                    *value,
+                    type='double3'
+                )
 
             else:
-                control.outlinerColorR.set(ignore_colour[0] * (1.0 / 255))
-                control.outlinerColorG.set(ignore_colour[1] * (1.0 / 255))
-                control.outlinerColorB.set(ignore_colour[2] * (1.0 / 255))
+                cmds.setAttr('%s.%s' % (node_name, attribute_name), value)
+
+        crab.log.debug(
+            'Colour Controls : %s of %s values changed' % (
+                len(changes),
+                len(wanted),
+            ),
+        )
+
+    # --------------------------------------------------------------------------
+    @classmethod
+    def classify(cls, node_names):
+        """
+        Returns the colour (as normalised rgb values) which should be
+        assigned to each of the given nodes.
+
+        :param node_names: Long names of the nodes to classify
+        :type node_names: list(str, ...)
+
+        :return: dict(str: tuple(float, float, float))
+        """
+        colours_by_side = dict()
+        colours = dict()
+
+        for node_name in node_names:
+            side = crab.config.get_side(node_name.rsplit('|', 1)[-1])
 
-            for shape in control.getShapes():
+            if side not in colours_by_side:
+                colours_by_side[side] = _normalise(cls.side_colour(side))
 
-                # -- Set the display colour
-                shape.overrideEnabled.set(True)
-                shape.overrideRGBColors.set(True)
+            colours[node_name] = colours_by_side[side]
 
-                shape.overrideColorR.set(colour[0] * (1.0 / 255))
-                shape.overrideColorG.set(colour[1] * (1.0 / 255))
-                shape.overrideColorB.set(colour[2] * (1.0 / 255))
+        return colours
 
     # --------------------------------------------------------------------------
     @classmethod
     def get_colour(cls, node):
-        side = crab.config.get_side(node.name())
-        if side.endswith(crab.config.LEFT):
+        return cls.side_colour(crab.config.get_side(node.name()))
+
+    # --------------------------------------------------------------------------
+    @classmethod
+    def side_colour(cls, side):
+        """
+        Returns the colour to use for the given side.
+
+        :param side: Side element of a name, such as LF
+        :type side: str
+
+        :return: list(int, int, int)
+        """
+        if side and side.endswith(crab.config.LEFT):
             return crab.config.LEFT_COLOR
 
-        elif side.endswith(crab.config.RIGHT):
+        elif side and side.endswith(crab.config.RIGHT):
             return crab.config.RIGHT_COLOR
 
         return crab.config.MIDDLE_COLOR
+
+
+# ------------------------------------------------------------------------------
+def _normalise(colour):
+    """
+    Converts the given 0-255 colour into the 0-1 range.
+
+    :param colour: Colour to convert
+    :type colour: list(int, int, int)
+
+    :return: tuple(float, float, float)
+    """
+    return tuple(channel * (1.0 / 255) for channel in colour)
+
+
+# ------------------------------------------------------------------------------
+def _changes(wanted):
+    """
+    Reads the current values of all the given attributes through the api
+    and returns only those which differ from the values wanted.
+
+    :param wanted: List of node name, attribute name and value entries.
+        Values are either booleans or tuples of three floats.
+    :type wanted: list(tuple(str, str, *), ...)
+
+    :return: list(tuple(str, str, *), ...)
+    """
+    selection_list = om.MSelectionList()
+    indices = dict()
+
+    for node_name, _, _ in wanted:
+        if node_name not in indices:
+            indices[node_name] = selection_list.length()
+            selection_list.add(node_name)
+
+    nodes = dict()
+    changes = list()
+
+    for node_name, attribute_name, value in wanted:
+
+        if node_name not in nodes:
+            nodes[node_name] = om.MFnDependencyNode(
+                selection_list.getDependNode(indices[node_name]),
+            )
+
+        plug = nodes[node_name].findPlug(attribute_name, False)
+
+        if isinstance(value, tuple):
+            current = [
+                plug.child(idx).asFloat()
+                for idx in range(plug.numChildren())
+            ]
+
+            if all(abs(a - b) <= _TOLERANCE for a, b in zip(current, value)):
+                continue
+
+        elif plug.asBool() == value:
+            continue
+
+        changes.append((node_name, attribute_name, value))
+
+    return changes
@@ -26,30 +26,51 @@ class LayerProcess(crab.Process):
 
         :return:
         """
-        # -- Ensure the layers exist
-        crab.utils.organise.add_to_layer(None, crab.config.CONTROL_LAYER)
-        crab.utils.organise.add_to_layer(None, crab.config.GEOMETRY_LAYER)
-        crab.utils.organise.add_to_layer(None, crab.config.SKELETON_LAYER)
-
-        # -- Add all the elements into the layers
-        for skeletal_joint in self.rig.skeleton_org().getChildren(ad=True, type='joint'):
-            crab.utils.organise.add_to_layer(
-                skeletal_joint,
-                crab.config.SKELETON_LAYER,
-            )
+        skeleton_members = self.context.names(
+            self.rig.skeleton_org(),
+            node_type='joint',
+        )
+
+        # -- Meshes are added to the layer through their transforms,
+        # -- which we only want to add once
+        geometry_members = list()
+        seen = set()
+
+        for mesh in self.context.names(
+                self.rig.find_org(GEOMETRY_GRP_NAME),
+                node_type='mesh',
+        ):
+            transform = mesh.rsplit('|', 1)[0]
 
-        for geometry in self.rig.find_org(GEOMETRY_GRP_NAME).getChildren(ad=True, type='mesh'):
-            crab.utils.organise.add_to_layer(
-                geometry.getParent(),
-                crab.config.GEOMETRY_LAYER,
+            if transform not in seen:
+                seen.add(transform)
+                geometry_members.append(transform)
+
+        control_members = [
+            control
+            for control in self.context.names(
+                self.rig.control_org(),
+                node_type='transform',
             )
+            if crab.config.CONTROL not in control.rsplit('|', 1)[-1]
+        ]
+
+        # -- Add all the elements into the layers, creating any layers
+        # -- which do not yet exist
+        crab.utils.organise.add_to_layer(
+            control_members,
+            crab.config.CONTROL_LAYER,
+        )
+
+        crab.utils.organise.add_to_layer(
+            geometry_members,
+            crab.config.GEOMETRY_LAYER,
+        )
 
-        for control in self.rig.control_org().getChildren(ad=True, type='transform'):
-            if crab.config.CONTROL not in control.name():
-                crab.utils.organise.add_to_layer(
-                    control,
-                    crab.config.CONTROL_LAYER,
-                )
+        crab.utils.organise.add_to_layer(
+            skeleton_members,
+            crab.config.SKELETON_LAYER,
+        )
 
         # -- Ensure the layers are setup correctly
         pm.PyNode(crab.config.SKELETON_LAYER).visibility.set(0)
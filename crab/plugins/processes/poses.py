@@ -21,7 +21,7 @@ class LayerProcess(crab.Process):
 
         :return:
         """
-        crab.tools.rigging().request('Poses : Apply A Pose')().run()
+        crab.tools.rigging().request('Poses : Apply A Pose')().run(rig=self.rig)
 
     # --------------------------------------------------------------------------
     # noinspection PyUnresolvedReferences
@@ -32,4 +32,4 @@ class LayerProcess(crab.Process):
 
         :return:
         """
-        crab.tools.rigging().request('Poses : Apply T Pose')().run()
+        crab.tools.rigging().request('Poses : Apply T Pose')().run(rig=self.rig)
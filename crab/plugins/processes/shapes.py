@@ -1,6 +1,23 @@
 import json
+import zlib
+import base64
+
 import crab
 import pymel.core as pm
+import maya.api.OpenMaya as om
+from maya import cmds
+
+
+# -- Stored shape data is compressed, and marked with this prefix so
+# -- we can still read data stored before compression was introduced
+_COMPRESSED_PREFIX = 'zlib:'
+
+# -- The value of the form attribute for periodic curves
+_PERIODIC = 2
+
+# -- Cv positions are stored to five decimal places, so any difference
+# -- smaller than this is not a real change
+_TOLERANCE = 0.0001
 
 
 # ------------------------------------------------------------------------------
@@ -8,13 +25,18 @@ class ShapeStoreProcess(crab.Process):
     """
     This is an example only plugin showing what a process plugin might
     be used for.
-    
+
     In this case, we're going to snapshot all the NurbsCurve shape
     nodes within the rig and store that information in a string attribute
-    allowing us to re-apply the sames post build. 
-    
+    allowing us to re-apply the sames post build.
+
     This mechanism allows a rigger to make control shape adjustments and have
     them retained through the rig iteration.
+
+    When re-applying, any controls whose shapes already match the stored
+    shapes are left alone, and controls whose shapes have the same topology
+    simply have their cvs moved. Shapes are only rebuilt where the topology
+    differs.
     """
 
     # -- Define the identifier for the plugin
@@ -24,10 +46,10 @@ class ShapeStoreProcess(crab.Process):
     # --------------------------------------------------------------------------
     def snapshot(self):
         """
-        This is called before the control rig is destroyed, so we will 
-        store all the control information here. 
-        
-        :return: 
+        This is called before the control rig is destroyed, so we will
+        store all the control information here.
+
+        :return:
         """
         # -- Create an attribute on the rig node to store the shape
         # -- information on
@@ -42,22 +64,34 @@ class ShapeStoreProcess(crab.Process):
         # -- ultimately store
         data_sets = list()
 
-        # -- Cycle over all the nodes in the control rig, skipping any
-        # -- which do not look like controls
-        for node in self.rig.control_org().getChildren(ad=True, type='transform'):
-            if crab.config.get_category(node.name()) == crab.config.CONTROL:
+        up_axis = cmds.upAxis(q=True, axis=True)
 
-                # -- Attempt to read the shape data
-                # -- from the node
-                curve_dictionary = read(node)
+        # -- Cycle over all the controls in the control rig, reading all
+        # -- of their curves through the api
+        curve_names = self.context.names(
+            self.rig.control_org(),
+            node_type='nurbsCurve',
+        )
 
-                # -- If there was any shape data we store it
-                if curve_dictionary:
-                    data_sets.append(curve_dictionary)
+        for node_name, curve_paths in _control_curves(curve_names):
+            data_sets.append(
+                dict(
+                    node=node_name,
+                    curves=[
+                        _read_curve(om.MFnNurbsCurve(curve_path))
+                        for curve_path in curve_paths
+                    ],
+                    up_axis=up_axis,
+                ),
+            )
 
         # -- Store all the data into the rig so we can call
         # -- upon it at a later stage
-        self.rig.node().attr('shapeInfo').set(json.dumps(data_sets))
+        self.rig.node().attr('shapeInfo').set(_encode(data_sets))
+
+        # -- Keep hold of the data too, so if this is part of a build
+        # -- we do not need to read it back
+        self.context.state(self.identifier)['data'] = data_sets
 
     # --------------------------------------------------------------------------
     # noinspection PyUnresolvedReferences
@@ -65,8 +99,8 @@ class ShapeStoreProcess(crab.Process):
         """
         This is called after the entire rig has been built, so we will attempt
         to re-apply the shape information.
-        
-        :return: 
+
+        :return:
         """
         # -- If the rig node does not have the attribute we store
         # -- shape info on, then there is little more we can do.
@@ -74,123 +108,293 @@ class ShapeStoreProcess(crab.Process):
             return
 
         # -- Read the stored data, and return if anything goes wrong
-        try:
-            shape_data = json.loads(
-                self.rig.node().attr('shapeInfo').get(),
-            )
+        shape_data = self.context.state(self.identifier).get('data')
+
+        if shape_data is None:
+            shape_data = _decode(self.rig.node().attr('shapeInfo').get())
 
-        except ValueError:
+        if not shape_data:
             return
 
+        # -- Shapes stored before the up axis was recorded were always
+        # -- stored in the up axis of the scene
+        current_up_axis = cmds.upAxis(q=True, axis=True)
+
+        assignments = list()
+        shapes_to_remove = list()
+        updated = 0
+
         # -- Cycle over the data looking for matching names
         for data in shape_data:
 
-            if not pm.objExists(data['node']):
+            selection_list = om.MSelectionList()
+
+            try:
+                selection_list.add(data['node'])
+
+            except RuntimeError:
                 continue
 
-            # -- Get the node in question
-            node = pm.PyNode(data['node'])
+            up_axis = data.get('up_axis', current_up_axis)
 
-            # -- Remove any pre-existing shapes
-            if node.getShapes():
-                pm.delete(node.getShapes())
+            # -- Bring the stored positions into the current up axis
+            if up_axis != current_up_axis:
+                for curve_data in data['curves']:
+                    curve_data['cvs'] = [
+                        crab.utils.shapes._refine(cv, up_axis, current_up_axis)
+                        for cv in curve_data['cvs']
+                    ]
 
-            # -- Now apply our new shapes
-            apply(
-                pm.PyNode(data['node']),
-                data,
-            )
+            data['up_axis'] = current_up_axis
+
+            curves = [
+                om.MFnNurbsCurve(curve_path)
+                for curve_path in _curves(selection_list.getDagPath(0))
+            ]
+
+            # -- If the topology of every curve matches then we only need
+            # -- to move the cvs of those which have changed
+            if _same_topology(curves, data['curves']):
+                for curve, curve_data in zip(curves, data['curves']):
+                    if _set_cvs(curve, curve_data):
+                        updated += 1
+
+                continue
+
+            # -- Otherwise we have to replace the shapes entirely
+            shapes_to_remove.extend(curve.fullPathName() for curve in curves)
+            assignments.append((data['node'], data))
+
+        if shapes_to_remove:
+            pm.delete(shapes_to_remove)
+
+        # -- Now apply all our new shapes in one go
+        if assignments:
+            crab.utils.shapes.apply_many(assignments)
+
+        # -- We have changed the shapes within the control rig, so the
+        # -- hierarchy held by the context is no longer accurate
+        if shapes_to_remove or assignments:
+            self.context.invalidate()
+
+        crab.log.debug(
+            'Shape Store : %s curves updated, %s controls rebuilt' % (
+                updated,
+                len(assignments),
+            ),
+        )
+
+
+# ------------------------------------------------------------------------------
+def _encode(data_sets):
+    """
+    Compresses the given shape data into a string which can be stored
+    on an attribute.
+
+    :param data_sets: Shape data to store
+    :type data_sets: list(dict, ...)
+
+    :return: str
+    """
+    compressed = zlib.compress(
+        json.dumps(data_sets, separators=(',', ':')).encode('utf-8'),
+    )
+
+    return _COMPRESSED_PREFIX + base64.b64encode(compressed).decode('ascii')
 
 
 # ------------------------------------------------------------------------------
-# noinspection PyUnresolvedReferences
-def read(node):
+def _decode(value):
     """
-    Looks at all the NurbsCurve shape nodes under  the given node
-    and attempts to read them
+    Reads shape data stored with _encode. Shape data stored as plain json
+    is also supported.
+
+    :param value: The stored string
+    :type value: str
+
+    :return: list(dict, ...) or None if the data could not be read
     """
-    shapes = list()
+    if not value:
+        return None
 
-    # -- If we have a transform, add any nurbs curves
-    # -- from it
-    for shape in node.getShapes():
-        if isinstance(shape, pm.nt.NurbsCurve):
-            shapes.append(shape)
+    try:
+        if value.startswith(_COMPRESSED_PREFIX):
+            value = zlib.decompress(
+                base64.b64decode(value[len(_COMPRESSED_PREFIX):]),
+            ).decode('utf-8')
 
-    if not shapes:
+        return json.loads(value)
+
+    except (ValueError, TypeError, zlib.error):
         return None
 
-    # -- Define out output data. Right now we're only storing
-    # -- cv's, but we wrap it in a dict so we can expand it
-    # -- later without compatibility issues.
-    data = dict(
-        node=node.name(),
-        curves=list()
+
+# ------------------------------------------------------------------------------
+def _control_curves(curve_names):
+    """
+    Groups the given curves by the control they belong to, ignoring any
+    curves which do not belong to controls.
+
+    :param curve_names: Long names of the curves
+    :type curve_names: list(str, ...)
+
+    :return: list(tuple(str, list(om.MDagPath, ...)), ...)
+    """
+    selection_list = om.MSelectionList()
+
+    for curve_name in curve_names:
+        selection_list.add(curve_name)
+
+    controls = list()
+    curves_by_control = dict()
+
+    for idx, curve_name in enumerate(curve_names):
+        node_name = curve_name.rsplit('|', 2)[-2]
+
+        # -- Skip any curves which do not belong to controls
+        if crab.config.get_category(node_name) != crab.config.CONTROL:
+            continue
+
+        if node_name not in curves_by_control:
+            curves_by_control[node_name] = list()
+            controls.append(node_name)
+
+        curves_by_control[node_name].append(selection_list.getDagPath(idx))
+
+    return [
+        (node_name, curves_by_control[node_name])
+        for node_name in controls
+    ]
+
+
+# ------------------------------------------------------------------------------
+def _curves(dag_path):
+    """
+    Returns the paths to all the nurbs curves directly beneath the given
+    transform.
+
+    :param dag_path: Path to the transform
+    :type dag_path: om.MDagPath
+
+    :return: list(om.MDagPath, ...)
+    """
+    curve_paths = list()
+
+    for idx in range(dag_path.childCount()):
+        child = dag_path.child(idx)
+
+        if not child.hasFn(om.MFn.kNurbsCurve):
+            continue
+
+        if om.MFnDagNode(child).isIntermediateObject:
+            continue
+
+        curve_path = om.MDagPath(dag_path)
+        curve_path.push(child)
+
+        curve_paths.append(curve_path)
+
+    return curve_paths
+
+
+# ------------------------------------------------------------------------------
+def _read_curve(curve):
+    """
+    Reads the data of the given curve in a single pass.
+
+    :param curve: The curve to read
+    :type curve: om.MFnNurbsCurve
+
+    :return: dict
+    """
+    return dict(
+        cvs=[
+            [round(point.x, 5), round(point.y, 5), round(point.z, 5)]
+            for point in curve.cvPositions()
+        ],
+
+        # -- The api form enum starts from invalid, whereas we store
+        # -- the value of the form attribute
+        form=curve.form - 1,
+        degree=curve.degree,
+        knots=list(curve.knots()),
     )
 
-    # -- Cycle the shapes and store thm
-    for shape in shapes:
 
-        node_data = dict(
-            cvs=list(),
-            form=shape.f.get(),
-            degree=shape.degree(),
-            knots=shape.getKnots()
-        )
+# ------------------------------------------------------------------------------
+def _same_topology(curves, curve_data_list):
+    """
+    Returns True if the given curves have the same degree, knots and cv
+    count as the given curve data, such that only their cvs may differ.
 
-        # -- Collect the positional data to an accuracy that is
-        # -- reasonable.
-        for cv in shape.getCVs():
-            node_data['cvs'].append(
-                [
-                    round(value, 5)
-                    for value in cv
-                ]
-            )
+    :param curves: The curves in the scene
+    :type curves: list(om.MFnNurbsCurve, ...)
+
+    :param curve_data_list: The stored curve data
+    :type curve_data_list: list(dict, ...)
+
+    :return: bool
+    """
+    if len(curves) != len(curve_data_list):
+        return False
+
+    for curve, curve_data in zip(curves, curve_data_list):
 
-        data['curves'].append(node_data)
+        if curve.degree != curve_data['degree']:
+            return False
 
-    return data
+        if curve.numCVs != len(curve_data['cvs']):
+            return False
+
+        knots = curve.knots()
+
+        if len(knots) != len(curve_data['knots']):
+            return False
+
+        for knot, stored_knot in zip(knots, curve_data['knots']):
+            if abs(knot - stored_knot) > _TOLERANCE:
+                return False
+
+    return True
 
 
 # ------------------------------------------------------------------------------
-def apply(node, data):
-    """
-    Applies the given shape data to the given node.
-    
-    :param node: Node to apply to
-    :type node: pm.nt.DagNode
-    
-    :param data: Shape data to apply
-    :type data: dict
-    
-    :return: list(pm.nt.NurbsCurve, ...) 
-    """
-    shapes = list()
-    for curve_data in data['curves']:
-
-        # -- Create a curve with teh given cv's
-        transform = pm.curve(
-            p=curve_data['cvs'],
-            d=curve_data['degree'],
-            k=curve_data['knots'],
-        )
+def _set_cvs(curve, curve_data):
+    """
+    Moves the cvs of the given curve to the positions held in the given
+    curve data, providing any of them have actually changed.
 
-        # -- Parent the shape under the node
-        shape = transform.getShape()
+    :param curve: The curve to alter
+    :type curve: om.MFnNurbsCurve
 
-        pm.parent(
-            shape,
-            node,
-            shape=True,
-            r=True,
-        )
+    :param curve_data: The stored curve data
+    :type curve_data: dict
 
-        # -- Delete the transform
-        pm.delete(transform)
+    :return: True if the curve was changed
+    """
+    cvs = curve_data['cvs']
+    current = curve.cvPositions()
+
+    changed = any(
+        abs(point.x - cv[0]) > _TOLERANCE or
+        abs(point.y - cv[1]) > _TOLERANCE or
+        abs(point.z - cv[2]) > _TOLERANCE
+        for point, cv in zip(current, cvs)
+    )
 
-        shapes.append(shape)
+    if not changed:
+        return False
 
-    pm.select(node)
+    # -- The cv positions of periodic curves include the overlapping
+    # -- cvs, which the cv attribute does not hold
+    if curve_data.get('form') == _PERIODIC:
+        cvs = cvs[:len(cvs) - curve_data['degree']]
+
+    # -- We write through cmds rather than the api so the change
+    # -- is undoable along with the rest of the build
+    cmds.setAttr(
+        '%s.cv[0:%s]' % (curve.fullPathName(), len(cvs) - 1),
+        *[value for cv in cvs for value in cv]
+    )
 
-    return shapes
+    return True
@@ -13,23 +13,27 @@ class DefineAPoseTool(crab.RigTool):
     def __init__(self):
         super(DefineAPoseTool, self).__init__()
         self.options.selection_only = False
+        self.options.pose_name = self.POSE_NAME
 
     # --------------------------------------------------------------------------
-    def run(self):
+    def run(self, rig=None):
+        """
+        Stores the current pose of the skeleton and guides.
 
+        :param rig: If given, only the nodes of this rig are considered,
+            otherwise all the nodes in the scene are considered.
+        :type rig: crab.Rig
+
+        :return: None
+        """
         if self.options.selection_only:
-            nodes = pm.selected()
+            nodes = [node.longName() for node in pm.selected(type='transform')]
 
         else:
-            nodes = pm.ls('%s_*' % crab.config.SKELETON, type='joint')
-            nodes.extend(pm.ls('%s_*' % crab.config.GUIDE, type='transform'))
+            nodes = crab.utils.poses.nodes(rig)
 
         with crab.utils.contexts.UndoChunk():
-            for joint in nodes:
-                if not joint.hasAttr(self.POSE_NAME):
-                    joint.addAttr(self.POSE_NAME, at='matrix')
-
-                joint.attr(self.POSE_NAME).set(joint.getMatrix())
+            crab.utils.poses.define(self.options.pose_name, nodes)
 
 
 # ------------------------------------------------------------------------------
@@ -42,27 +46,31 @@ class ApplyAPoseTool(crab.RigTool):
         super(ApplyAPoseTool, self).__init__()
         self.options.selection_only = False
         self.options.rotate_only = False
+        self.options.pose_name = self.POSE_NAME
 
     # --------------------------------------------------------------------------
-    def run(self):
+    def run(self, rig=None):
+        """
+        Applies the stored pose to the skeleton and guides.
+
+        :param rig: If given, only the nodes of this rig are posed,
+            otherwise all the nodes in the scene are posed.
+        :type rig: crab.Rig
+
+        :return: None
+        """
         if self.options.selection_only:
-            nodes = pm.selected()
+            nodes = [node.longName() for node in pm.selected(type='transform')]
 
         else:
-            nodes = pm.ls('%s_*' % crab.config.SKELETON, type='joint')
-            nodes.extend(pm.ls('%s_*' % crab.config.GUIDE, type='transform'))
+            nodes = crab.utils.poses.nodes(rig)
 
         with crab.utils.contexts.UndoChunk():
-            for joint in nodes:
-                if joint.hasAttr(self.POSE_NAME):
-
-                    pos = None
-                    if self.options.rotate_only:
-                        pos = joint.getTranslation()
-
-                    joint.setMatrix(joint.attr(self.POSE_NAME).get())
-                    if pos:
-                        joint.setTranslation(pos)
+            crab.utils.poses.apply(
+                self.options.pose_name,
+                nodes,
+                rotate_only=self.options.rotate_only,
+            )
 
 
 # ------------------------------------------------------------------------------
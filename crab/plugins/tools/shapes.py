@@ -439,10 +439,7 @@ class ApplyShapeTool(crab.RigTool):
     # --------------------------------------------------------------------------
     def __init__(self):
         super(ApplyShapeTool, self).__init__()
-        self.options.shapes = [
-            os.path.basename(path).replace('.json', '')
-            for path in crab.utils.shapes.shapes()
-        ]
+        self.options.shapes = crab.utils.shapes.library().names()
 
     # --------------------------------------------------------------------------
     def run(self, node=None, shape_name=None):
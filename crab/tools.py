@@ -192,6 +192,8 @@ def rigging():
         versioning_identifier='version',
         envvar=constants.PLUGIN_ENVIRONMENT_VARIABLE,
         paths=constants.PLUGIN_LOCATIONS,
+        scanner=utils.plugins.scanner(),
+        lazy=True,
     )
 
     return _rig_library
@@ -221,6 +223,8 @@ def animation():
         versioning_identifier='version',
         envvar=constants.PLUGIN_ENVIRONMENT_VARIABLE,
         paths=constants.PLUGIN_LOCATIONS,
+        scanner=utils.plugins.scanner(),
+        lazy=True,
     )
 
     return _anim_library
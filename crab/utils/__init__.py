@@ -7,3 +7,7 @@ from . import access
 from . import organise
 from . import contexts
 from . import hierarchy
+from . import profile
+from . import poses
+from . import plugins
+from . import tracking
@@ -1,5 +1,8 @@
+import math
 import collections
+
 import pymel.core as pm
+import maya.api.OpenMaya as om
 
 
 # ------------------------------------------------------------------------------
@@ -173,3 +176,81 @@ def get_likely_mirror_plane(node):
 
     else:
         return 'XZ'
+
+
+# ------------------------------------------------------------------------------
+def decompose(matrix, rotate_order=0, joint_orient=None, rotate_axis=None, previous=None):
+    """
+    Breaks the given local matrix down into the translate, rotate and
+    scale values which would need to be set on a node to give that
+    matrix. Shear and pivots are not taken into account.
+
+    :param matrix: The local matrix, either as a matrix or as a flat
+        list of sixteen floats
+    :type matrix: om.MMatrix or list(float, ...)
+
+    :param rotate_order: The rotate order of the node, as the value of
+        its rotateOrder attribute
+    :type rotate_order: int
+
+    :param joint_orient: The joint orient of the node in degrees, if it
+        is a joint
+    :type joint_orient: list(float, float, float)
+
+    :param rotate_axis: The rotate axis of the node in degrees
+    :type rotate_axis: list(float, float, float)
+
+    :param previous: If given, the rotation which is closest to these
+        rotation values (in degrees) is returned. This is useful to keep
+        the rotation continuous when decomposing matrices over time.
+    :type previous: list(float, float, float)
+
+    :return: tuple(list(float, float, float), ...) of the translate,
+        rotate (in degrees) and scale values
+    """
+    transform = om.MTransformationMatrix(om.MMatrix(matrix))
+
+    translate = transform.translation(om.MSpace.kTransform)
+    scale = transform.scale(om.MSpace.kTransform)
+
+    # -- The rotation of a node is built up from its rotate axis, its
+    # -- rotation and its joint orient (in that order), so we need to
+    # -- remove the rotate axis and joint orient to get the rotation
+    rotation = transform.rotation(asQuaternion=True).asMatrix()
+
+    if rotate_axis:
+        rotation = _euler_matrix(rotate_axis).inverse() * rotation
+
+    if joint_orient:
+        rotation = rotation * _euler_matrix(joint_orient).inverse()
+
+    euler = om.MTransformationMatrix(rotation).rotation().reorder(rotate_order)
+
+    if previous:
+        euler = euler.closestSolution(
+            om.MEulerRotation(
+                [math.radians(value) for value in previous],
+                rotate_order,
+            ),
+        )
+
+    return (
+        [translate.x, translate.y, translate.z],
+        [math.degrees(euler.x), math.degrees(euler.y), math.degrees(euler.z)],
+        list(scale),
+    )
+
+
+# ------------------------------------------------------------------------------
+def _euler_matrix(rotation):
+    """
+    Returns the rotation matrix for the given xyz rotation values.
+
+    :param rotation: Rotation values in degrees
+    :type rotation: list(float, float, float)
+
+    :return: om.MMatrix
+    """
+    return om.MEulerRotation(
+        [math.radians(value) for value in rotation],
+    ).asMatrix()
@@ -1,4 +1,5 @@
 import pymel.core as pm
+from maya import cmds
 
 
 # ------------------------------------------------------------------------------
@@ -28,10 +29,14 @@ def add_separator_attr(node):
 # ------------------------------------------------------------------------------
 def add_to_layer(nodes, layer_name):
     """
-    Adds a node to the layer with the given name. If that layer does not
+    Adds nodes to the layer with the given name. If that layer does not
     exist it will be created with default options.
 
-    :param nodes: List of nodes (or a single node)
+    All the nodes are added to the layer in a single membership edit, so
+    this should be given as many nodes as possible at once rather than
+    being called once per node.
+
+    :param nodes: Iterable of nodes or node names (or a single node)
     :type nodes: pm.nt.Transform or list(pm.nt.Transform, ..)
 
     :param layer_name: Name of layer to add to
@@ -41,19 +46,32 @@ def add_to_layer(nodes, layer_name):
     """
 
     # -- If the layer does not exist, we need to create it
-    if not pm.ls(layer_name, type='displayLayer'):
-        pm.createDisplayLayer(
+    if not cmds.ls(layer_name, type='displayLayer'):
+        cmds.createDisplayLayer(
             name=layer_name,
             empty=True,
         )
 
-    if not nodes:
+    if nodes is None:
         return
 
-    # -- If the nodes is a list a single node we should convert
-    # -- that to a list
-    nodes = [nodes]
+    # -- If we're given a single node we should convert that
+    # -- to a list
+    if isinstance(nodes, (pm.PyNode, str, type(u''))):
+        nodes = [nodes]
+
+    # -- Use long names where we can, so that nodes which share a
+    # -- short name are not ambiguous
+    names = [
+        node.longName() if isinstance(node, pm.nt.DagNode) else str(node)
+        for node in nodes
+    ]
 
-    # -- Get the layer
-    layer = pm.PyNode(layer_name)
-    layer.addMembers(nodes)
+    if not names:
+        return
+
+    cmds.editDisplayLayerMembers(
+        layer_name,
+        *names,
+        noRecurse=True
+    )
@@ -0,0 +1,90 @@
+"""
+This module holds the state which is shared between all of crab's plugin
+factories, such as the on-disk plugin discovery cache and the scanner
+which walks, scans and imports the plugin locations.
+
+Because every factory shares the same scanner, each plugin file is only
+ever walked, scanned and imported once regardless of how many factories
+take plugins from it.
+"""
+import os
+
+from .. import constants
+from ..vendor import factories
+
+
+# -- We only want a single discovery cache in memory, as every
+# -- factory reads from and writes to the same file
+_CACHE = list()
+
+# -- Likewise we only want a single scanner
+_SCANNER = list()
+
+
+# ------------------------------------------------------------------------------
+def cache():
+    """
+    Returns the discovery cache which all crab factories share. If the
+    cache has been disabled through the environment variable then None
+    is returned.
+
+    :return: factories.DiscoveryCache or None
+    """
+    if _CACHE:
+        return _CACHE[0]
+
+    filepath = os.environ.get(
+        constants.PLUGIN_CACHE_ENVIRONMENT_VARIABLE,
+        constants.PLUGIN_CACHE_LOCATION,
+    )
+
+    _CACHE.append(
+        factories.DiscoveryCache(filepath) if filepath else None,
+    )
+
+    return _CACHE[0]
+
+
+# ------------------------------------------------------------------------------
+def scanner():
+    """
+    Returns the scanner which all crab factories share.
+
+    :return: factories.Scanner
+    """
+    if not _SCANNER:
+        _SCANNER.append(
+            factories.Scanner(cache=cache()),
+        )
+
+    return _SCANNER[0]
+
+
+# ------------------------------------------------------------------------------
+def reload():
+    """
+    Forgets everything the shared scanner has learned and then reloads
+    every crab factory, such that the plugin locations are walked and
+    scanned again. Each location is still only walked once between all
+    the factories.
+
+    Reloading a single factory does not clear the shared scanner, so this
+    should be used whenever plugin files have been added or changed.
+
+    :return: None
+    """
+    from .. import core
+    from .. import tools
+
+    scanner().clear()
+
+    manager = core.factory_manager()
+
+    for factory in [
+        manager.components,
+        manager.processes,
+        manager.behaviours,
+        tools.rigging(),
+        tools.animation(),
+    ]:
+        factory.reload()
@@ -0,0 +1,270 @@
+"""
+Poses are stored as matrix attributes on the skeletal joints and the
+guides of a rig, with the name of the attribute being the name of the
+pose. Any number of named poses may be stored, though crab itself relies
+upon the APose and TPose.
+
+All the matrices are read through the api in a single pass, and only
+the nodes whose values actually differ are written to.
+"""
+import maya.api.OpenMaya as om
+from maya import cmds
+
+from .. import config
+
+
+# -- Matrix values which differ by less than this are considered
+# -- to be the same
+_TOLERANCE = 0.0001
+
+
+# ------------------------------------------------------------------------------
+def nodes(rig=None):
+    """
+    Returns the long names of all the nodes which hold poses. If a rig is
+    given then only the skeletal joints and guides of that rig are
+    returned, otherwise all skeletal joints and guides in the root
+    namespace of the scene are returned.
+
+    :param rig: Optional rig to restrict the nodes to
+    :type rig: crab.Rig
+
+    :return: list(str, ...)
+    """
+    if not rig:
+        return (
+            cmds.ls('%s_*' % config.SKELETON, type='joint', long=True) or list()
+        ) + (
+            cmds.ls('%s_*' % config.GUIDE, type='transform', long=True) or list()
+        )
+
+    return _prefixed(rig.skeleton_org(), config.SKELETON, 'joint') + \
+        _prefixed(rig.guide_org(), config.GUIDE, 'transform')
+
+
+# ------------------------------------------------------------------------------
+def read(pose_name, node_names):
+    """
+    Reads the given pose from all the given nodes.
+
+    :param pose_name: Name of the pose to read
+    :type pose_name: str
+
+    :param node_names: Names of the nodes to read from
+    :type node_names: list(str, ...)
+
+    :return: dict(str: list(float, ...)) of flattened matrices for
+        every node which has the pose stored
+    """
+    pose = dict()
+
+    for node_name, dag_path in _dag_paths(node_names):
+        matrix = _stored_matrix(dag_path, pose_name)
+
+        if matrix is not None:
+            pose[node_name] = matrix
+
+    return pose
+
+
+# ------------------------------------------------------------------------------
+def define(pose_name, node_names):
+    """
+    Stores the current local matrix of each of the given nodes as the
+    pose with the given name.
+
+    :param pose_name: Name of the pose to store
+    :type pose_name: str
+
+    :param node_names: Names of the nodes to store the pose on
+    :type node_names: list(str, ...)
+
+    :return: Number of nodes whose stored pose was changed
+    """
+    changed = 0
+
+    for node_name, dag_path in _dag_paths(node_names):
+        current = _local_matrix(dag_path)
+        stored = _stored_matrix(dag_path, pose_name)
+
+        if stored is not None and _matches(stored, current):
+            continue
+
+        if not cmds.attributeQuery(pose_name, node=node_name, exists=True):
+            cmds.addAttr(node_name, longName=pose_name, attributeType='matrix')
+
+        cmds.setAttr(
+            '%s.%s' % (node_name, pose_name),
+            *current,
+            type='matrix'
+        )
+        changed += 1
+
+    return changed
+
+
+# ------------------------------------------------------------------------------
+def apply(pose_name, node_names, rotate_only=False):
+    """
+    Sets the local matrix of each of the given nodes to the pose with
+    the given name. Nodes which do not have the pose stored are left
+    untouched.
+
+    :param pose_name: Name of the pose to apply
+    :type pose_name: str
+
+    :param node_names: Names of the nodes to apply the pose to
+    :type node_names: list(str, ...)
+
+    :param rotate_only: If True, the translation of each node is retained
+    :type rotate_only: bool
+
+    :return: Number of nodes which were changed
+    """
+    changed = 0
+
+    for node_name, dag_path in _dag_paths(node_names):
+        stored = _stored_matrix(dag_path, pose_name)
+
+        if stored is None:
+            continue
+
+        current = _local_matrix(dag_path)
+
+        if rotate_only:
+            stored = stored[:12] + current[12:]
+
+        if _matches(stored, current):
+            continue
+
+        cmds.xform(node_name, matrix=stored, objectSpace=True)
+        changed += 1
+
+    return changed
+
+
+# ------------------------------------------------------------------------------
+def _prefixed(org, prefix, node_type):
+    """
+    Returns the long names of all the nodes of the given type beneath the
+    given node whose names start with the given prefix, ignoring any
+    namespace.
+
+    :param org: Node to search beneath
+    :type org: pm.nt.Transform
+
+    :param prefix: Name prefix, such as SKL
+    :type prefix: str
+
+    :param node_type: Type of node to return
+    :type node_type: str
+
+    :return: list(str, ...)
+    """
+    if not org:
+        return list()
+
+    prefix = '%s_' % prefix
+
+    return [
+        node_name
+        for node_name in cmds.ls(
+            org.longName(),
+            dag=True,
+            long=True,
+            type=node_type,
+        ) or list()
+        if node_name.rsplit('|', 1)[-1].rsplit(':', 1)[-1].startswith(prefix)
+    ]
+
+
+# ------------------------------------------------------------------------------
+def _dag_paths(node_names):
+    """
+    Resolves all the given names to dag paths in a single selection list,
+    skipping any which do not exist.
+
+    :param node_names: Names of the nodes to resolve
+    :type node_names: list(str, ...)
+
+    :return: list(tuple(str, om.MDagPath), ...)
+    """
+    selection_list = om.MSelectionList()
+    resolved = list()
+
+    for node_name in node_names:
+        idx = selection_list.length()
+
+        try:
+            selection_list.add(node_name)
+
+        except RuntimeError:
+            continue
+
+        # -- Adding a node which is already in the list does not
+        # -- add a new item
+        if selection_list.length() == idx:
+            continue
+
+        resolved.append((node_name, selection_list.getDagPath(idx)))
+
+    return resolved
+
+
+# ------------------------------------------------------------------------------
+def _local_matrix(dag_path):
+    """
+    Returns the local matrix of the given node, flattened.
+
+    :param dag_path: Path to the node
+    :type dag_path: om.MDagPath
+
+    :return: list(float, ...)
+    """
+    matrix = om.MFnDagNode(dag_path).transformationMatrix()
+    return [matrix[idx] for idx in range(16)]
+
+
+# ------------------------------------------------------------------------------
+def _stored_matrix(dag_path, pose_name):
+    """
+    Returns the pose matrix stored on the given node, flattened.
+
+    :param dag_path: Path to the node
+    :type dag_path: om.MDagPath
+
+    :param pose_name: Name of the pose attribute
+    :type pose_name: str
+
+    :return: list(float, ...) or None if the pose is not stored
+    """
+    node = om.MFnDependencyNode(dag_path.node())
+
+    if not node.hasAttribute(pose_name):
+        return None
+
+    matrix = om.MFnMatrixData(
+        node.findPlug(pose_name, False).asMObject(),
+    ).matrix()
+
+    return [matrix[idx] for idx in range(16)]
+
+
+# ------------------------------------------------------------------------------
+def _matches(matrix_a, matrix_b):
+    """
+    Returns True if the two flattened matrices are the same within
+    tolerance.
+
+    :param matrix_a: First matrix to compare
+    :type matrix_a: list(float, ...)
+
+    :param matrix_b: Second matrix to compare
+    :type matrix_b: list(float, ...)
+
+    :return: bool
+    """
+    return all(
+        abs(a - b) <= _TOLERANCE
+        for a, b in zip(matrix_a, matrix_b)
+    )
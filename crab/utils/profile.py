@@ -0,0 +1,382 @@
+"""
+This module exposes a lightweight profiler which is used to record the
+cost of each stage of a rig build. Each profiled section records its wall
+time, the number of dependency graph nodes created and the number of maya
+commands executed (which is what every pymel call ultimately resolves to).
+
+Sections are recorded against whichever profiler is currently active, and
+cost next to nothing when no profiler is active.
+
+Counting commands requires a callback on every command maya executes, so
+by default this is only done when the profile environment variable is
+set. Wall time and node counts are always recorded.
+
+..code-block:: python
+
+    >>> import crab
+    >>>
+    >>> rig = crab.Rig.all()[0]
+    >>> rig.build()
+    >>>
+    >>> # -- Print the most expensive parts of the build
+    >>> for entry in rig.last_profile.report()[:10]:
+    ...     print(entry['name'], entry['time'], entry['nodes'])
+    >>>
+    >>> # -- Write out a trace which can be loaded into chrome://tracing
+    >>> rig.last_profile.write_trace('c:/temp/build_trace.json')
+"""
+import os
+import json
+import time
+
+import maya.api.OpenMaya as om
+
+from .. import constants
+
+
+# -- Use the highest resolution timer available to us
+_timer = getattr(time, 'perf_counter', time.time)
+
+# -- This is the stack of currently active profilers
+_ACTIVE = list()
+
+
+# ------------------------------------------------------------------------------
+class Profiler(object):
+    """
+    Records timed sections along with the amount of nodes created and
+    commands executed within them.
+
+    :param label: Label to record the profile under
+    :type label: str
+
+    :param count_commands: If True the commands executed are counted. If
+        not given, commands are only counted when the profile environment
+        variable is set.
+    :type count_commands: bool
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self, label='crab', count_commands=None):
+        self.label = label
+        self.events = list()
+
+        if count_commands is None:
+            count_commands = enabled()
+
+        self.count_commands = count_commands
+
+        self._origin = None
+        self._node_count = 0
+        self._command_count = 0
+        self._callback_ids = list()
+
+    # --------------------------------------------------------------------------
+    def __enter__(self):
+        self.start()
+        return self
+
+    # --------------------------------------------------------------------------
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # --------------------------------------------------------------------------
+    def start(self):
+        """
+        Starts recording. Whilst recording this profiler is the one which
+        all sections are recorded against.
+
+        :return: None
+        """
+        self._origin = _timer()
+
+        # -- We only listen to scene events whilst we're recording,
+        # -- so there is no overhead outside of a profiled call
+        self._callback_ids = [
+            om.MDGMessage.addNodeAddedCallback(
+                self._on_node_added,
+                'dependNode',
+            ),
+        ]
+
+        # -- Listening to every command is far more expensive, so we
+        # -- only do it when asked to
+        if self.count_commands:
+            self._callback_ids.append(
+                om.MCommandMessage.addCommandCallback(
+                    self._on_command,
+                ),
+            )
+
+        _ACTIVE.append(self)
+
+    # --------------------------------------------------------------------------
+    def stop(self):
+        """
+        Stops recording.
+
+        :return: None
+        """
+        for callback_id in self._callback_ids:
+            try:
+                om.MMessage.removeCallback(callback_id)
+
+            except RuntimeError:
+                pass
+
+        self._callback_ids = list()
+
+        if self in _ACTIVE:
+            _ACTIVE.remove(self)
+
+    # --------------------------------------------------------------------------
+    def section(self, name, category='crab'):
+        """
+        Returns a context which will record the time, node count and
+        command count of everything executed within it.
+
+        :param name: Name of the section, such as the plugin identifier
+        :type name: str
+
+        :param category: The category of the section, such as 'component'
+        :type category: str
+
+        :return: Context
+        """
+        return _Section(self, name, category)
+
+    # --------------------------------------------------------------------------
+    def report(self):
+        """
+        Returns a summary of the recorded sections, with sections of the
+        same category and name combined. The result is sorted with the
+        most expensive sections first.
+
+        :return: list(dict, ...)
+        """
+        summary = dict()
+
+        for event in self.events:
+            key = (event['category'], event['name'])
+
+            if key not in summary:
+                summary[key] = dict(
+                    category=event['category'],
+                    name=event['name'],
+                    calls=0,
+                    time=0.0,
+                    nodes=0,
+                    commands=0,
+                )
+
+            entry = summary[key]
+            entry['calls'] += 1
+            entry['time'] += event['duration']
+            entry['nodes'] += event['nodes']
+            entry['commands'] += event['commands']
+
+        return sorted(
+            summary.values(),
+            key=lambda item: item['time'],
+            reverse=True,
+        )
+
+    # --------------------------------------------------------------------------
+    def trace(self):
+        """
+        Returns the recorded sections in the chrome trace event format.
+
+        :return: dict
+        """
+        return dict(
+            traceEvents=[
+                dict(
+                    name=event['name'],
+                    cat=event['category'],
+                    ph='X',
+                    ts=int(event['start'] * 1000000),
+                    dur=int(event['duration'] * 1000000),
+                    pid=1,
+                    tid=1,
+                    args=dict(
+                        nodes=event['nodes'],
+                        commands=event['commands'],
+                    ),
+                )
+                for event in self.events
+            ],
+            displayTimeUnit='ms',
+            otherData=dict(label=self.label),
+        )
+
+    # --------------------------------------------------------------------------
+    def write_trace(self, filepath):
+        """
+        Writes the recorded sections to the given filepath in the chrome
+        trace event format, allowing it to be inspected in chrome://tracing
+
+        :param filepath: Path to write the trace to
+        :type filepath: str
+
+        :return: None
+        """
+        with open(filepath, 'w') as f:
+            json.dump(self.trace(), f)
+
+    # --------------------------------------------------------------------------
+    def write_report(self, filepath):
+        """
+        Writes the summary along with all the recorded sections to the
+        given filepath as json.
+
+        :param filepath: Path to write the report to
+        :type filepath: str
+
+        :return: None
+        """
+        with open(filepath, 'w') as f:
+            json.dump(
+                dict(
+                    label=self.label,
+                    summary=self.report(),
+                    events=self.events,
+                ),
+                f,
+                indent=4,
+            )
+
+    # --------------------------------------------------------------------------
+    def dump(self):
+        """
+        If the profile environment variable is set this will write a trace
+        file into the location it defines.
+
+        :return: Path written to, or None
+        """
+        location = os.environ.get(constants.PROFILE_ENVIRONMENT_VARIABLE)
+
+        if not location or not os.path.isdir(location):
+            return None
+
+        filepath = os.path.join(
+            location,
+            '%s_%s.json' % (
+                self.label.replace('.', '_'),
+                time.strftime('%Y%m%d_%H%M%S'),
+            ),
+        )
+
+        self.write_trace(filepath)
+
+        return filepath
+
+    # --------------------------------------------------------------------------
+    # noinspection PyUnusedLocal
+    def _on_node_added(self, *args):
+        self._node_count += 1
+
+    # --------------------------------------------------------------------------
+    # noinspection PyUnusedLocal
+    def _on_command(self, *args):
+        self._command_count += 1
+
+
+# ------------------------------------------------------------------------------
+class _Section(object):
+    """
+    Context which records a single section against a profiler
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self, profiler, name, category):
+        self._profiler = profiler
+        self._name = name
+        self._category = category
+
+        self._start = None
+        self._nodes = None
+        self._commands = None
+
+    # --------------------------------------------------------------------------
+    def __enter__(self):
+        self._start = _timer()
+        self._nodes = self._profiler._node_count
+        self._commands = self._profiler._command_count
+        return self
+
+    # --------------------------------------------------------------------------
+    def __exit__(self, *exc_info):
+        profiler = self._profiler
+
+        profiler.events.append(
+            dict(
+                name=self._name,
+                category=self._category,
+                start=self._start - profiler._origin,
+                duration=_timer() - self._start,
+                nodes=profiler._node_count - self._nodes,
+                commands=profiler._command_count - self._commands,
+            ),
+        )
+
+
+# ------------------------------------------------------------------------------
+class _NullSection(object):
+    """
+    Context used when there is no active profiler
+    """
+
+    # --------------------------------------------------------------------------
+    def __enter__(self):
+        return self
+
+    # --------------------------------------------------------------------------
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_SECTION = _NullSection()
+
+
+# ------------------------------------------------------------------------------
+def enabled():
+    """
+    Returns True if detailed profiling has been requested through the
+    profile environment variable.
+
+    :return: bool
+    """
+    return bool(os.environ.get(constants.PROFILE_ENVIRONMENT_VARIABLE))
+
+
+# ------------------------------------------------------------------------------
+def active():
+    """
+    Returns the currently active profiler, if there is one.
+
+    :return: Profiler or None
+    """
+    if _ACTIVE:
+        return _ACTIVE[-1]
+
+    return None
+
+
+# ------------------------------------------------------------------------------
+def section(name, category='crab'):
+    """
+    Returns a context which records the given section against the currently
+    active profiler. If there is no active profiler this does nothing.
+
+    :param name: Name of the section, such as the plugin identifier
+    :type name: str
+
+    :param category: The category of the section, such as 'component'
+    :type category: str
+
+    :return: Context
+    """
+    if _ACTIVE:
+        return _ACTIVE[-1].section(name, category)
+
+    return _NULL_SECTION
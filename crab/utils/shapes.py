@@ -1,10 +1,14 @@
 import os
 import json
 import pymel.core as pm
+from maya import cmds
 
 
 from .. import constants
 
+# -- The shared shape library, which is created on first use
+_LIBRARY = list()
+
 AXIS = dict(
     y=[
         0.0,
@@ -96,7 +100,6 @@ def read(node):
 
 
 # ------------------------------------------------------------------------------
-# noinspection PyTypeChecker
 def apply(node, data):
     """
     Applies the given shape data to the given node.
@@ -109,55 +112,124 @@ def apply(node, data):
 
     :return: list(pm.nt.NurbsCurve, ...)
     """
-    # -- If the data is a filepath we need to extract it
-    if not isinstance(data, dict):
-
-        # -- Check for a filepath
-        if not os.path.exists(data):
-            # -- Look for a filename in the shape dir
-            data = find_shape(data)
-            
-        # -- If the path still does not exist then we cannot do
-        # -- anything with it
-        if not data or not os.path.exists(data):
-            constants.log.warning('Could not find shape data for %s' % data)
-            return None
+    return apply_many([(node, data)])[0]
 
-        with open(data, 'r') as f:
-            data = json.load(f)
 
-    # -- Define a list which we will collate all the shapes
-    # -- in
-    shapes = list()
+# ------------------------------------------------------------------------------
+def apply_many(assignments):
+    """
+    Applies shape data to many nodes in a single call. Each curve shape
+    is created directly under its node and its geometry written in one
+    setAttr, so the creation is undoable without any temporary transforms
+    and the selection is left untouched.
+
+    .. code-block:: python
+
+        >>> import crab
+        >>>
+        >>> crab.utils.shapes.apply_many(
+        ...     [
+        ...         (control_a, 'cube'),
+        ...         (control_b, 'sphere'),
+        ...         (control_c, shape_data),
+        ...     ],
+        ... )
+
+    :param assignments: List of pairs, each being the node to apply to
+        and the shape data to apply. The shape data may be given as a
+        dictionary, or as the name of (or path to) a shape in the library.
+    :type assignments: list(tuple(pm.nt.DagNode, dict or str), ...)
+
+    :return: A list of the created shapes for each assignment (or None
+        where the shape data could not be found)
+    """
+    # -- The up axis cannot change whilst we're applying the shapes
+    # -- so we only query it once
+    current_up_axis = cmds.upAxis(q=True, axis=True)
+
+    results = list()
+
+    for node, data in assignments:
+
+        # -- If the data is a shape name or filepath we take it from the
+        # -- library, which gives it to us in the current up axis
+        if not isinstance(data, dict):
+            shape_name = data
+            data = library().data(shape_name, up_axis=current_up_axis)
+
+            # -- If the path still does not exist then we cannot do
+            # -- anything with it
+            if not data:
+                constants.log.warning('Could not find shape data for %s' % shape_name)
+                results.append(None)
+                continue
+
+        up_axis = data.get('up_axis', 'z')
+
+        # -- Define a list which we will collate all the shapes
+        # -- in
+        shapes = list()
+
+        for curve_data in data['curves']:
+            shape_name = cmds.createNode(
+                'nurbsCurve',
+                parent=str(node),
+                skipSelect=True,
+            )
+
+            _set_geometry(
+                shape_name,
+                curve_data,
+                [
+                    _refine(cv, up_axis, current_up_axis)
+                    for cv in curve_data['cvs']
+                ],
+            )
 
-    # -- Cycle over each curve element in the data
-    for curve_data in data['curves']:
+            shapes.append(pm.PyNode(shape_name))
 
-        # -- Create a curve with the given cv's
-        transform = pm.curve(
-            p=[refine_from_up_axis(p, up_axis=data.get('up_axis', 'z')) for p in curve_data['cvs']],
-            d=curve_data['degree'],
-            k=curve_data['knots'],
-        )
+        results.append(shapes)
 
-        # -- Parent the shape under the node
-        shape = transform.getShape()
+    return results
 
-        pm.parent(
-            shape,
-            node,
-            shape=True,
-            r=True,
-        )
 
-        # -- Delete the transform
-        pm.delete(transform)
+# ------------------------------------------------------------------------------
+def _set_geometry(shape, curve_data, cvs):
+    """
+    Writes the geometry of the given curve shape in a single setAttr
+    on its create attribute.
+
+    :param shape: Name of the nurbsCurve shape to write to
+    :type shape: str
 
-        shapes.append(shape)
+    :param curve_data: The curve data, holding the degree, form and knots
+    :type curve_data: dict
 
-    pm.select(node)
+    :param cvs: The cv positions to write, including any cvs which
+        overlap on periodic curves
+    :type cvs: list(list(float, float, float), ...)
 
-    return shapes
+    :return: None
+    """
+    degree = curve_data['degree']
+    knots = curve_data['knots']
+
+    flat_cvs = list()
+
+    for cv in cvs:
+        flat_cvs.extend(cv)
+
+    cmds.setAttr(
+        shape + '.cc',
+        degree,
+        len(cvs) - degree,
+        curve_data.get('form', 0),
+        False,
+        3,
+        len(knots),
+        *(list(knots) + [len(cvs)] + flat_cvs),
+        type='nurbsCurve'
+    )
 
 
 # ------------------------------------------------------------------------------
@@ -175,6 +247,25 @@ def refine_from_up_axis(position, up_axis='z'):
     # -- Get the current axis setting
     current_up_axis = pm.upAxis(q=True, axis=True)
 
+    return _refine(position, up_axis, current_up_axis)
+
+
+# ------------------------------------------------------------------------------
+def _refine(position, up_axis, current_up_axis):
+    """
+    Performs the work of refine_from_up_axis, with the current up axis
+    given rather than queried.
+
+    :param position: List of length3
+
+    :param up_axis: The up axis the position was stored in
+    :type up_axis: str
+
+    :param current_up_axis: The up axis of the scene
+    :type current_up_axis: str
+
+    :return: List of length 3
+    """
     # -- If we're working in the same axis space as the stored shape
     # -- then we can simply return the list as it is
     if current_up_axis == up_axis:
@@ -190,6 +281,248 @@ def refine_from_up_axis(position, up_axis='z'):
     return altered_position
 
 
+# ------------------------------------------------------------------------------
+class ShapeLibrary(object):
+    """
+    Indexes all the shape files found in the shape locations, and holds the
+    data of each shape once it has been read.
+
+    The locations are only walked when the library is first used, or when
+    a shape is requested which is not in the index. Shape data is held in
+    memory and only re-read when the modification time of its file changes.
+
+    .. code-block:: python
+
+        >>> import crab
+        >>>
+        >>> library = crab.utils.shapes.library()
+        >>>
+        >>> # -- List all the shapes available
+        >>> print(library.names())
+        >>>
+        >>> # -- Get the data for a shape, in the current up axis
+        >>> data = library.data('cube', up_axis='y')
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self, locations=None):
+        self._locations = locations or self.default_locations()
+
+        # -- Shape names to filepaths, in the order they were found
+        self._index = None
+        self._filepaths = list()
+
+        # -- Filepaths to the modification time and data which was read,
+        # -- along with the data converted to any up axes requested
+        self._data = dict()
+        self._converted = dict()
+
+    # --------------------------------------------------------------------------
+    def __repr__(self):
+        return '[SHAPE LIBRARY - Shapes: %s]' % len(self.names())
+
+    # --------------------------------------------------------------------------
+    @classmethod
+    def default_locations(cls):
+        """
+        Returns the locations shapes are searched for within, starting with
+        the builtin shape location followed by any locations defined through
+        the CRAB_PLUGIN_PATHS environment variable.
+
+        :return: list(str, ...)
+        """
+        # -- Define a list of locations to search for, starting by
+        # -- adding in our builtin shape locations
+        paths = [
+            os.path.join(
+                os.path.dirname(os.path.dirname(__file__)),
+                'shapes',
+            ),
+        ]
+
+        # -- If we have any paths defined by environment
+        # -- variables we should add them here
+        if constants.PLUGIN_ENVIRONMENT_VARIABLE in os.environ:
+            paths.extend(
+                os.environ[constants.PLUGIN_ENVIRONMENT_VARIABLE].split(';'),
+            )
+
+        return paths
+
+    # --------------------------------------------------------------------------
+    def locations(self):
+        """
+        Returns the locations this library searches within
+
+        :return: list(str, ...)
+        """
+        return list(self._locations)
+
+    # --------------------------------------------------------------------------
+    def refresh(self):
+        """
+        Walks all the shape locations, re-building the index of shapes.
+
+        :return: None
+        """
+        self._index = dict()
+        self._filepaths = list()
+
+        for path in self._locations:
+            for root, _, files in os.walk(path):
+                for filename in files:
+                    if not filename.endswith('.json'):
+                        continue
+
+                    filepath = os.path.join(
+                        root,
+                        filename,
+                    )
+
+                    self._filepaths.append(filepath)
+
+                    # -- Where shapes share a name the first one found
+                    # -- takes precedence
+                    self._index.setdefault(
+                        filename.replace('.json', ''),
+                        filepath,
+                    )
+
+    # --------------------------------------------------------------------------
+    def filepaths(self):
+        """
+        Returns the filepaths of all the shapes in the library
+
+        :return: list(str, ...)
+        """
+        if self._index is None:
+            self.refresh()
+
+        return list(self._filepaths)
+
+    # --------------------------------------------------------------------------
+    def names(self):
+        """
+        Returns the names of all the shapes in the library, sorted
+        alphabetically.
+
+        :return: list(str, ...)
+        """
+        if self._index is None:
+            self.refresh()
+
+        return sorted(self._index.keys())
+
+    # --------------------------------------------------------------------------
+    def find(self, name):
+        """
+        Returns the filepath for the shape with the given name. If the name
+        is not known the locations are walked again in case it has been
+        added since.
+
+        :param name: Name of shape to search for
+        :type name: str
+
+        :return: Absolute path to shape, or None
+        """
+        if self._index is None:
+            self.refresh()
+
+        filepath = self._index.get(name)
+
+        # -- If the shape is not known, or has been removed, then
+        # -- we look again
+        if not filepath or not os.path.exists(filepath):
+            self.refresh()
+            filepath = self._index.get(name)
+
+        return filepath
+
+    # --------------------------------------------------------------------------
+    def data(self, name, up_axis=None):
+        """
+        Returns the data for the given shape. The data is only read from
+        disk if it has not been read before or the file has changed since.
+
+        Note: The returned data is shared, and should not be modified.
+
+        :param name: The name of the shape, or the filepath to it
+        :type name: str
+
+        :param up_axis: If given the cv positions will be converted to this
+            up axis.
+        :type up_axis: str
+
+        :return: dict or None
+        """
+        filepath = name if os.path.isfile(name) else self.find(name)
+
+        if not filepath:
+            return None
+
+        try:
+            modified = os.path.getmtime(filepath)
+
+        except OSError:
+            return None
+
+        # -- Read the file if we do not have it, or it has changed
+        entry = self._data.get(filepath)
+
+        if not entry or entry[0] != modified:
+            with open(filepath, 'r') as f:
+                entry = (modified, json.load(f))
+
+            self._data[filepath] = entry
+
+            # -- Any data converted from the previous read is stale
+            for key in list(self._converted.keys()):
+                if key[0] == filepath:
+                    self._converted.pop(key)
+
+        data = entry[1]
+
+        if not up_axis or data.get('up_axis', 'z') == up_axis:
+            return data
+
+        key = (filepath, up_axis)
+
+        if key not in self._converted:
+            converted = dict(data)
+            converted['up_axis'] = up_axis
+            converted['curves'] = [
+                dict(
+                    curve_data,
+                    cvs=[
+                        _refine(cv, data.get('up_axis', 'z'), up_axis)
+                        for cv in curve_data['cvs']
+                    ],
+                )
+                for curve_data in data['curves']
+            ]
+
+            self._converted[key] = converted
+
+        return self._converted[key]
+
+
+# ------------------------------------------------------------------------------
+def library():
+    """
+    Returns the shape library shared throughout crab. If the shape
+    locations have changed since the library was created a new library
+    is returned.
+
+    :return: ShapeLibrary
+    """
+    locations = ShapeLibrary.default_locations()
+
+    if not _LIBRARY or _LIBRARY[0].locations() != locations:
+        _LIBRARY[:] = [ShapeLibrary(locations)]
+
+    return _LIBRARY[0]
+
+
 # ------------------------------------------------------------------------------
 def find_shape(name):
     """
@@ -202,13 +535,7 @@ def find_shape(name):
     
     :return: Absolute path to shape 
     """
-    for path in shapes():
-        shape_name = os.path.basename(path).replace('.json', '')
-
-        if shape_name == name:
-            return path
-
-    return None
+    return library().find(name)
 
 
 # ------------------------------------------------------------------------------
@@ -218,33 +545,4 @@ def shapes():
 
     :return: list
     """
-    # -- Define a list of locations to search for, starting by
-    # -- adding in our builtin shape locations
-    paths = [
-        os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            'shapes',
-        ),
-    ]
-
-    # -- If we have any paths defined by environment
-    # -- variables we should add them here
-    if constants.PLUGIN_ENVIRONMENT_VARIABLE in os.environ:
-        paths.extend(
-            os.environ[constants.PLUGIN_ENVIRONMENT_VARIABLE].split(';'),
-        )
-
-    shape_list = list()
-
-    for path in paths:
-        for root, _, files in os.walk(path):
-            for filename in files:
-                if filename.endswith('.json'):
-                    shape_list.append(
-                        os.path.join(
-                            root,
-                            filename,
-                        ),
-                    )
-
-    return shape_list
+    return library().filepaths()
@@ -1,15 +1,45 @@
+import re
+
 import pymel.core as pm
+import maya.api.OpenMaya as om
+from maya import cmds
 
-# from .. import config
+from .. import config
 from .. import create
+from . import maths
+from . import tracking
+
+
+# -- This holds the snap registry of each namespace
+_REGISTRIES = dict()
+
+# -- Regex to match the attributes which define the nodes within a
+# -- snap relationship, on either a snap node or a snap table
+_SNAP_ATTRIBUTES = re.compile(r'(snaps\[\d+\]\.)?(snapSource|snapTarget|snapZero|nodesToZero)\b')
+
+# -- Regex to pull the entry index and attribute from a plug of
+# -- a snap table
+_ENTRY_PLUG = re.compile(r'\.snaps\[(\d+)\]\.(\w+)')
+
+# -- These are the attributes which are written when snapping
+_CHANNELS = [
+    'translateX', 'translateY', 'translateZ',
+    'rotateX', 'rotateY', 'rotateZ',
+    'scaleX', 'scaleY', 'scaleZ',
+]
 
 
 # ------------------------------------------------------------------------------
-def new(node, target, label='', resets=None):
+def new(node, target, label='', resets=None, table=False):
     """
     Creates a snap mapping from the given node to the target. The current
     offset between the two are stored during this process, allowing for that
     offset to be retained when a snap is requested.
+
+    By default each snap mapping is stored on its own network node. If
+    table is True the mapping is instead stored as an entry within the
+    snap table of the namespace the node resides in - meaning a rig only
+    ever needs a single node to hold all of its snap mappings.
     
     :param node: The node which can be snapped
     :type node: pm.nt.Transform
@@ -20,9 +50,39 @@ def new(node, target, label='', resets=None):
     :param label: An identifier for the snap offset
     :type label: str
 
-    :return: Snap node containing the offset
-    :rtype: pm.nt.DependNode
+    :param resets: Nodes which should be zeroed whenever the snap is
+        performed
+    :type resets: list(pm.nt.Transform, ...)
+
+    :param table: If True, the mapping is stored in the snap table
+    :type table: bool
+
+    :return: Snap node containing the offset, or the table entry if
+        table is True
+    :rtype: pm.nt.DependNode or pm.Attribute
     """
+    if table:
+        namespace = _namespace(node.name())
+
+        offset = om.MMatrix(
+            cmds.xform(node.longName(), query=True, matrix=True, worldSpace=True),
+        ) * om.MMatrix(
+            cmds.xform(target.longName(), query=True, matrix=True, worldSpace=True),
+        ).inverse()
+
+        entry = _add_entry(
+            _table(namespace, create_if_missing=True),
+            label=label,
+            source=node.longName(),
+            target=target.longName(),
+            offset=[offset[idx] for idx in range(16)],
+            zero=[node_to_zero.longName() for node_to_zero in resets or list()],
+        )
+
+        registry(namespace).invalidate()
+
+        return pm.PyNode(entry)
+
     # -- Create a new snap node
     snap_node = _new_node()
 
@@ -70,6 +130,10 @@ def new(node, target, label='', resets=None):
             )
             node_to_zero.message.connect(plug)
 
+    # -- The relationship is only complete now it is connected, so
+    # -- ensure it is picked up by the registry
+    registry(_namespace(snap_node.name())).invalidate()
+
     return snap_node
 
 
@@ -90,27 +154,71 @@ def remove(node, label=None):
 
     :return: The number of snap relationships removed.
     """
-    snap_nodes = get(node)
+    relationships = _get(node, label=label)
 
-    if not snap_nodes:
+    if not relationships:
         return 0
 
-    # -- Assume we need to delete everything
-    to_delete = snap_nodes
+    # -- Remove the relationships, whether they are stored on their
+    # -- own node or within a snap table
+    to_delete = list()
 
-    # -- Check if we need to filter by a specified lable
-    if label:
-        to_delete = [
-            snap_node
-            for snap_node in snap_nodes
-            if snap_node.label.get() == label
-        ]
+    for relationship in relationships:
+        if relationship['entry'] is None:
+            to_delete.append(relationship['node'])
+
+        else:
+            cmds.removeMultiInstance(relationship['plug'], b=True)
+
+    if to_delete:
+        cmds.delete(to_delete)
+
+    registry(_namespace(node.name())).invalidate()
+
+    return len(relationships)
+
+
+# ------------------------------------------------------------------------------
+def migrate(namespace=''):
+    """
+    Moves all the snap mappings within the given namespace which are
+    stored on their own network nodes into the snap table of that
+    namespace, removing the network nodes.
+
+    :param namespace: The namespace to migrate, with an empty string
+        representing the root namespace
+    :type namespace: str
+
+    :return: The number of snap mappings migrated
+    """
+    snap_registry = registry(namespace)
+
+    legacy = [
+        relationship
+        for relationship in snap_registry.relationships()
+        if relationship['entry'] is None
+    ]
+
+    if not legacy:
+        return 0
 
-    # -- Remove the relationships
-    delete_count = len(to_delete)
-    pm.delete(to_delete)
+    table = _table(snap_registry.namespace, create_if_missing=True)
 
-    return delete_count
+    for relationship in legacy:
+        _add_entry(
+            table,
+            label=relationship['label'],
+            source=relationship['source'],
+            target=relationship['target'],
+            offset=relationship['offset'],
+            zero=relationship['zero'],
+        )
+
+    cmds.delete([relationship['node'] for relationship in legacy])
+
+    snap_registry.invalidate()
+
+    return len(legacy)
 
 
 # ------------------------------------------------------------------------------
@@ -123,12 +231,7 @@ def labels(node):
 
     :return: list(str, str, str, ...)
     """
-    found_labels = [
-        snap_node.label.get()
-        for snap_node in get(node)
-    ]
-
-    return list(set(found_labels))
+    return registry(_namespace(node.name())).labels(node.longName())
 
 
 # ------------------------------------------------------------------------------
@@ -150,36 +253,10 @@ def members(label, namespace=None, from_nodes=None):
 
     :return: list(pm.nt.Transform, pm.nt.Transform, ...)
     """
-    # -- Get all the snap nodes
-    snap_nodes = pm.ls('*.isCrabSnap', r=True, o=True)
-
-    # -- Define our output
-    matched = list()
-
-    for snap_node in snap_nodes:
-
-        # -- Skip nodes which do not have matching labels
-        if snap_node.label.get() != label:
-            continue
-
-        # -- Filter any namespace differences if required
-        if namespace and namespace not in snap_node.name():
-            continue
-
-        # -- Filter by the node list if given
-        if from_nodes:
-
-            source_node = snap_node.snapSource.inputs()
-
-            if not source_node:
-                continue
-
-            if source_node[0] not in from_nodes:
-                continue
-
-        matched.append(snap_node)
-
-    return sorted(matched, key=lambda x: x.snapSource.inputs()[0].longName().count('|'))
+    return [
+        pm.PyNode(relationship['plug'])
+        for relationship in _members(label, namespace, from_nodes)
+    ]
 
 
 # ------------------------------------------------------------------------------
@@ -198,44 +275,14 @@ def get(node, target=None, label=None):
         will be returned
     :type label: str
 
-    :return: list(pm.nt.Network, ...)
+    :return: list(pm.nt.Network or pm.Attribute, ...) of the snap nodes,
+        or the snap table entries
     """
-
-    # -- Cycle over all the network nodes connected
-    # -- to our snapSource
-    possibilities = [
-        attr.node()
-        for attr in node.message.outputs(type='network', plugs=True)
-        if attr.name(includeNode=False) == 'snapSource'
-    ]
-
-    # -- Ensure we're only dealing with snap nodes
-    possibilities = [
-        possibility
-        for possibility in possibilities
-        if possibility.hasAttr('isCrabSnap')
+    return [
+        pm.PyNode(relationship['plug'])
+        for relationship in _get(node, target, label)
     ]
 
-    # -- If we're asked to get by label lets restrict
-    # -- to that now
-    if label:
-        possibilities = [
-            possibility
-            for possibility in possibilities
-            if possibility.label.get() == label
-        ]
-
-    # -- If we're given a specific target lets filter
-    # -- out anything else
-    if target:
-        possibilities = [
-            possibility
-            for possibility in possibilities
-            if target in possibility.snapTarget.inputs()
-        ]
-
-    return possibilities
-
 
 # ------------------------------------------------------------------------------
 def snappable(node):
@@ -247,11 +294,244 @@ def snappable(node):
 
     :return: bool
     """
-    return len(get(node)) > 0
+    return bool(
+        registry(_namespace(node.name())).relationships(source=node.longName()),
+    )
+
+
+# ------------------------------------------------------------------------------
+def registry(namespace=''):
+    """
+    Returns the snap registry for the given namespace, creating it if
+    it does not yet exist.
+
+    :param namespace: The namespace the snap nodes reside in, with an
+        empty string representing the root namespace
+    :type namespace: str
+
+    :return: SnapRegistry
+    """
+    namespace = namespace.strip(':')
+
+    if namespace not in _REGISTRIES:
+
+        # -- Ensure we're told whenever a snap node enters or leaves
+        # -- the scene, so we know when a registry is out of date
+        if not tracking.is_name_listener(_on_name_changed):
+            tracking.add_name_listener(_on_name_changed)
+
+        if not tracking.is_connection_listener(_on_connection_changed):
+            tracking.add_connection_listener(_on_connection_changed)
+
+        _REGISTRIES[namespace] = SnapRegistry(namespace)
+
+    return _REGISTRIES[namespace]
+
+
+# ------------------------------------------------------------------------------
+class SnapRegistry(object):
+    """
+    A snap registry holds all the snap relationships within a single
+    namespace - which typically means a single rig. All the snap nodes are
+    read in one go the first time the registry is queried, and from then
+    on the relationships are served from memory until a snap node is
+    added to, removed from or rewired within the namespace.
+
+    The nodes involved in each relationship are held by handle, and their
+    names are resolved whenever the relationship is read. Therefore
+    renaming, re-parenting or deleting them does not leave the registry
+    holding stale names.
+
+    Each relationship is a dictionary holding the name of the snap node
+    along with its label, source, target, offset and the nodes it
+    should zero. Relationships stored in a snap table also hold the
+    index of their entry within the table.
+
+    .. code-block:: python
+
+        >>> import crab
+        >>>
+        >>> snaps = crab.utils.snap.registry('character_a')
+        >>>
+        >>> for relationship in snaps.relationships(label='IKFK'):
+        ...     print(relationship['source'], relationship['target'])
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self, namespace=''):
+        self.namespace = namespace
+
+        self._relationships = None
+        self._by_label = None
+        self._by_source = None
+
+    # --------------------------------------------------------------------------
+    def __repr__(self):
+        return '[SNAP REGISTRY - %s]' % (self.namespace or ':')
+
+    # --------------------------------------------------------------------------
+    def invalidate(self):
+        """
+        Forgets all the relationships, forcing them to be read from the
+        scene when next requested.
+
+        :return: None
+        """
+        self._relationships = None
+        self._by_label = None
+        self._by_source = None
+
+    # --------------------------------------------------------------------------
+    def relationships(self, label=None, source=None):
+        """
+        Returns the relationships within the namespace, ordered such that
+        the shallowest sources come first.
+
+        :param label: If given, only relationships with this label are
+            returned
+        :type label: str
+
+        :param source: If given, only relationships which snap this node
+            (given as a long name) are returned
+        :type source: str
+
+        :return: list(dict, ...)
+        """
+        self._build()
+
+        if source is not None:
+            handle = _handle(source)
+
+            if not handle:
+                return list()
+
+            relationships = [
+                relationship
+                for relationship in self._by_source.get(handle.hashCode(), list())
+                if relationship['handles']['source'] == handle
+            ]
+
+            if label is not None:
+                relationships = [
+                    relationship
+                    for relationship in relationships
+                    if relationship['label'] == label
+                ]
+
+        elif label is not None:
+            relationships = self._by_label.get(label, list())
+
+        else:
+            relationships = self._relationships
+
+        return _refresh(relationships)
+
+    # --------------------------------------------------------------------------
+    def labels(self, source=None):
+        """
+        Returns all the labels within the namespace.
+
+        :param source: If given, only labels of relationships which snap
+            this node (given as a long name) are returned
+        :type source: str
+
+        :return: list(str, ...)
+        """
+        return list(
+            set(
+                relationship['label']
+                for relationship in self.relationships(source=source)
+            ),
+        )
+
+    # --------------------------------------------------------------------------
+    def _build(self):
+        """
+        Reads all the snap nodes in the namespace.
+
+        :return: None
+        """
+        if self._relationships is not None:
+            return
+
+        pattern = '*.isCrabSnap'
+
+        if self.namespace:
+            pattern = '%s:%s' % (self.namespace, pattern)
+
+        snap_nodes = cmds.ls(pattern, objectsOnly=True) or list()
+        tables = cmds.ls(pattern.replace('isCrabSnap', 'isCrabSnapTable'), objectsOnly=True) or list()
+
+        # -- Read all the connections of each type in one go
+        sources = _inputs(snap_nodes, 'snapSource')
+        targets = _inputs(snap_nodes, 'snapTarget')
+        zeros = _inputs(snap_nodes, 'nodesToZero')
+
+        relationships = list()
+
+        for snap_node in snap_nodes:
+
+            # -- Without a source there is nothing to snap
+            if not sources.get(snap_node):
+                continue
+
+            relationships.append(
+                dict(
+                    node=snap_node,
+                    plug=snap_node,
+                    entry=None,
+                    label=cmds.getAttr('%s.label' % snap_node) or '',
+                    source=sources[snap_node][0],
+                    target=(targets.get(snap_node) or [None])[0],
+                    offset=cmds.getAttr('%s.offsetMatrix' % snap_node),
+                    zero=zeros.get(snap_node, list()),
+                    zero_plan=None,
+                ),
+            )
+
+        for table in tables:
+            relationships.extend(_entries(table))
+
+        # -- Hold all the nodes by handle, so we're not affected by
+        # -- them being renamed or re-parented
+        names = set()
+
+        for relationship in relationships:
+            names.add(relationship['node'])
+            names.add(relationship['source'])
+            names.add(relationship['target'])
+            names.update(relationship['zero'])
+
+        handles = _handles(names)
+
+        for relationship in relationships:
+            relationship['handles'] = dict(
+                node=handles.get(relationship['node']),
+                source=handles.get(relationship['source']),
+                target=handles.get(relationship['target']),
+                zero=[handles.get(name) for name in relationship['zero']],
+            )
+
+        # -- Without a source there is nothing to snap
+        relationships = [
+            relationship
+            for relationship in relationships
+            if relationship['handles']['source']
+        ]
+
+        self._relationships = relationships
+        self._by_label = dict()
+        self._by_source = dict()
+
+        for relationship in relationships:
+            self._by_label.setdefault(relationship['label'], list()).append(relationship)
+            self._by_source.setdefault(
+                relationship['handles']['source'].hashCode(),
+                list(),
+            ).append(relationship)
 
 
 # ------------------------------------------------------------------------------
-# noinspection PyUnresolvedReferences
 def snap(node, target, start_time=None, end_time=None, key=True):
     """
     This will match one node to the other providing there is a snap
@@ -283,51 +563,26 @@ def snap(node, target, start_time=None, end_time=None, key=True):
     :return:
     """
     # -- Get the snaps between the two nodes
-    snap_nodes = get(node, target=target)
+    relationships = _get(node, target=target)
 
     # -- If we have a snap, take the first and use that offset matrix
     # -- otherwise we use
-    if snap_nodes:
-        offset_matrix = snap_nodes[0].offsetMatrix.get()
+    if relationships:
+        relationship = relationships[0]
 
     else:
-        offset_matrix = pm.dt.Matrix()
-
-    # -- Get the list of nodes to reset
-    zero_these = list()
-    if snap_nodes[0].hasAttr('nodesToZero'):
-        zero_these = snap_nodes[0].nodesToZero.inputs()
-
-    # -- Use the current time if we're not given specific
-    # -- frame ranges
-    start_time = start_time if start_time is not None else int(pm.currentTime())
-    end_time = end_time if end_time is not None else int(pm.currentTime())
-
-    # -- Cycle the frame range ensuring we dont accidentally
-    # -- drop off the last frame
-    for frame in range(start_time, end_time+1):
-        pm.setCurrentTime(frame)
-
-        _set_worldspace_matrix(
-            node,
-            target,
-            offset_matrix,
+        relationship = dict(
+            source=node.longName(),
+            target=target.longName(),
+            offset=None,
+            zero=list(),
+            zero_plan=None,
         )
 
-        # -- Zero any nodes which require it
-        for node_to_zero in zero_these:
-            _zero_node(node_to_zero)
-
-            if key or start_time != end_time:
-                pm.setKeyframe(node_to_zero)
-
-        # -- Check if we need to key
-        if key or start_time != end_time:
-            pm.setKeyframe(node)
+    _bake([relationship], start_time, end_time, key)
 
 
 # ------------------------------------------------------------------------------
-# noinspection PyUnresolvedReferences
 def snap_label(label=None, restrict_to=None, start_time=None, end_time=None, key=True):
     """
     This will match all the members of the snap group.
@@ -354,73 +609,984 @@ def snap_label(label=None, restrict_to=None, start_time=None, end_time=None, key
 
     :return:
     """
-    # -- Get a list of all the snap nodes with this label
-    snap_nodes = members(
-        label,
-        from_nodes=restrict_to
+    # -- Get all the relationships with this label, skipping any
+    # -- which are missing their target
+    relationships = [
+        relationship
+        for relationship in _members(label, from_nodes=restrict_to)
+        if relationship['target']
+    ]
+
+    _bake(relationships, start_time, end_time, key)
+
+
+# ------------------------------------------------------------------------------
+def _get(node, target=None, label=None):
+    """
+    Returns the relationships of the given node.
+
+    :param node: Node to query
+    :type node: pm.nt.Transform
+
+    :param target: If given, only relationships with this target are
+        returned
+    :type target: pm.nt.Transform
+
+    :param label: If given, only relationships with this label are
+        returned
+    :type label: str
+
+    :return: list(dict, ...)
+    """
+    relationships = registry(_namespace(node.name())).relationships(
+        label=label,
+        source=node.longName(),
     )
 
+    if target:
+        target_name = target.longName()
+
+        relationships = [
+            relationship
+            for relationship in relationships
+            if relationship['target'] == target_name
+        ]
+
+    return relationships
+
+
+# ------------------------------------------------------------------------------
+def _members(label, namespace=None, from_nodes=None):
+    """
+    Returns the relationships with the given label.
+
+    :param label: The label to query for
+    :type label: str
+
+    :param namespace: If given, only relationships within this namespace
+        are returned
+    :type namespace: str
+
+    :param from_nodes: If given, only relationships which snap one of
+        these nodes are returned
+    :type from_nodes: list(pm.nt.Transform, ..)
+
+    :return: list(dict, ...)
+    """
+    if namespace is not None:
+        namespaces = [namespace]
+
+    elif from_nodes:
+        namespaces = set(_namespace(node.name()) for node in from_nodes)
+
+    else:
+        namespaces = [''] + (
+            cmds.namespaceInfo(':', listOnlyNamespaces=True, recurse=True) or list()
+        )
+
+    relationships = list()
+
+    for namespace_name in namespaces:
+        relationships.extend(registry(namespace_name).relationships(label=label))
+
+    if from_nodes:
+        source_names = set(node.longName() for node in from_nodes)
+
+        relationships = [
+            relationship
+            for relationship in relationships
+            if relationship['source'] in source_names
+        ]
+
+    return sorted(relationships, key=lambda r: r['source'].count('|'))
+
+
+# ------------------------------------------------------------------------------
+def _table(namespace, create_if_missing=False):
+    """
+    Returns the snap table of the given namespace.
+
+    :param namespace: The namespace to look in
+    :type namespace: str
+
+    :param create_if_missing: If True, the table will be created if
+        it does not already exist
+    :type create_if_missing: bool
+
+    :return: str or None if there is no table
+    """
+    pattern = '*.isCrabSnapTable'
+
+    if namespace:
+        pattern = '%s:%s' % (namespace, pattern)
+
+    tables = cmds.ls(pattern, objectsOnly=True)
+
+    if tables:
+        return tables[0]
+
+    if not create_if_missing:
+        return None
+
+    # -- The table must live in the same namespace as the nodes
+    # -- it holds mappings for
+    current_namespace = cmds.namespaceInfo(currentNamespace=True, absoluteName=True)
+    cmds.namespace(setNamespace=':%s' % namespace)
+
+    try:
+        return _new_table()
+
+    finally:
+        cmds.namespace(setNamespace=current_namespace)
+
+
+# ------------------------------------------------------------------------------
+def _add_entry(table, label, source, target, offset, zero):
+    """
+    Adds a snap mapping to the given snap table.
+
+    :param table: Name of the snap table
+    :type table: str
+
+    :param label: An identifier for the snap offset
+    :type label: str
+
+    :param source: Long name of the node which can be snapped
+    :type source: str
+
+    :param target: Long name of the node which acts as a snapping target
+    :type target: str
+
+    :param offset: Flattened offset matrix
+    :type offset: list(float, ...)
+
+    :param zero: Long names of the nodes to zero
+    :type zero: list(str, ...)
+
+    :return: The name of the entry plug
+    """
+    indices = cmds.getAttr('%s.snaps' % table, multiIndices=True) or list()
+    entry = '%s.snaps[%s]' % (table, max(indices) + 1 if indices else 0)
+
+    cmds.setAttr('%s.snapLabel' % entry, label or '', type='string')
+    cmds.setAttr('%s.snapOffset' % entry, *offset, type='matrix')
+
+    cmds.connectAttr('%s.message' % source, '%s.snapSource' % entry, force=True)
+
+    if target:
+        cmds.connectAttr('%s.message' % target, '%s.snapTarget' % entry, force=True)
+
+    for idx, node_to_zero in enumerate(zero):
+        cmds.connectAttr(
+            '%s.message' % node_to_zero,
+            '%s.snapZero[%s]' % (entry, idx),
+        )
+
+    return entry
+
+
+# ------------------------------------------------------------------------------
+def _entries(table):
+    """
+    Reads all the snap mappings held within the given snap table.
+
+    :param table: Name of the snap table
+    :type table: str
+
+    :return: list(dict, ...)
+    """
+    # -- Read all the connections into the table in one go
+    connections = cmds.listConnections(
+        table,
+        source=True,
+        destination=False,
+        connections=True,
+        fullNodeName=True,
+    ) or list()
+
+    connected = dict()
+
+    for plug, node in zip(connections[::2], connections[1::2]):
+        match = _ENTRY_PLUG.search(plug)
+
+        if match:
+            connected.setdefault(
+                (int(match.group(1)), match.group(2)),
+                list(),
+            ).append(node)
+
+    entries = list()
+
+    for index in cmds.getAttr('%s.snaps' % table, multiIndices=True) or list():
+        sources = connected.get((index, 'snapSource'))
+
+        # -- Without a source there is nothing to snap
+        if not sources:
+            continue
+
+        entry = '%s.snaps[%s]' % (table, index)
+
+        entries.append(
+            dict(
+                node=table,
+                plug=entry,
+                entry=index,
+                label=cmds.getAttr('%s.snapLabel' % entry) or '',
+                source=sources[0],
+                target=(connected.get((index, 'snapTarget')) or [None])[0],
+                offset=cmds.getAttr('%s.snapOffset' % entry),
+                zero=connected.get((index, 'snapZero'), list()),
+                zero_plan=None,
+            ),
+        )
+
+    return entries
+
+
+# ------------------------------------------------------------------------------
+def _inputs(nodes, attribute):
+    """
+    Returns the long names of the nodes connected into the given
+    attribute of each of the given nodes, using a single query.
+
+    :param nodes: Names of the nodes to query
+    :type nodes: list(str, ...)
+
+    :param attribute: Name of the attribute to query
+    :type attribute: str
+
+    :return: dict(str: list(str, ...))
+    """
+    if not nodes:
+        return dict()
+
+    connections = cmds.listConnections(
+        ['%s.%s' % (node, attribute) for node in nodes],
+        source=True,
+        destination=False,
+        connections=True,
+        fullNodeName=True,
+    ) or list()
+
+    inputs = dict()
+
+    # -- Connections are given as pairs of our plug and the
+    # -- node connected into it
+    for plug, connected in zip(connections[::2], connections[1::2]):
+        inputs.setdefault(plug.split('.', 1)[0], list()).append(connected)
+
+    return inputs
+
+
+# ------------------------------------------------------------------------------
+def _namespace(name):
+    """
+    Returns the namespace of the given node name, without any leading or
+    trailing colons.
+
+    :param name: Name of the node
+    :type name: str
+
+    :return: str
+    """
+    name = name.rsplit('|', 1)[-1].lstrip(':')
+
+    if ':' not in name:
+        return ''
+
+    return name.rsplit(':', 1)[0]
+
+
+# ------------------------------------------------------------------------------
+def _on_name_changed(old_name, new_name):
+    """
+    Invalidates the registry of any namespace in which a snap node has
+    been added, removed or renamed.
+
+    :param old_name: The name leaving the scene, if any
+    :type old_name: str
+
+    :param new_name: The name entering the scene, if any
+    :type new_name: str
+
+    :return: None
+    """
+    # -- This tells us everything may have changed
+    if old_name is None and new_name is None:
+        for snap_registry in _REGISTRIES.values():
+            snap_registry.invalidate()
+
+        return
+
+    for name in (old_name, new_name):
+
+        if not name:
+            continue
+
+        if config.get_category(name.rsplit(':', 1)[-1]) != config.SNAP:
+            continue
+
+        snap_registry = _REGISTRIES.get(_namespace(name))
+
+        if snap_registry:
+            snap_registry.invalidate()
+
+
+# ------------------------------------------------------------------------------
+def _on_connection_changed(source, destination):
+    """
+    Invalidates the registry of any namespace in which a snap node has
+    had its source, target or nodes to zero rewired.
+
+    :param source: The source plug of the connection
+    :type source: str
+
+    :param destination: The destination plug of the connection
+    :type destination: str
+
+    :return: None
+    """
+    node_name, _, attribute_name = destination.partition('.')
+
+    if not _SNAP_ATTRIBUTES.match(attribute_name):
+        return
+
+    snap_registry = _REGISTRIES.get(_namespace(node_name))
+
+    if snap_registry:
+        snap_registry.invalidate()
+
+
+# ------------------------------------------------------------------------------
+def _handles(names):
+    """
+    Returns a handle for each of the given node names, skipping any
+    which do not exist.
+
+    :param names: Names of the nodes
+    :type names: list(str, ...)
+
+    :return: dict(str: om.MObjectHandle)
+    """
+    handles = dict()
+
+    for name in names:
+        if not name:
+            continue
+
+        handle = _handle(name)
+
+        if handle:
+            handles[name] = handle
+
+    return handles
+
+
+# ------------------------------------------------------------------------------
+def _handle(name):
+    """
+    Returns a handle to the node with the given name.
+
+    :param name: Name of the node
+    :type name: str
+
+    :return: om.MObjectHandle or None if the node does not exist
+    """
+    selection_list = om.MSelectionList()
+
+    try:
+        selection_list.add(name)
+
+    except RuntimeError:
+        return None
+
+    return om.MObjectHandle(selection_list.getDependNode(0))
+
+
+# ------------------------------------------------------------------------------
+def _handle_name(handle):
+    """
+    Returns the current name of the node held by the given handle, which
+    for dag nodes is the long name.
+
+    :param handle: The handle to the node
+    :type handle: om.MObjectHandle
+
+    :return: str or None if the node no longer exists
+    """
+    if not handle or not handle.isValid():
+        return None
+
+    node = handle.object()
+
+    if node.hasFn(om.MFn.kDagNode):
+        return om.MFnDagNode(node).fullPathName()
+
+    return om.MFnDependencyNode(node).name()
+
+
+# ------------------------------------------------------------------------------
+def _refresh(relationships):
+    """
+    Updates the names held by the given relationships from their handles,
+    so they reflect any renaming or re-parenting. Relationships whose node
+    or source no longer exist are not returned.
+
+    :param relationships: The relationships to refresh
+    :type relationships: list(dict, ...)
+
+    :return: list(dict, ...) ordered such that the shallowest sources
+        come first
+    """
+    refreshed = list()
+
+    for relationship in relationships:
+        handles = relationship['handles']
+
+        node = _handle_name(handles['node'])
+        source = _handle_name(handles['source'])
+
+        if not node or not source:
+            continue
+
+        zero = [
+            name
+            for name in (_handle_name(handle) for handle in handles['zero'])
+            if name
+        ]
+
+        # -- The zero plan is built from the names, so it is no longer
+        # -- valid if they have changed
+        if zero != relationship['zero']:
+            relationship['zero_plan'] = None
+
+        if relationship['entry'] is not None:
+            relationship['plug'] = '%s.snaps[%s]' % (node, relationship['entry'])
+
+        else:
+            relationship['plug'] = node
+
+        relationship['node'] = node
+        relationship['source'] = source
+        relationship['target'] = _handle_name(handles['target'])
+        relationship['zero'] = zero
+
+        refreshed.append(relationship)
+
+    return sorted(refreshed, key=lambda r: r['source'].count('|'))
+
+
+# ------------------------------------------------------------------------------
+def _bake(relationships, start_time=None, end_time=None, key=True):
+    """
+    Performs the snap for all the given relationships over the given
+    frame range.
+
+    The nodes to zero are zeroed across the range first, as their values
+    do not change over time. Rather than stepping the timeline, the world
+    matrices of all the nodes involved are then evaluated at each frame
+    through a dg context, and the local transforms of the snapped nodes
+    are computed in a single pass before anything is written. The snapped
+    nodes then have their keys across the range replaced.
+
+    Where a snapped node (or its target) sits beneath another snapped
+    node, the effect of that snap is taken into account. Where a target
+    is driven through the dependency graph by a node snapped before it,
+    the snaps are split into passes which are evaluated and written one
+    after the other.
+
+    :param relationships: List of relationships, as held by a
+        SnapRegistry
+    :type relationships: list(dict, ...)
+
+    :param start_time: The time to start from
+    :type start_time: int
+
+    :param end_time: The time to stop at
+    :type end_time: int
+
+    :param key: Whether to key a snap which happens on a single frame
+    :type key: bool
+
+    :return: None
+    """
+    if not relationships:
+        return
+
     # -- Use the current time if we're not given specific
     # -- frame ranges
-    start_time = start_time if start_time is not None else int(pm.currentTime())
-    end_time = end_time if end_time is not None else int(pm.currentTime())
+    start_time = start_time if start_time is not None else int(cmds.currentTime(q=True))
+    end_time = end_time if end_time is not None else int(cmds.currentTime(q=True))
 
-    # -- Cycle the frame range ensuring we dont accidentally
-    # -- drop off the last frame
-    for frame in range(start_time, end_time+1):
-        pm.setCurrentTime(frame)
+    key = key or start_time != end_time
 
-        for snap_node in snap_nodes:
+    # -- Ensure we dont accidentally drop off the last frame
+    frames = list(range(start_time, end_time + 1))
 
-            # -- NOTE: We *could* group the target/node together
-            # -- outside the frame iteration as an optimisation. For
-            # -- the sake of code simplicity on the first pass its
-            # -- done during iteration.
-            pass
+    # -- Process the shallowest nodes first, so that the new world
+    # -- matrices of any parents are known before their children
+    relationships = sorted(
+        relationships,
+        key=lambda r: r['source'].count('|'),
+    )
 
-            # -- Get the target node - if there is no target
-            # -- we do nothing
-            targets = snap_node.snapTarget.inputs()
+    # -- Work out how to zero the nodes which require it before we
+    # -- start, so we never have to inspect their attributes again
+    zero_plan = list()
+    zeroed = set()
 
-            if not targets:
-                continue
+    for relationship in relationships:
 
-            # -- Pull out the target as a named variable for
-            # -- code clarity
-            target = targets[0]
+        # -- The plan is stored with the relationship, so we only
+        # -- need to work it out once
+        if relationship.get('zero_plan') is None:
+            relationship['zero_plan'] = _zero_plan(relationship['zero'])
 
-            # -- Pull out the node to modify
-            nodes = snap_node.snapSource.inputs()
+        for plug, value in relationship['zero_plan']:
+            if plug not in zeroed:
+                zeroed.add(plug)
+                zero_plan.append((plug, value))
 
-            if not nodes:
-                continue
+    # -- The zeroed values are constant, so we apply them before
+    # -- sampling so that any targets they affect are evaluated
+    # -- with them in place
+    _apply_zero_plan(zero_plan, frames, key)
+
+    for relationships_pass in _passes(relationships):
+        _bake_pass(relationships_pass, frames, key)
+
+
+# ------------------------------------------------------------------------------
+def _bake_pass(relationships, frames, key):
+    """
+    Samples, computes and writes the snaps of the given relationships,
+    none of which may be driven through the dependency graph by another
+    within the same pass.
+
+    :param relationships: List of relationships, ordered such that the
+        shallowest sources come first
+    :type relationships: list(dict, ...)
+
+    :param frames: Frames to snap over
+    :type frames: list(int, ...)
+
+    :param key: Whether to key the snapped values
+    :type key: bool
+
+    :return: None
+    """
+    # -- Gather every node whose world matrix we need to know
+    paths = set()
+
+    for relationship in relationships:
+        paths.add(relationship['source'])
+        paths.add(relationship['target'])
+
+        parent = _parent(relationship['source'])
+
+        if parent:
+            paths.add(parent)
+
+    paths = list(paths)
+
+    sampled = dict(
+        (path, matrices)
+        for path, matrices in zip(paths, _sample(paths, frames))
+    )
+
+    # -- Compute the new world and local matrices of every snapped node
+    # -- for every frame
+    snapped = dict()
+    values = list()
+
+    for relationship in relationships:
+        source = relationship['source']
+        parent = _parent(source)
+        offset = om.MMatrix(relationship['offset'] or om.MMatrix())
 
+        settings = _settings(source)
+        previous = None
 
-            # -- Pull out the node as a named variable for
-            # -- code clarity
-            node = nodes[0]
+        snapped[source] = list()
+        source_values = list()
 
-            # -- Match the two objects with the offset matrix
-            _set_worldspace_matrix(
-                node,
-                target,
-                snap_node.offsetMatrix.get(),
+        for idx in range(len(frames)):
+            world = offset * _resolve(relationship['target'], idx, sampled, snapped)
+            snapped[source].append(world)
+
+            if parent:
+                world = world * _resolve(parent, idx, sampled, snapped).inverse()
+
+            translate, rotate, scale = maths.decompose(
+                world,
+                rotate_order=settings['rotate_order'],
+                joint_orient=settings['joint_orient'],
+                rotate_axis=settings['rotate_axis'],
+                previous=previous,
             )
+            previous = rotate
+
+            source_values.append(translate + rotate + scale)
+
+        values.append((source, source_values))
+
+    # -- Now we have computed everything we can write it
+    for source, source_values in values:
+        _write(source, _CHANNELS, frames, source_values, key)
+
+
+# ------------------------------------------------------------------------------
+def _passes(relationships):
+    """
+    Splits the given relationships into passes, such that no relationship
+    has its target (or the parent of its source) driven through the
+    dependency graph by a node snapped earlier within the same pass. Nodes
+    driven purely through the hierarchy do not need splitting, as this is
+    resolved when computing the snaps.
+
+    :param relationships: List of relationships, ordered such that the
+        shallowest sources come first
+    :type relationships: list(dict, ...)
+
+    :return: list(list(dict, ...), ...)
+    """
+    # -- A single relationship cannot depend on itself, so there is
+    # -- no need to inspect the graph
+    if len(relationships) < 2:
+        return [relationships]
 
-            # -- Get the list of nodes to reset
-            if snap_node.hasAttr('nodesToZero'):
-                zero_these = snap_node.nodesToZero.inputs()
+    passes = [list()]
+    sources = list()
 
-                # -- Zero any nodes which require it
-                for node_to_zero in zero_these:
-                    _zero_node(node_to_zero)
+    for relationship in relationships:
 
-                    if key or start_time != end_time:
-                        pm.setKeyframe(node_to_zero)
-            
-            # -- Key the match if we need to
-            if key or start_time != end_time:
-                pm.setKeyframe(node)
+        if sources and _driven_by(relationship, sources):
+            passes.append(list())
+            sources = list()
+
+        passes[-1].append(relationship)
+        sources.append(relationship['source'])
+
+    return passes
+
+
+# ------------------------------------------------------------------------------
+def _driven_by(relationship, sources):
+    """
+    Returns True if the target of the given relationship, or the parent of
+    its source, is driven through the dependency graph by any of the
+    given nodes (or any node beneath them).
+
+    :param relationship: The relationship to check
+    :type relationship: dict
+
+    :param sources: Long names of the nodes to check against
+    :type sources: list(str, ...)
+
+    :return: bool
+    """
+    # -- The world matrices we read depend on every node above the
+    # -- target and the source, so we take the history of all of them
+    chain = set()
+
+    for path in [relationship['target'], _parent(relationship['source'])]:
+        while path:
+            chain.add(path)
+            path = _parent(path)
+
+    history = cmds.ls(
+        cmds.listHistory(list(chain)) or list(),
+        type='transform',
+        long=True,
+    ) or list()
+
+    for path in history:
+
+        # -- The hierarchy itself is taken into account when resolving
+        # -- the snaps, so we only care about nodes feeding into it
+        if path in chain:
+            continue
+
+        for source in sources:
+            if path == source or path.startswith(source + '|'):
+                return True
+
+    return False
+
+
+# ------------------------------------------------------------------------------
+def _sample(paths, frames):
+    """
+    Evaluates the world matrix of each of the given nodes at each of the
+    given frames, without changing the current time. The current frame is
+    evaluated normally, so any values set without keys are respected.
+
+    :param paths: Long names of the nodes to evaluate
+    :type paths: list(str, ...)
+
+    :param frames: Frames to evaluate
+    :type frames: list(int, ...)
+
+    :return: list(list(om.MMatrix, ...), ...) holding the matrices of
+        each node for each frame
+    """
+    selection_list = om.MSelectionList()
+
+    for path in paths:
+        selection_list.add(path)
+
+    plugs = list()
+
+    for idx in range(len(paths)):
+        plug = om.MFnDependencyNode(
+            selection_list.getDependNode(idx),
+        ).findPlug('worldMatrix', False)
+
+        plugs.append(plug.elementByLogicalIndex(0))
+
+    sampled = [list() for _ in paths]
+    unit = om.MTime.uiUnit()
+    current_time = cmds.currentTime(q=True)
+
+    for frame in frames:
+
+        if frame == current_time:
+            context = om.MDGContext()
+
+        else:
+            context = om.MDGContext(om.MTime(frame, unit))
+
+        for idx, matrix in enumerate(_evaluate(plugs, context)):
+            sampled[idx].append(matrix)
+
+    return sampled
+
+
+# ------------------------------------------------------------------------------
+def _evaluate(plugs, context):
+    """
+    Evaluates the given matrix plugs within the given context.
+
+    :param plugs: Plugs to evaluate
+    :type plugs: list(om.MPlug, ...)
+
+    :param context: The context to evaluate within
+    :type context: om.MDGContext
+
+    :return: list(om.MMatrix, ...)
+    """
+    # -- Newer versions of maya expect the context to be made current
+    # -- rather than being passed to the plug
+    if hasattr(context, 'makeCurrent'):
+        previous = context.makeCurrent()
+
+        try:
+            return [
+                om.MFnMatrixData(plug.asMObject()).matrix()
+                for plug in plugs
+            ]
+
+        finally:
+            previous.makeCurrent()
+
+    return [
+        om.MFnMatrixData(plug.asMObject(context)).matrix()
+        for plug in plugs
+    ]
+
+
+# ------------------------------------------------------------------------------
+def _resolve(path, idx, sampled, snapped):
+    """
+    Returns the world matrix of the given node at the given frame index,
+    taking into account any snapped node it may sit beneath.
+
+    :param path: Long name of the node
+    :type path: str
+
+    :param idx: Index of the frame
+    :type idx: int
+
+    :param sampled: The original world matrices of the nodes
+    :type sampled: dict(str: list(om.MMatrix, ...))
+
+    :param snapped: The new world matrices of the snapped nodes
+    :type snapped: dict(str: list(om.MMatrix, ...))
+
+    :return: om.MMatrix
+    """
+    if path in snapped:
+        return snapped[path][idx]
+
+    # -- Find the closest snapped node above this one
+    ancestor = None
+
+    for snapped_path in snapped:
+        if not path.startswith(snapped_path + '|'):
+            continue
+
+        if not ancestor or len(snapped_path) > len(ancestor):
+            ancestor = snapped_path
+
+    if not ancestor:
+        return sampled[path][idx]
+
+    # -- The node retains its relationship to the snapped node, so
+    # -- it moves along with it
+    relative = sampled[path][idx] * sampled[ancestor][idx].inverse()
+
+    return relative * snapped[ancestor][idx]
+
+
+# ------------------------------------------------------------------------------
+def _parent(path):
+    """
+    Returns the long name of the parent of the given node.
+
+    :param path: Long name of the node
+    :type path: str
+
+    :return: str or None if the node is in world space
+    """
+    return path.rsplit('|', 1)[0] or None
+
+
+# ------------------------------------------------------------------------------
+def _settings(path):
+    """
+    Reads the settings of the given node which affect how a matrix is
+    broken down into attribute values.
+
+    :param path: Long name of the node
+    :type path: str
+
+    :return: dict
+    """
+    joint_orient = None
+
+    if cmds.attributeQuery('jointOrient', node=path, exists=True):
+        joint_orient = cmds.getAttr('%s.jointOrient' % path)[0]
+
+    return dict(
+        rotate_order=cmds.getAttr('%s.rotateOrder' % path),
+        joint_orient=joint_orient,
+        rotate_axis=cmds.getAttr('%s.rotateAxis' % path)[0],
+    )
+
+
+# ------------------------------------------------------------------------------
+def _write(path, attributes, frames, values, key):
+    """
+    Writes the given values to the given attributes of the node. When
+    keying, all existing keys on those attributes within the range of
+    frames are replaced.
+
+    :param path: Long name of the node
+    :type path: str
+
+    :param attributes: Names of the attributes to write
+    :type attributes: list(str, ...)
+
+    :param frames: Frames the values relate to
+    :type frames: list(int, ...)
+
+    :param values: For each frame, the value of each attribute
+    :type values: list(list(float, ...), ...)
+
+    :param key: Whether to key the values. If False, only the values
+        of the first frame are set.
+    :type key: bool
+
+    :return: None
+    """
+    # -- Skip any attributes which are locked or driven
+    writable = [
+        (idx, '%s.%s' % (path, attribute))
+        for idx, attribute in enumerate(attributes)
+        if cmds.getAttr('%s.%s' % (path, attribute), settable=True)
+    ]
+
+    if not writable:
+        return
+
+    if not key:
+        for idx, plug in writable:
+            cmds.setAttr(plug, values[0][idx])
+
+        return
+
+    plugs = [plug for _, plug in writable]
+
+    # -- Clear the keys in one go so we are only adding keys
+    # -- from here on
+    cmds.cutKey(plugs, time=(frames[0], frames[-1]), clear=True)
+
+    for idx, plug in writable:
+
+        # -- Create every key in one go, which ensures the plug has an
+        # -- anim curve and that the keys sit amongst any keys outside
+        # -- of the range, then write all their values in one go
+        cmds.setKeyframe(plug, time=frames, value=values[0][idx])
+
+        curve = cmds.keyframe(plug, query=True, name=True)[0]
+        first = cmds.keyframe(
+            plug,
+            query=True,
+            indexValue=True,
+            time=(frames[0], frames[0]),
+        )[0]
+
+        key_values = list()
+
+        for frame, frame_values in zip(frames, values):
+            key_values.extend([frame, frame_values[idx]])
+
+        cmds.setAttr(
+            '%s.ktv[%s:%s]' % (curve, first, first + len(frames) - 1),
+            *key_values
+        )
+
+
+# ------------------------------------------------------------------------------
+def _apply_zero_plan(zero_plan, frames, key):
+    """
+    Zeros the nodes in the given plan over the given frame range. As the
+    zeroed values do not change over time, only the first and last frames
+    are keyed and any keys between them are removed.
+
+    :param zero_plan: List of plugs and their zeroed values, as returned
+        by _zero_plan
+    :type zero_plan: list(tuple(str, value), ...)
+
+    :param frames: Frames to zero over
+    :type frames: list(int, ...)
+
+    :param key: Whether to key the values
+    :type key: bool
+
+    :return: None
+    """
+    if not zero_plan:
+        return
+
+    if not key:
+        for plug, value in zero_plan:
+            cmds.setAttr(plug, value)
+
+        return
+
+    cmds.cutKey(
+        [plug for plug, _ in zero_plan],
+        time=(frames[0], frames[-1]),
+        clear=True,
+    )
+
+    for plug, value in zero_plan:
+        cmds.setKeyframe(
+            plug,
+            time=sorted(set([frames[0], frames[-1]])),
+            value=value,
+        )
 
 
 # ------------------------------------------------------------------------------
@@ -480,65 +1646,82 @@ def _new_node():
 
 
 # ------------------------------------------------------------------------------
-def _set_worldspace_matrix(node, target, offset_matrix):
+def _new_table():
     """
-    Sets the worldspace matrix of the given node to that of the target
-    matrix with the offset matrix applied.
+    Creates a snap table, which is a network node holding any number
+    of snap mappings within a compound multi attribute.
 
-    :param node: Node to set the transform on
-    :type node: pm.nt.Transform
+    :return: str
+    """
+    table = create.generic(
+        node_type='network',
+        prefix=config.SNAP,
+        description='Table',
+        side='NA',
+    ).name()
 
-    :param offset_matrix: The matrix to offset during the apply
-    :type offset_matrix: pm.dt.Matrix
+    # -- Add an attribute to ensure we can always identify
+    # -- this node
+    cmds.addAttr(table, longName='isCrabSnapTable', attributeType='bool', defaultValue=True)
 
-    :return: None
-    """
-    # -- Apply the offset
-    target_matrix = pm.dt.Matrix(target.getMatrix(worldSpace=True))
-    resolved_mat4 = offset_matrix * target_matrix
+    # -- Each entry holds everything a snap node would hold
+    cmds.addAttr(table, longName='snaps', attributeType='compound', multi=True, numberOfChildren=5)
+    cmds.addAttr(table, longName='snapLabel', dataType='string', parent='snaps')
+    cmds.addAttr(table, longName='snapSource', attributeType='message', parent='snaps')
+    cmds.addAttr(table, longName='snapTarget', attributeType='message', parent='snaps')
+    cmds.addAttr(table, longName='snapOffset', dataType='matrix', parent='snaps')
+    cmds.addAttr(table, longName='snapZero', attributeType='message', multi=True, parent='snaps')
 
-    # -- Now we need to apply the matrix
-    node.setMatrix(
-        resolved_mat4,
-        worldSpace=True,
-    )
+    return table
 
 
 # ------------------------------------------------------------------------------
-def _zero_node(node):
+def _zero_plan(paths):
     """
-    Zero's the nodes
+    Inspects the given nodes once to determine which of their attributes
+    need to be set, and to what, in order to zero them. Translation and
+    rotation are zeroed, scale is set to one and any user defined
+    attributes are set to their default values. Attributes which are
+    locked or driven are skipped.
 
-    :param node:
-    :return:
+    :param paths: Long names of the nodes to zero
+    :type paths: list(str, ...)
+
+    :return: list(tuple(str, value), ...) of plugs and their values
     """
-    for attr in node.listAttr(k=True):
+    zero_plan = list()
+    visited = set()
 
-        attr_name = attr.name(includeNode=False)
+    for path in paths:
 
-        if 'scale' in attr_name:
-            value = 1.0
+        if path in visited:
+            continue
 
-        elif 'translate' in attr_name or 'rotate' in attr_name:
-            value = 0.0
+        visited.add(path)
+        values = dict()
 
-        else:
-            continue
+        for attribute in cmds.listAttr(path, keyable=True) or list():
 
-        try:
-            attr.set(value)
-        except:
-            pass
-
-    for attr in node.listAttr(k=True, ud=True):
-        value = pm.attributeQuery(
-            attr.name(includeNode=False),
-            node=node,
-            listDefault=True,
-        )
+            if 'scale' in attribute:
+                values[attribute] = 1.0
 
-        try:
-            attr.set(value)
+            elif 'translate' in attribute or 'rotate' in attribute:
+                values[attribute] = 0.0
 
-        except:
-            continue
+        for attribute in cmds.listAttr(path, keyable=True, userDefined=True) or list():
+            default = cmds.attributeQuery(
+                attribute,
+                node=path,
+                listDefault=True,
+            )
+
+            if default:
+                values[attribute] = default[0]
+
+        for attribute in sorted(values):
+            plug = '%s.%s' % (path, attribute)
+
+            if cmds.getAttr(plug, settable=True):
+                zero_plan.append((plug, values[attribute]))
+
+    return zero_plan
@@ -0,0 +1,296 @@
+"""
+This module tracks changes to the scene, allowing caches throughout crab
+to cheaply determine whether they are still valid.
+
+Any node creation, deletion or connection change - along with scene,
+import and reference events - increments the scene revision. A
+cache can therefore store the revision it was built at and compare it
+against the current revision to know whether it needs to be rebuilt.
+
+..code-block:: python
+
+    >>> import crab
+    >>>
+    >>> revision = crab.utils.tracking.revision()
+    >>>
+    >>> # -- Any change to the scene will change the revision
+    >>> pm.createNode('transform')
+    >>> print(revision == crab.utils.tracking.revision())
+    False
+
+Name listeners can also be registered, which are told of every node name
+entering or leaving the scene - whether through creation, deletion or a
+rename.
+
+..code-block:: python
+
+    >>> def on_name_changed(old_name, new_name):
+    ...     print(old_name, new_name)
+    >>>
+    >>> crab.utils.tracking.add_name_listener(on_name_changed)
+
+Connection listeners can be registered in the same way, which are told
+of every connection being made or broken.
+"""
+import maya.api.OpenMaya as om
+
+
+# -- This is incremented on every tracked scene change
+_REVISION = [0]
+
+# -- This holds the id's of all the callbacks we have registered
+_CALLBACK_IDS = list()
+
+# -- This holds all the functions which should be told of name changes
+_NAME_LISTENERS = list()
+
+# -- This holds all the functions which should be told of connection changes
+_CONNECTION_LISTENERS = list()
+
+# -- These are the scene messages which should invalidate everything
+_SCENE_MESSAGES = [
+    om.MSceneMessage.kAfterNew,
+    om.MSceneMessage.kAfterOpen,
+    om.MSceneMessage.kAfterImport,
+    om.MSceneMessage.kAfterCreateReference,
+    om.MSceneMessage.kAfterRemoveReference,
+    om.MSceneMessage.kAfterLoadReference,
+    om.MSceneMessage.kAfterUnloadReference,
+]
+
+
+# ------------------------------------------------------------------------------
+def revision():
+    """
+    Returns the current scene revision. This will change whenever the scene
+    changes in a way which may invalidate a cache.
+
+    :return: int
+    """
+    install()
+    return _REVISION[0]
+
+
+# ------------------------------------------------------------------------------
+def invalidate():
+    """
+    Increments the scene revision, forcing any caches to be rebuilt.
+
+    :return: None
+    """
+    _REVISION[0] += 1
+
+
+# ------------------------------------------------------------------------------
+def install():
+    """
+    Registers the callbacks which are used to track scene changes. If they
+    are already registered this does nothing.
+
+    :return: None
+    """
+    if _CALLBACK_IDS:
+        return
+
+    _CALLBACK_IDS.extend(
+        [
+            om.MDGMessage.addNodeAddedCallback(_on_node_added, 'dependNode'),
+            om.MDGMessage.addNodeRemovedCallback(_on_node_removed, 'dependNode'),
+            om.MDGMessage.addConnectionCallback(_on_connection),
+            om.MNodeMessage.addNameChangedCallback(om.MObject.kNullObj, _on_name_changed),
+        ]
+    )
+
+    for message in _SCENE_MESSAGES:
+        _CALLBACK_IDS.append(
+            om.MSceneMessage.addCallback(message, _on_scene_changed),
+        )
+
+    # -- We cannot know what happened before we were installed
+    invalidate()
+
+
+# ------------------------------------------------------------------------------
+def uninstall():
+    """
+    Removes all the callbacks registered by this module. This should be
+    called before crab is reloaded.
+
+    :return: None
+    """
+    while _CALLBACK_IDS:
+        try:
+            om.MMessage.removeCallback(_CALLBACK_IDS.pop())
+
+        except RuntimeError:
+            pass
+
+    # -- Without the callbacks the listeners would no longer be told
+    # -- of changes, so we tell them everything has changed and then
+    # -- forget them
+    _notify(None, None)
+    del _NAME_LISTENERS[:]
+    del _CONNECTION_LISTENERS[:]
+
+    invalidate()
+
+
+# ------------------------------------------------------------------------------
+def add_name_listener(callback):
+    """
+    Registers a function to be called whenever a node name enters or
+    leaves the scene. The function is called with the old and new names:
+
+        * When a node is created the old name is None
+        * When a node is deleted the new name is None
+        * When a node is renamed both names are given
+        * When the whole scene changes (such as a new scene being opened)
+            both names are None
+
+    Listeners are forgotten when the tracking is uninstalled, so should use
+    ```is_name_listener``` to determine whether they need to re-register.
+
+    :param callback: Function to call
+    :type callback: callable
+
+    :return: None
+    """
+    install()
+
+    if callback not in _NAME_LISTENERS:
+        _NAME_LISTENERS.append(callback)
+
+
+# ------------------------------------------------------------------------------
+def remove_name_listener(callback):
+    """
+    Removes a function previously registered with ```add_name_listener```
+
+    :param callback: Function to remove
+    :type callback: callable
+
+    :return: None
+    """
+    if callback in _NAME_LISTENERS:
+        _NAME_LISTENERS.remove(callback)
+
+
+# ------------------------------------------------------------------------------
+def is_name_listener(callback):
+    """
+    Returns True if the given function is currently registered as a
+    name listener.
+
+    :param callback: Function to test
+    :type callback: callable
+
+    :return: bool
+    """
+    return callback in _NAME_LISTENERS
+
+
+# ------------------------------------------------------------------------------
+def add_connection_listener(callback):
+    """
+    Registers a function to be called whenever a connection is made or
+    broken. The function is called with the names of the source and
+    destination plugs.
+
+    Listeners are forgotten when the tracking is uninstalled, so should use
+    ```is_connection_listener``` to determine whether they need to
+    re-register.
+
+    :param callback: Function to call
+    :type callback: callable
+
+    :return: None
+    """
+    install()
+
+    if callback not in _CONNECTION_LISTENERS:
+        _CONNECTION_LISTENERS.append(callback)
+
+
+# ------------------------------------------------------------------------------
+def remove_connection_listener(callback):
+    """
+    Removes a function previously registered with
+    ```add_connection_listener```
+
+    :param callback: Function to remove
+    :type callback: callable
+
+    :return: None
+    """
+    if callback in _CONNECTION_LISTENERS:
+        _CONNECTION_LISTENERS.remove(callback)
+
+
+# ------------------------------------------------------------------------------
+def is_connection_listener(callback):
+    """
+    Returns True if the given function is currently registered as a
+    connection listener.
+
+    :param callback: Function to test
+    :type callback: callable
+
+    :return: bool
+    """
+    return callback in _CONNECTION_LISTENERS
+
+
+# ------------------------------------------------------------------------------
+def _notify(old_name, new_name):
+    for callback in _NAME_LISTENERS:
+        callback(old_name, new_name)
+
+
+# ------------------------------------------------------------------------------
+def _name(node):
+    try:
+        return om.MFnDependencyNode(node).name()
+
+    except RuntimeError:
+        return None
+
+
+# ------------------------------------------------------------------------------
+# noinspection PyUnusedLocal
+def _on_connection(source, destination, *args):
+    invalidate()
+
+    for callback in _CONNECTION_LISTENERS:
+        callback(source.name(), destination.name())
+
+
+# ------------------------------------------------------------------------------
+# noinspection PyUnusedLocal
+def _on_node_added(node, *args):
+    invalidate()
+
+    if _NAME_LISTENERS:
+        _notify(None, _name(node))
+
+
+# ------------------------------------------------------------------------------
+# noinspection PyUnusedLocal
+def _on_node_removed(node, *args):
+    invalidate()
+
+    if _NAME_LISTENERS:
+        _notify(_name(node), None)
+
+
+# ------------------------------------------------------------------------------
+# noinspection PyUnusedLocal
+def _on_name_changed(node, previous_name, *args):
+    if _NAME_LISTENERS:
+        _notify(previous_name or None, _name(node))
+
+
+# ------------------------------------------------------------------------------
+# noinspection PyUnusedLocal
+def _on_scene_changed(*args):
+    invalidate()
+    _notify(None, None)
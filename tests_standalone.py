@@ -0,0 +1,1056 @@
+"""
+Unittests which can be collected by any python interpreter. Tests of
+the pure python parts of crab always run, whilst the remaining tests
+are skipped unless maya is available.
+"""
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# -- The factories library is vendored, so we make it importable
+# -- without importing crab (which requires maya)
+sys.path.insert(0, os.path.join(_ROOT, 'crab', 'vendor'))
+
+import factories
+
+try:
+    import pymel.core  # noqa: F401
+    _HAS_MAYA = True
+
+except ImportError:
+    _HAS_MAYA = False
+
+
+# ------------------------------------------------------------------------------
+def _load_source(name, filepath):
+    """
+    Loads the python file at the given path as a module.
+    """
+    try:
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location(name, filepath)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    except ImportError:
+        import imp
+        return imp.load_source(name, filepath)
+
+
+# ------------------------------------------------------------------------------
+class _TempDirectory(unittest.TestCase):
+    """
+    Provides a temporary directory which is removed after each test.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write(self, relative_path, content):
+        filepath = os.path.join(self.directory, relative_path)
+
+        if not os.path.exists(os.path.dirname(filepath)):
+            os.makedirs(os.path.dirname(filepath))
+
+        with open(filepath, 'w') as f:
+            f.write(content)
+
+        return filepath
+
+
+# ------------------------------------------------------------------------------
+class TestDiscoveryCache(_TempDirectory):
+
+    _RECORDS = [
+        dict(
+            name='Plugin',
+            bases=['Abstract'],
+            attributes=dict(identifier='plugin'),
+            unresolved=list(),
+        ),
+    ]
+
+    def test_reuse(self):
+        plugin_path = self.write('plugin.py', 'x = 1\n')
+        cache_path = os.path.join(self.directory, 'cache', 'discovery.json')
+
+        cache = factories.DiscoveryCache(cache_path)
+        cache.set(plugin_path, self._RECORDS)
+
+        self.assertIs(
+            cache.save(),
+            True,
+            'A modified cache should be written.',
+        )
+
+        reloaded = factories.DiscoveryCache(cache_path)
+        self.assertEqual(
+            reloaded.get(plugin_path),
+            self._RECORDS,
+            'Records should be reused whilst the file is unchanged.',
+        )
+
+    def test_invalidated_by_size(self):
+        plugin_path = self.write('plugin.py', 'x = 1\n')
+
+        cache = factories.DiscoveryCache(os.path.join(self.directory, 'discovery.json'))
+        cache.set(plugin_path, self._RECORDS)
+
+        self.write('plugin.py', 'x = 12345\n')
+
+        self.assertIsNone(
+            cache.get(plugin_path),
+            'Records should be ignored once the file size changes.',
+        )
+
+    def test_invalidated_by_mtime(self):
+        plugin_path = self.write('plugin.py', 'x = 1\n')
+
+        cache = factories.DiscoveryCache(os.path.join(self.directory, 'discovery.json'))
+        cache.set(plugin_path, self._RECORDS)
+
+        modified = os.path.getmtime(plugin_path) + 10
+        os.utime(plugin_path, (modified, modified))
+
+        self.assertIsNone(
+            cache.get(plugin_path),
+            'Records should be ignored once the file modification time changes.',
+        )
+
+    def test_static_records(self):
+        plugin_path = self.write('plugin.py', 'x = 1\n')
+
+        cache = factories.DiscoveryCache(os.path.join(self.directory, 'discovery.json'))
+        cache.set(plugin_path, self._RECORDS, static=True)
+
+        self.assertEqual(
+            cache.get(plugin_path),
+            self._RECORDS,
+            'Static records should be returned by default.',
+        )
+        self.assertIsNone(
+            cache.get(plugin_path, static=False),
+            'Static records should not be returned when imported records are asked for.',
+        )
+
+
+# ------------------------------------------------------------------------------
+class TestLazyFactory(_TempDirectory):
+
+    def setUp(self):
+        super(TestLazyFactory, self).setUp()
+
+        # -- The abstract and an intermediate base class live outside
+        # -- of the plugin location, as a shared library would
+        library = self.write(
+            os.path.join('library', 'lazy_test_base.py'),
+            '\n'.join(
+                [
+                    'class Abstract(object):',
+                    '    identifier = ""',
+                    '',
+                    'class Intermediate(Abstract):',
+                    '    pass',
+                    '',
+                ]
+            ),
+        )
+        sys.path.insert(0, os.path.dirname(library))
+
+        import lazy_test_base
+        self.base = lazy_test_base
+
+        self.plugins = os.path.join(self.directory, 'plugins')
+
+        self.write(
+            os.path.join('plugins', 'plugins_a.py'),
+            '\n'.join(
+                [
+                    'from lazy_test_base import Abstract, Intermediate',
+                    '',
+                    'class Direct(Abstract):',
+                    '    identifier = "direct"',
+                    '',
+                    'class Indirect(Intermediate):',
+                    '    identifier = "indirect"',
+                    '',
+                ]
+            ),
+        )
+
+        self.write(
+            os.path.join('plugins', 'plugins_b.py'),
+            '\n'.join(
+                [
+                    'from lazy_test_base import Abstract',
+                    '',
+                    'class LocalBase(Abstract):',
+                    '    identifier = "local_base"',
+                    '',
+                    'class Local(LocalBase):',
+                    '    identifier = "local"',
+                    '',
+                ]
+            ),
+        )
+
+    def tearDown(self):
+        sys.path.remove(os.path.join(self.directory, 'library'))
+        sys.modules.pop('lazy_test_base', None)
+
+        super(TestLazyFactory, self).tearDown()
+
+    def _factory(self, lazy):
+        return factories.Factory(
+            abstract=self.base.Abstract,
+            paths=[self.plugins],
+            plugin_identifier='identifier',
+            lazy=lazy,
+        )
+
+    def test_lazy_matches_eager(self):
+        self.assertEqual(
+            sorted(self._factory(lazy=True).identifiers()),
+            sorted(self._factory(lazy=False).identifiers()),
+            'Lazy and eager factories should find the same plugins.',
+        )
+
+    def test_intermediate_base(self):
+        factory = self._factory(lazy=True)
+
+        self.assertIn(
+            'indirect',
+            factory.identifiers(),
+            'Plugins inheriting from an unscanned base should be found.',
+        )
+
+        plugin = factory.request('indirect')
+
+        self.assertIsNotNone(
+            plugin,
+            'Plugins inheriting from an unscanned base should be requestable.',
+        )
+        self.assertIs(
+            issubclass(plugin, self.base.Abstract),
+            True,
+            'The requested plugin should be the imported class.',
+        )
+
+    def test_scanned_base(self):
+        factory = self._factory(lazy=True)
+
+        self.assertIn(
+            'local',
+            factory.identifiers(),
+            'Plugins inheriting through a scanned base should be found.',
+        )
+        self.assertEqual(
+            factory.request('local').__name__,
+            'Local',
+            'The placeholder should resolve to the imported class.',
+        )
+
+    def test_shared_scanner_reload(self):
+        scanner = factories.Scanner()
+
+        factory = factories.Factory(
+            abstract=self.base.Abstract,
+            paths=[self.plugins],
+            plugin_identifier='identifier',
+            lazy=True,
+            scanner=scanner,
+        )
+        walked = scanner.files(self.plugins)
+
+        factory.reload()
+
+        self.assertIs(
+            scanner.files(self.plugins),
+            walked,
+            'Reloading a factory should not clear a scanner it shares.',
+        )
+        self.assertIn(
+            'indirect',
+            factory.identifiers(),
+            'A reloaded factory should still find its plugins.',
+        )
+
+
+# ------------------------------------------------------------------------------
+@unittest.skipUnless(_HAS_MAYA, 'Requires maya')
+class TestShapeEncoding(unittest.TestCase):
+
+    _DATA = [
+        dict(
+            node='CTL_Root_001_MD',
+            curves=[
+                dict(
+                    cvs=[[0.0, 1.0, 0.0], [1.0, 0.0, 0.5]],
+                    form=0,
+                    degree=1,
+                    knots=[0.0, 1.0],
+                ),
+            ],
+            up_axis='y',
+        ),
+    ]
+
+    def setUp(self):
+        self.shapes = _load_source(
+            'crab_shapes_process',
+            os.path.join(_ROOT, 'crab', 'plugins', 'processes', 'shapes.py'),
+        )
+
+    def test_round_trip(self):
+        encoded = self.shapes._encode(self._DATA)
+
+        self.assertIs(
+            encoded.startswith(self.shapes._COMPRESSED_PREFIX),
+            True,
+            'Encoded shape data should be marked as compressed.',
+        )
+        self.assertEqual(
+            self.shapes._decode(encoded),
+            self._DATA,
+            'Shape data should survive being encoded and decoded.',
+        )
+
+    def test_legacy_json(self):
+        self.assertEqual(
+            self.shapes._decode(json.dumps(self._DATA)),
+            self._DATA,
+            'Shape data stored as plain json should still be read.',
+        )
+
+    def test_invalid(self):
+        for value in ['', 'not json', self.shapes._COMPRESSED_PREFIX + '!!!']:
+            self.assertIsNone(
+                self.shapes._decode(value),
+                'Unreadable shape data should decode to None: {}.'.format(value),
+            )
+
+
+# ------------------------------------------------------------------------------
+@unittest.skipUnless(_HAS_MAYA, 'Requires maya')
+class TestShapeRestore(unittest.TestCase):
+
+    def setUp(self):
+        from maya import cmds
+        import maya.api.OpenMaya as om
+
+        cmds.file(new=True, force=True)
+
+        self.cmds = cmds
+        self.om = om
+        self.shapes = _load_source(
+            'crab_shapes_process',
+            os.path.join(_ROOT, 'crab', 'plugins', 'processes', 'shapes.py'),
+        )
+
+        self.transform = cmds.circle(constructionHistory=False)[0]
+        self.curve = cmds.listRelatives(self.transform, shapes=True, fullPath=True)[0]
+
+    def _curve_fn(self):
+        selection_list = self.om.MSelectionList()
+        selection_list.add(self.curve)
+
+        return self.om.MFnNurbsCurve(selection_list.getDagPath(0))
+
+    def test_periodic_round_trip(self):
+        curve_data = self.shapes._read_curve(self._curve_fn())
+
+        self.assertEqual(
+            curve_data['form'],
+            self.shapes._PERIODIC,
+            'A circle should be read as a periodic curve.',
+        )
+
+        curve_data['cvs'] = [
+            [value * 2.0 for value in cv]
+            for cv in curve_data['cvs']
+        ]
+
+        self.assertIs(
+            self.shapes._set_cvs(self._curve_fn(), curve_data),
+            True,
+            'Moved cvs should be reported as a change.',
+        )
+
+        restored = self.shapes._read_curve(self._curve_fn())
+
+        self.assertEqual(
+            len(restored['cvs']),
+            len(curve_data['cvs']),
+            'Restoring a periodic curve should not change its cv count.',
+        )
+        for restored_cv, cv in zip(restored['cvs'], curve_data['cvs']):
+            for restored_value, value in zip(restored_cv, cv):
+                self.assertAlmostEqual(
+                    restored_value,
+                    value,
+                    4,
+                    'A periodic curve should round trip its cv positions.',
+                )
+        self.assertIs(
+            self.shapes._set_cvs(self._curve_fn(), restored),
+            False,
+            'Restoring matching cvs should not alter the curve.',
+        )
+
+# ------------------------------------------------------------------------------
+@unittest.skipUnless(_HAS_MAYA, 'Requires maya')
+class TestTopLevelPaths(unittest.TestCase):
+
+    def test_filtering(self):
+        import crab.core
+
+        self.assertEqual(
+            sorted(
+                crab.core._top_level_paths(
+                    [
+                        '|a',
+                        '|a|b',
+                        '|a|b|c',
+                        '|ab',
+                        '|d|e',
+                        '|d|e|f',
+                        '|g|h|i',
+                    ],
+                ),
+            ),
+            ['|a', '|ab', '|d|e', '|g|h|i'],
+            'Only paths which are not beneath other paths should remain.',
+        )
+
+
+# ------------------------------------------------------------------------------
+class _RigTestCase(unittest.TestCase):
+    """
+    Provides a new scene holding a rig with a chain of singular
+    components for each test.
+    """
+
+    # -- The number of components in the chain
+    _CHAIN_LENGTH = 3
+
+    def setUp(self):
+        import crab
+        from maya import cmds
+
+        cmds.file(new=True, force=True)
+
+        self.crab = crab
+        self.cmds = cmds
+        self.rig = crab.Rig.create(name='Test')
+        self.components = list()
+
+        parent = None
+
+        for idx in range(self._CHAIN_LENGTH):
+            component = self.rig.add_component(
+                'Singular',
+                parent=parent,
+                description='Chain',
+                side=crab.config.MIDDLE,
+            )
+
+            parent = component.skeletal_root()
+            self.components.append(component)
+
+    def skeletal_roots(self):
+        return [component.skeletal_root() for component in self.components]
+
+
+# ------------------------------------------------------------------------------
+@unittest.skipUnless(_HAS_MAYA, 'Requires maya')
+class TestRemoveComponents(_RigTestCase):
+
+    def test_reparents_children(self):
+        first, second, third = self.skeletal_roots()
+        second_name = second.longName()
+
+        self.assertEqual(
+            self.rig.remove_components([second]),
+            1,
+            'The number of components removed should be returned.',
+        )
+        self.assertIs(
+            self.cmds.objExists(second_name),
+            False,
+            'The removed component should be deleted.',
+        )
+        self.assertEqual(
+            third.getParent(),
+            first,
+            'Child components should be moved to the next available parent.',
+        )
+
+    def test_missing_nodes(self):
+        first, second, third = self.skeletal_roots()
+        second_name = second.longName()
+        metas = [component.meta().name() for component in self.components[1:]]
+
+        # -- Deleting one of the guides up front must not stop the
+        # -- remaining nodes from being deleted
+        self.cmds.delete(self.components[1].guide_root().longName())
+
+        self.assertEqual(
+            self.rig.remove_components([second, third]),
+            2,
+            'Both components should be removed.',
+        )
+        self.assertEqual(
+            self.cmds.ls(metas),
+            list(),
+            'The meta nodes of all the removed components should be deleted.',
+        )
+        self.assertEqual(
+            self.cmds.ls(second_name),
+            list(),
+            'The skeleton of the removed components should be deleted.',
+        )
+
+
+# ------------------------------------------------------------------------------
+@unittest.skipUnless(_HAS_MAYA, 'Requires maya')
+class TestComponentIndex(_RigTestCase):
+
+    def test_hierarchy(self):
+        index = self.rig.component_index()
+        uuids = index.uuids()
+
+        self.assertEqual(
+            index.skeleton_roots(),
+            self.skeletal_roots(),
+            'Skeleton roots should be given in hierarchical order.',
+        )
+        self.assertIsNone(
+            index.parent(uuids[0]),
+            'The first component should have no parent component.',
+        )
+        self.assertEqual(
+            index.children(uuids[0], recursive=True),
+            uuids[1:],
+            'All the other components should be descendants of the first.',
+        )
+
+    def test_unrelated_changes(self):
+        index = self.rig.component_index()
+
+        self.cmds.createNode('transform')
+        self.cmds.connectAttr(
+            self.cmds.createNode('transform') + '.translateX',
+            self.cmds.createNode('transform') + '.translateX',
+        )
+
+        self.assertIs(
+            self.rig.component_index(),
+            index,
+            'Changes unrelated to the components should not rebuild the index.',
+        )
+
+    def test_added_component(self):
+        index = self.rig.component_index()
+
+        self.rig.add_component(
+            'Singular',
+            parent=self.components[-1].skeletal_root(),
+            description='Chain',
+            side=self.crab.config.MIDDLE,
+        )
+
+        self.assertIsNot(
+            self.rig.component_index(),
+            index,
+            'Adding a component should rebuild the index.',
+        )
+        self.assertEqual(
+            len(self.rig.skeleton_roots()),
+            self._CHAIN_LENGTH + 1,
+            'The added component should be indexed.',
+        )
+
+    def test_reparented_component(self):
+        first, second, third = self.skeletal_roots()
+        index = self.rig.component_index()
+
+        self.cmds.parent(third.longName(), first.longName())
+
+        self.assertIsNot(
+            self.rig.component_index(),
+            index,
+            'Moving a component root should rebuild the index.',
+        )
+        self.assertEqual(
+            self.rig.component_index().parent(self.crab.core._uuid(self.components[2].meta())),
+            self.crab.core._uuid(self.components[0].meta()),
+            'The parent of a moved component should be updated.',
+        )
+
+
+# ------------------------------------------------------------------------------
+@unittest.skipUnless(_HAS_MAYA, 'Requires maya')
+class TestIncrementalBuild(_RigTestCase):
+
+    def setUp(self):
+        super(TestIncrementalBuild, self).setUp()
+        self.rig.build()
+
+    def control_uuids(self):
+        return [
+            self.cmds.ls(
+                self.crab.Component.get(root).control_root().longName(),
+                uuid=True,
+            )[0]
+            for root in self.skeletal_roots()
+        ]
+
+    def test_unchanged(self):
+        before = self.control_uuids()
+
+        self.assertIs(
+            self.rig.build_incremental(),
+            True,
+            'An incremental build of an unchanged rig should succeed.',
+        )
+        self.assertEqual(
+            self.control_uuids(),
+            before,
+            'No components should be rebuilt when nothing has changed.',
+        )
+
+    def test_changed_options(self):
+        before = self.control_uuids()
+
+        component = self.crab.Component.get(self.skeletal_roots()[1])
+        component.options.lock = 'tx;ty;tz;'
+        component.apply_options()
+
+        self.rig.build_incremental()
+        after = self.control_uuids()
+
+        self.assertEqual(
+            after[0],
+            before[0],
+            'Components above a changed component should not be rebuilt.',
+        )
+        self.assertNotEqual(
+            after[1],
+            before[1],
+            'A component whose options have changed should be rebuilt.',
+        )
+        self.assertNotEqual(
+            after[2],
+            before[2],
+            'Components below a changed component should be rebuilt.',
+        )
+
+    def test_renamed_parent_control(self):
+        before = self.control_uuids()
+
+        parent_joint = self.skeletal_roots()[1].getParent()
+        control = parent_joint.attr(self.crab.config.BOUND).inputs()[0]
+        self.cmds.rename(control.longName(), control.nodeName() + 'Renamed')
+
+        self.rig.build_incremental()
+
+        self.assertEqual(
+            self.control_uuids(),
+            before,
+            'Renaming a parent control should not mark components as changed.',
+        )
+
+
+
+# ------------------------------------------------------------------------------
+@unittest.skipUnless(_HAS_MAYA, 'Requires maya')
+class TestNameAllocator(unittest.TestCase):
+
+    def setUp(self):
+        import crab
+        from maya import cmds
+
+        cmds.file(new=True, force=True)
+
+        self.crab = crab
+        self.cmds = cmds
+
+    def name(self):
+        return self.crab.config.name('CTRL', 'Test', 'MD')
+
+    def test_unique(self):
+        names = [self.name() for _ in range(3)]
+
+        self.assertEqual(
+            names,
+            ['CTRL_Test_1_MD', 'CTRL_Test_2_MD', 'CTRL_Test_3_MD'],
+            'Each name requested should be unique, even if unused.',
+        )
+
+    def test_existing_nodes(self):
+        self.cmds.createNode('transform', name='CTRL_Test_1_MD')
+
+        self.assertEqual(
+            self.name(),
+            'CTRL_Test_2_MD',
+            'Names already in the scene should not be handed out.',
+        )
+
+        # -- Nodes created outside of crab after the scene has been
+        # -- scanned must also be respected
+        self.cmds.createNode('transform', name='CTRL_Test_3_MD')
+
+        self.assertEqual(
+            self.name(),
+            'CTRL_Test_4_MD',
+            'Names created after the first request should not be handed out.',
+        )
+
+    def test_renamed_nodes(self):
+        node = self.cmds.createNode('transform', name=self.name())
+        self.cmds.rename(node, 'CTRL_Test_2_MD')
+
+        self.assertEqual(
+            self.name(),
+            'CTRL_Test_3_MD',
+            'Names given by renaming should not be handed out.',
+        )
+
+    def test_reuse(self):
+        nodes = [
+            self.cmds.createNode('transform', name=self.name())
+            for _ in range(3)
+        ]
+        self.cmds.delete(nodes[1])
+
+        self.assertEqual(
+            self.name(),
+            'CTRL_Test_2_MD',
+            'The counter of a deleted node should be re-used.',
+        )
+        self.assertEqual(
+            self.name(),
+            'CTRL_Test_4_MD',
+            'Counters in use should be skipped.',
+        )
+
+    def test_new_scene(self):
+        self.cmds.createNode('transform', name=self.name())
+        self.cmds.file(new=True, force=True)
+
+        self.assertEqual(
+            self.name(),
+            'CTRL_Test_1_MD',
+            'Counters should be forgotten when the scene changes.',
+        )
+
+
+
+# ------------------------------------------------------------------------------
+class _SnapTestCase(unittest.TestCase):
+    """
+    Provides a new scene holding a source and target transform, with the
+    source offset from the target.
+    """
+
+    def setUp(self):
+        import pymel.core as pm
+        from maya import cmds
+        from crab.utils import snap
+
+        cmds.file(new=True, force=True)
+
+        self.cmds = cmds
+        self.snap = snap
+
+        self.target = pm.createNode('transform', name='target')
+        self.source = pm.createNode('transform', name='source')
+
+        self.cmds.setAttr('target.translate', 1, 2, 3)
+        self.cmds.setAttr('source.translate', 1, 3, 3)
+
+    def assertTranslation(self, node, expected, message):
+        for actual, value in zip(self.cmds.getAttr(node + '.translate')[0], expected):
+            self.assertAlmostEqual(actual, value, places=4, msg=message)
+
+
+# ------------------------------------------------------------------------------
+@unittest.skipUnless(_HAS_MAYA, 'Requires maya')
+class TestSnapRegistry(_SnapTestCase):
+
+    def test_new(self):
+        registry = self.snap.registry()
+
+        self.assertEqual(
+            registry.relationships(),
+            list(),
+            'There should be no relationships in a new scene.',
+        )
+
+        self.snap.new(self.source, self.target, label='IKFK')
+
+        self.assertEqual(
+            self.snap.labels(self.source),
+            ['IKFK'],
+            'A new relationship should be picked up by the registry.',
+        )
+        self.assertEqual(
+            self.snap.members('IKFK'),
+            self.snap.get(self.source),
+            'The relationship should be found by its label.',
+        )
+        self.assertIs(
+            self.snap.snappable(self.target),
+            False,
+            'Only the source of a relationship should be snappable.',
+        )
+
+    def test_remove(self):
+        self.snap.new(self.source, self.target, label='IKFK')
+        self.snap.new(self.source, self.target, label='Space')
+
+        self.assertEqual(
+            self.snap.remove(self.source, label='IKFK'),
+            1,
+            'Only the relationship with the given label should be removed.',
+        )
+        self.assertEqual(
+            self.snap.labels(self.source),
+            ['Space'],
+            'The removed relationship should leave the registry.',
+        )
+
+    def test_renamed_nodes(self):
+        self.snap.new(self.source, self.target, label='IKFK')
+
+        # -- Populate the registry before renaming
+        self.snap.registry().relationships()
+        self.cmds.rename('source', 'renamed')
+
+        self.assertEqual(
+            [relationship['source'] for relationship in self.snap.registry().relationships()],
+            ['|renamed'],
+            'The registry should follow renamed nodes.',
+        )
+
+    def test_external_changes(self):
+        snap_node = self.snap.new(self.source, self.target, label='IKFK')
+
+        # -- Populate the registry before changing the scene
+        self.snap.registry().relationships()
+        self.cmds.delete(snap_node.name())
+
+        self.assertEqual(
+            self.snap.registry().relationships(),
+            list(),
+            'Deleting a snap node should update the registry.',
+        )
+
+    def test_snap(self):
+        self.snap.new(self.source, self.target, label='IKFK')
+        self.cmds.setAttr('target.translate', 4, 5, 6)
+
+        self.snap.snap(self.source, self.target, key=False)
+
+        self.assertTranslation(
+            'source',
+            (4, 6, 6),
+            'The stored offset should be retained when snapping.',
+        )
+
+
+
+# ------------------------------------------------------------------------------
+@unittest.skipUnless(_HAS_MAYA, 'Requires maya')
+class TestSnapTable(_SnapTestCase):
+
+    def tables(self):
+        return self.cmds.ls('*.isCrabSnapTable', objectsOnly=True)
+
+    def test_new(self):
+        self.snap.new(self.source, self.target, label='IKFK', table=True)
+        self.snap.new(self.source, self.target, label='Space', table=True)
+
+        self.assertEqual(
+            len(self.tables()),
+            1,
+            'All the mappings of a namespace should share a single table.',
+        )
+        self.assertEqual(
+            self.cmds.ls('*.isCrabSnap', objectsOnly=True),
+            list(),
+            'No snap nodes should be created for table mappings.',
+        )
+        self.assertEqual(
+            sorted(self.snap.labels(self.source)),
+            ['IKFK', 'Space'],
+            'Table mappings should be picked up by the registry.',
+        )
+
+    def test_remove(self):
+        self.snap.new(self.source, self.target, label='IKFK', table=True)
+        self.snap.new(self.source, self.target, label='Space', table=True)
+
+        self.assertEqual(
+            self.snap.remove(self.source, label='IKFK'),
+            1,
+            'Only the mapping with the given label should be removed.',
+        )
+        self.assertEqual(
+            self.snap.labels(self.source),
+            ['Space'],
+            'The removed mapping should leave the registry.',
+        )
+
+    def test_snap(self):
+        self.snap.new(self.source, self.target, label='IKFK', table=True)
+        self.cmds.setAttr('target.translate', 4, 5, 6)
+
+        self.snap.snap(self.source, self.target, key=False)
+
+        self.assertTranslation(
+            'source',
+            (4, 6, 6),
+            'The offset stored in the table should be retained when snapping.',
+        )
+
+    def test_migrate(self):
+        import pymel.core as pm
+
+        reset = pm.createNode('transform', name='reset')
+
+        self.snap.new(self.source, self.target, label='IKFK', resets=[reset])
+        self.snap.new(self.source, self.target, label='Space')
+
+        self.assertEqual(
+            self.snap.migrate(),
+            2,
+            'The number of mappings migrated should be returned.',
+        )
+        self.assertEqual(
+            self.cmds.ls('*.isCrabSnap', objectsOnly=True),
+            list(),
+            'The migrated snap nodes should be deleted.',
+        )
+        self.assertEqual(
+            sorted(self.snap.labels(self.source)),
+            ['IKFK', 'Space'],
+            'The migrated mappings should be held in the table.',
+        )
+        self.assertEqual(
+            self.snap.registry().relationships(label='IKFK')[0]['zero'],
+            ['|reset'],
+            'The nodes to zero should be migrated.',
+        )
+        self.assertEqual(
+            self.snap.migrate(),
+            0,
+            'There should be nothing left to migrate.',
+        )
+
+        self.cmds.setAttr('target.translate', 4, 5, 6)
+        self.snap.snap(self.source, self.target, key=False)
+
+        self.assertTranslation(
+            'source',
+            (4, 6, 6),
+            'The offset should be retained through the migration.',
+        )
+
+
+
+# ------------------------------------------------------------------------------
+@unittest.skipUnless(_HAS_MAYA, 'Requires maya')
+class TestBindingModes(_RigTestCase):
+
+    def drivers(self, joint, node_type):
+        return self.cmds.listConnections(
+            joint.longName(),
+            source=True,
+            destination=False,
+            type=node_type,
+        ) or list()
+
+    def test_default(self):
+        self.rig.build()
+
+        for joint in self.skeletal_roots():
+            self.assertTrue(
+                self.drivers(joint, 'parentConstraint'),
+                'Joints should be bound with constraints by default.',
+            )
+            self.assertFalse(
+                self.drivers(joint, 'decomposeMatrix'),
+                'Joints should not be bound with matrices by default.',
+            )
+
+    def test_rig_mode(self):
+        self.rig.set_binding_mode(self.crab.config.MATRIX_BINDING)
+        self.rig.build()
+
+        for joint in self.skeletal_roots():
+            self.assertTrue(
+                self.drivers(joint, 'decomposeMatrix'),
+                'Joints should be bound with matrices.',
+            )
+            self.assertFalse(
+                self.drivers(joint, 'parentConstraint') + self.drivers(joint, 'scaleConstraint'),
+                'Joints bound with matrices should not be constrained.',
+            )
+
+    def test_component_mode(self):
+        self.rig.set_binding_mode(self.crab.config.MATRIX_BINDING)
+        self.components[1].set_binding_mode(self.crab.config.CONSTRAINT_BINDING)
+        self.rig.build()
+
+        first, second, third = self.skeletal_roots()
+
+        self.assertTrue(
+            self.drivers(second, 'parentConstraint'),
+            'The binding mode of a component should override the rig.',
+        )
+        self.assertTrue(
+            self.drivers(third, 'decomposeMatrix'),
+            'Other components should use the binding mode of the rig.',
+        )
+
+    def test_matrix_placement(self):
+        first = self.skeletal_roots()[0]
+        before = first.getMatrix(worldSpace=True)
+
+        self.rig.set_binding_mode(self.crab.config.MATRIX_BINDING)
+        self.rig.build()
+
+        self.assertTrue(
+            first.getMatrix(worldSpace=True).isEquivalent(before, 0.0001),
+            'A matrix binding should not move the skeleton.',
+        )
+
+    def test_edit(self):
+        self.rig.set_binding_mode(self.crab.config.MATRIX_BINDING)
+        self.rig.build()
+        self.rig.edit()
+
+        self.assertEqual(
+            self.cmds.ls(type='decomposeMatrix'),
+            list(),
+            'The matrix bindings should be removed along with the control rig.',
+        )
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            self.rig.set_binding_mode('invalid')
+
+
+if __name__ == '__main__':
+    unittest.main()